@@ -0,0 +1,50 @@
+"""
+Compares the CSV handoff between DAG tasks with the typed Parquet and Arrow IPC artifacts:
+file size, write time, full read time and projected (two column) read time.
+
+    python benchmarks/artifact_benchmark.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.raw_load_benchmark import make_clickup_frame
+from scripts.artifacts import ArtifactStore, FORMATS
+
+TEXT_COLUMNS = ["client", "project", "name", "task", "billable"]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # cleaned frames carry low-cardinality text as categoricals
+    df = make_clickup_frame(args.rows)
+    df[TEXT_COLUMNS] = df[TEXT_COLUMNS].astype("category")
+
+    print(f"{args.rows} rows")
+    print(f"{'format':>8} {'size MB':>9} {'write s':>8} {'read s':>8} {'2-col s':>8}  dtypes kept")
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in FORMATS:
+            store = ArtifactStore(directory, fmt)
+            path, write_time = timed(lambda: store.write(df, "clickup_cleaned"))
+            loaded, read_time = timed(lambda: store.read("clickup_cleaned"))
+            _, projected_time = timed(lambda: store.read("clickup_cleaned", columns=["date", "hours"]))
+            size = os.path.getsize(path) / 2 ** 20
+            kept = bool((loaded.dtypes == df.dtypes).all())
+            print(f"{fmt:>8} {size:>9.1f} {write_time:>8.2f} {read_time:>8.2f} {projected_time:>8.2f}  {kept}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measures how long the scheduler spends importing dags/etl_pipeline_dag.py and fails when it goes over budget
+or when the import pulls in heavy modules that belong inside the task callables.
+
+    python benchmarks/dag_parse_benchmark.py --runs 10 --budget-ms 100
+
+Each run is a fresh interpreter. Airflow itself is imported before the clock starts, so only the cost
+of the DAG module (and what it imports beyond Airflow) is counted.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DAG_FILE = os.path.join(ROOT, "dags", "etl_pipeline_dag.py")
+
+# must not be loaded by parsing the DAG (unless Airflow already loaded them)
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "pydantic", "sqlalchemy", "psycopg2", "loguru", "scripts", "models"]
+# the stage graph the DAG is built from, it imports nothing heavy itself
+ALLOWED_MODULES = ["scripts", "scripts.run_pipeline"]
+
+PARSE_SCRIPT = """
+import importlib.util, json, sys, time
+import airflow
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from airflow.utils.dates import days_ago
+
+before = set(sys.modules)
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("etl_pipeline_dag", {dag_file!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - start
+
+loaded = set(sys.modules) - before
+heavy = sorted({{name.split(".")[0] for name in loaded - set({allowed!r})}} & set({heavy!r}))
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def parse_once() -> dict:
+    script = PARSE_SCRIPT.format(dag_file=DAG_FILE, heavy=HEAVY_MODULES, allowed=ALLOWED_MODULES)
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    runs = [parse_once() for _ in range(args.runs)]
+    timings = [run["seconds"] * 1000 for run in runs]
+    median = statistics.median(timings)
+    heavy = sorted({name for run in runs for name in run["heavy"]})
+
+    print(f"DAG parse over {args.runs} runs: median {median:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms")
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median parse time {median:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    if heavy:
+        failures.append(f"parsing the DAG imported {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
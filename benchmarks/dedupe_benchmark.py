@@ -0,0 +1,61 @@
+"""
+Checks that the streaming duplicate filter (drop_duplicate_chunks) keeps the same rows as drop_duplicates()
+on the whole export, for several chunk sizes, and that rows whose first hash collides are still told apart.
+Exits non-zero when a check fails.
+
+    python benchmarks/dedupe_benchmark.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic_data import generate
+from models.data_models import ClickUpDataModel
+from scripts.extract import read_csv_typed
+from scripts.streaming import SeenRows, drop_duplicate_chunks
+from scripts.validation import validate_frame
+
+
+def collisions_told_apart() -> bool:
+    # three remembered rows, two of them sharing a first hash
+    seen = SeenRows()
+    seen.add(np.array([5, 5, 7], dtype=np.uint64), np.array([1, 2, 3], dtype=np.uint64))
+    found = seen.contains(np.array([5, 5, 5, 7, 8], dtype=np.uint64), np.array([1, 2, 9, 3, 3], dtype=np.uint64))
+    return found.tolist() == [True, True, False, True, False]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="ClickUp time entries")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        _, clickup_path = generate(directory, args.rows, duplicate_rate=args.duplicate_rate, seed=args.seed)
+        valid, _ = validate_frame(read_csv_typed(clickup_path, ClickUpDataModel), ClickUpDataModel)
+    expected = valid.drop_duplicates().reset_index(drop=True)
+
+    ok = collisions_told_apart()
+    print(f"first hash collisions told apart: {'yes' if ok else 'NO'}")
+    print(f"{'chunk size':>10} {'rows':>9} {'kept':>9} {'seconds':>8}  same as drop_duplicates")
+    for chunk_size in args.chunk_sizes:
+        chunks = [valid.iloc[start:start + chunk_size] for start in range(0, len(valid), chunk_size)]
+        start = time.perf_counter()
+        kept = pd.concat(list(drop_duplicate_chunks(chunks)), ignore_index=True)
+        seconds = time.perf_counter() - start
+        same = kept.equals(expected)
+        ok &= same
+        print(f"{chunk_size:>10} {len(valid):>9} {len(kept):>9} {seconds:>8.3f}  {'yes' if same else 'NO'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+End-to-end pipeline benchmark over synthetic data of increasing size.
+For every size it generates the Float/ClickUp CSVs, runs the pipeline stages in a fresh process against
+the configured Postgres (DATABASE_URL overrides config.yaml) and reports seconds, rows/s and memory per stage.
+
+    DATABASE_URL=postgresql+psycopg2://postgres@localhost/bench python benchmarks/pipeline_benchmark.py --sizes 10000 100000 1000000
+
+Rows/s is the number of generated ClickUp entries over the stage time, so stages compare across sizes.
+Peak RSS is the high-water mark of the benchmark process once the stage finished.
+--reset drops the raw, staging and prod schemas before each size: only use it on a scratch database.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+STAGES = ["extract", "clean", "raw_load", "mv_refresh", "dimensions", "fact", "dq", "prod_publish"]
+
+
+def run_stages(data_dir: str, rows: int, streaming: bool, raw_load: str, staging_refresh: str, prod_publish: str,
+               star_builder: str, reset: bool):
+    from sqlalchemy import text
+    from benchmarks.synthetic_data import FLOAT_FILE, CLICKUP_FILE
+    from models.data_models import FloatDataModel, ClickUpDataModel
+    from scripts.extract import extract_and_validate
+    from scripts.transform import clean_data
+    from scripts.load_raw import create_raw_schema, copy_to_raw
+    from scripts.streaming import stream_to_raw
+    from scripts.load_staging import create_and_refresh_materialized_views
+    from scripts.star_schema import create_staging_star_schema, populate_dimensions, populate_fact_table, load_prod_schema
+    from scripts.star_builder import build_star_schema
+    from scripts.data_quality import data_quality_checks_raw, data_quality_checks_staging, run_prod_validation
+    from utils.db import get_engine
+    from utils.instrumentation import measure
+
+    float_path = os.path.join(data_dir, FLOAT_FILE)
+    clickup_path = os.path.join(data_dir, CLICKUP_FILE)
+
+    if reset:
+        with get_engine("bulk_load").begin() as conn:
+            for schema in ("prod_shadow", "prod", "staging", "raw"):
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+
+    def stage(name):
+        return measure(f"bench.{name}", rows_in=rows)
+
+    def dq(check):
+        # synthetic data carries deliberate anomalies, a failed check is reported, not fatal
+        try:
+            check()
+        except ValueError as e:
+            print(f"  {e}")
+
+    # rejected rows are quarantined in raw while extracting
+    create_raw_schema()
+    if streaming:
+        with stage("raw_load"):
+            stream_to_raw(float_path, FloatDataModel, "Float Data", "float_allocations", load_mode=raw_load)
+            stream_to_raw(clickup_path, ClickUpDataModel, "ClickUp Data", "clickup_timesheets", load_mode=raw_load)
+    else:
+        with stage("extract"):
+            float_data = extract_and_validate(float_path, FloatDataModel)
+            clickup_data = extract_and_validate(clickup_path, ClickUpDataModel)
+        with stage("clean"):
+            float_data = clean_data(float_data, "Float Data")
+            clickup_data = clean_data(clickup_data, "ClickUp Data")
+        with stage("raw_load"):
+            copy_to_raw(float_data, "float_allocations", mode=raw_load)
+            copy_to_raw(clickup_data, "clickup_timesheets", mode=raw_load)
+        if star_builder != "frames":
+            del float_data, clickup_data
+
+    with stage("dq"):
+        dq(data_quality_checks_raw)
+    with stage("mv_refresh"):
+        create_and_refresh_materialized_views(staging_refresh)
+    if star_builder == "frames" and not streaming:
+        # dimensions and facts in one pass, reported as the dimensions stage
+        with stage("dimensions"):
+            create_staging_star_schema()
+            build_star_schema(float_data, clickup_data)
+        del float_data, clickup_data
+    else:
+        with stage("dimensions"):
+            create_staging_star_schema()
+            populate_dimensions()
+        with stage("fact"):
+            populate_fact_table()
+    with stage("dq"):
+        dq(data_quality_checks_staging)
+    with stage("prod_publish"):
+        load_prod_schema(mode=prod_publish)
+    with stage("dq"):
+        dq(run_prod_validation)
+
+
+def summarize(records: list) -> dict:
+    """
+    Per bench stage: total seconds, rows/s, and the highest peak RSS and RSS growth seen.
+    """
+    summary = {}
+    for record in records:
+        if not record["stage"].startswith("bench."):
+            continue
+        name = record["stage"][len("bench."):]
+        stage = summary.setdefault(name, {"seconds": 0.0, "rows": record["rows_in"], "peak_rss_mb": 0.0, "rss_growth_mb": 0.0})
+        stage["seconds"] += record["wall_seconds"]
+        stage["peak_rss_mb"] = max(stage["peak_rss_mb"], record["peak_rss_mb"])
+        stage["rss_growth_mb"] = max(stage["rss_growth_mb"], record["peak_rss_growth_mb"])
+    for stage in summary.values():
+        stage["rows_per_second"] = round(stage["rows"] / stage["seconds"], 1) if stage["seconds"] else None
+        stage["seconds"] = round(stage["seconds"], 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--data-dir", default="data/benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=300)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--raw-load", default="truncate")
+    parser.add_argument("--staging-refresh", default="full")
+    parser.add_argument("--prod-publish", default="partition")
+    parser.add_argument("--star-builder", default="sql", choices=["sql", "frames"])
+    parser.add_argument("--reset", action="store_true")
+    parser.add_argument("--output", help="write the summary as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--rows", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    os.chdir(ROOT)
+
+    if args.child:
+        run_stages(args.data_dir, args.rows, args.streaming, args.raw_load, args.staging_refresh, args.prod_publish,
+                   args.star_builder, args.reset)
+        return
+
+    from benchmarks.synthetic_data import generate
+    from utils.instrumentation import read_run_metrics
+
+    results = {}
+    for rows in args.sizes:
+        data_dir = os.path.join(args.data_dir, str(rows))
+        print(f"Generating {rows} rows into {data_dir}")
+        generate(data_dir, rows, members=args.members, projects=args.projects, days=args.days, seed=args.seed)
+
+        # each size in a fresh process, so peak RSS is not inherited from the previous size
+        run_id = f"benchmark__{rows}__{time.strftime('%Y%m%dT%H%M%S')}"
+        command = [sys.executable, os.path.abspath(__file__), "--child", "--rows", str(rows), "--data-dir", data_dir,
+                   "--raw-load", args.raw_load, "--staging-refresh", args.staging_refresh, "--prod-publish", args.prod_publish]
+        command += ["--star-builder", args.star_builder]
+        command += ["--streaming"] * args.streaming + ["--reset"] * args.reset
+        subprocess.run(command, check=True, env={**os.environ, "PIPELINE_RUN_ID": run_id})
+        results[rows] = summarize(read_run_metrics(run_id))
+
+    print(f"\n{'rows':>10} {'stage':>13} {'seconds':>9} {'rows/s':>12} {'peak RSS MB':>12} {'RSS growth MB':>14}")
+    for rows, summary in results.items():
+        for name in STAGES:
+            if name in summary:
+                stage = summary[name]
+                print(f"{rows:>10} {name:>13} {stage['seconds']:>9.2f} {stage['rows_per_second']:>12.0f} "
+                      f"{stage['peak_rss_mb']:>12.0f} {stage['rss_growth_mb']:>14.0f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
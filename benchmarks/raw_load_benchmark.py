@@ -0,0 +1,74 @@
+"""
+Compares raw-load throughput of DataFrame.to_sql (the old load_to_raw path) with copy_to_raw.
+Loads into scratch tables in a `bench` schema, the raw tables are left untouched.
+
+    python benchmarks/raw_load_benchmark.py --rows 100000 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from utils.db import get_engine
+from scripts.load_raw import create_raw_schema, copy_to_raw
+
+engine = get_engine("bulk_load")
+
+BENCH_SCHEMA = "bench"
+
+
+def make_clickup_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D")
+    return pd.DataFrame({
+        "client": pd.Series(rng.integers(0, 40, rows)).map("client {}".format),
+        "project": pd.Series(rng.integers(0, 300, rows)).map("project {}".format),
+        "name": pd.Series(rng.integers(0, 200, rows)).map("member {}".format),
+        "task": pd.Series(rng.integers(0, 500, rows)).map("task {}".format),
+        "date": dates,
+        "hours": rng.integers(1, 33, rows) / 4,
+        "note": np.where(rng.random(rows) < 0.5, "", "worked on it"),
+        "billable": np.where(rng.random(rows) < 0.7, "yes", "no"),
+    })
+
+
+def reset_bench_table():
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {BENCH_SCHEMA}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_SCHEMA}.clickup_timesheets"))
+        conn.execute(text(f"CREATE TABLE {BENCH_SCHEMA}.clickup_timesheets (LIKE raw.clickup_timesheets)"))
+
+
+def time_load(load) -> float:
+    reset_bench_table()
+    start = time.perf_counter()
+    load()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    create_raw_schema()
+    print(f"{'rows':>10} {'to_sql rows/s':>15} {'COPY rows/s':>15} {'speedup':>8}")
+    for rows in args.rows:
+        df = make_clickup_frame(rows)
+        to_sql_time = time_load(lambda: df.to_sql(
+            "clickup_timesheets", con=engine, schema=BENCH_SCHEMA, if_exists="replace", index=False
+        ))
+        copy_time = time_load(lambda: copy_to_raw(df, "clickup_timesheets", schema=BENCH_SCHEMA))
+        print(f"{rows:>10} {rows / to_sql_time:>15.0f} {rows / copy_time:>15.0f} {to_sql_time / copy_time:>7.1f}x")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {BENCH_SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
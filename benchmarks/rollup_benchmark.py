@@ -0,0 +1,55 @@
+"""
+Times typical dashboard queries through the rollup router against the same queries on prod.fact_timesheet,
+and repeats served from the query result cache. Runs against the published prod schema of the configured database (DATABASE_URL overrides config.yaml).
+
+    python benchmarks/rollup_benchmark.py --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.rollups import query_hours, route
+from utils.query_cache import get_query_cache
+
+# (label, group_by, period, start_date, end_date, filters)
+QUERIES = [
+    ("client by month", ["client"], "month", None, None, {}),
+    ("member billability by week", ["name", "is_billable"], "week", "2023-01-02", "2023-03-26", {}),
+    ("client billability, one year", ["client", "is_billable"], None, "2023-01-01", "2023-12-31", {}),
+    ("billable hours by month", [], "month", None, None, {"is_billable": True}),
+    ("project by day, one month", ["project_name"], "day", "2023-03-01", "2023-03-31", {}),
+]
+
+
+def best_of(repeat: int, cached: bool = False, **query) -> float:
+    times = []
+    query_hours(**query)
+    for _ in range(repeat):
+        if not cached:
+            get_query_cache().clear()
+        start = time.perf_counter()
+        query_hours(**query)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'query':>30} {'source':>8} {'routed ms':>10} {'fact ms':>10} {'speedup':>8} {'cached ms':>10}")
+    for label, group_by, period, start_date, end_date, filters in QUERIES:
+        query = dict(group_by=group_by, period=period, start_date=start_date, end_date=end_date, filters=filters)
+        routed = best_of(args.repeat, **query)
+        fact = best_of(args.repeat, source="fact", **query)
+        cached = best_of(args.repeat, cached=True, **query)
+        print(f"{label:>30} {route(group_by + list(filters), period, start_date, end_date):>8} "
+              f"{routed * 1000:>10.1f} {fact * 1000:>10.1f} {fact / routed:>7.1f}x {cached * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
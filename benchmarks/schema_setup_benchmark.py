@@ -0,0 +1,96 @@
+"""
+Times steady-state schema setup (the sql/ DDL scripts, once their objects exist) through run_sql_script, which
+skips DDL already applied, against running the whole script as before, and counts the table locks each leaves
+held until commit. Also runs create_raw_schema.sql while another connection has an open write on
+raw.float_allocations: CREATE INDEX IF NOT EXISTS takes a SHARE lock on the table before finding the index exists,
+so the whole script waits for the writer.
+Runs against the configured database (DATABASE_URL overrides config.yaml) after a pipeline run created the schemas.
+
+    python benchmarks/schema_setup_benchmark.py --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from utils.db import get_engine
+from utils.instrumentation import measure
+from utils.sql import load_script, run_sql_script, sql_statements
+
+engine = get_engine("bulk_load")
+
+SCRIPTS = ["sql/create_raw_schema.sql", "sql/create_staging_star_schema.sql", "sql/create_staging_tables.sql"]
+
+
+def unmanaged(conn, path: str):
+    # what run_sql_script did before: every statement, every time, as one stage
+    with measure(f"sql.{os.path.basename(path)}"):
+        conn.execute(text(";\n".join(sql_statements(path))))
+
+def median_ms(run, path: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            run(conn, path)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+def relation_locks(run, path: str) -> int:
+    # locks on pipeline tables (not system catalogs) the script leaves held until its transaction commits
+    with engine.begin() as conn:
+        run(conn, path)
+        return conn.execute(text("""
+            SELECT COUNT(*) FROM pg_locks
+            WHERE pid = pg_backend_pid() AND locktype = 'relation' AND relation >= 16384
+        """)).scalar()
+
+def while_writing(run, path: str, lock_timeout: str) -> str:
+    # an uncommitted insert holds ROW EXCLUSIVE on the table for the duration of the setup script
+    with engine.connect() as writer:
+        transaction = writer.begin()
+        writer.execute(text("INSERT INTO raw.float_allocations (client) VALUES ('schema setup benchmark')"))
+        try:
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                conn.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+                run(conn, path)
+            return f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        except OperationalError:
+            return f"blocked > {lock_timeout}"
+        finally:
+            transaction.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--lock-timeout", default="2s")
+    args = parser.parse_args()
+
+    for path in SCRIPTS:
+        # applies the scripts and records their versions if this database has not seen them yet
+        with engine.begin() as conn:
+            run_sql_script(conn, path)
+
+    print(f"{'script':>32} {'statements':>10} {'whole ms':>10} {'managed ms':>11} {'whole locks':>12} {'managed locks':>14}")
+    for path in SCRIPTS:
+        script = load_script(path)
+        whole = median_ms(unmanaged, path, args.repeat)
+        managed = median_ms(run_sql_script, path, args.repeat)
+        print(f"{script.name:>32} {len(script.statements):>10} {whole:>10.2f} {managed:>11.2f} "
+              f"{relation_locks(unmanaged, path):>12} {relation_locks(run_sql_script, path):>14}")
+
+    path = "sql/create_raw_schema.sql"
+    print(f"\n{os.path.basename(path)} during an open write to raw.float_allocations:")
+    print(f"  whole script: {while_writing(unmanaged, path, args.lock_timeout)}")
+    print(f"  managed:      {while_writing(run_sql_script, path, args.lock_timeout)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Deterministic synthetic Float and ClickUp exports matching FloatDataModel and ClickUpDataModel.
+Every ClickUp entry is logged against a Float allocation, so the data flows through to the fact table.
+Duplicates, missing critical fields and unparseable dates are injected at the requested rates.
+
+    python benchmarks/synthetic_data.py --rows 1000000 --out data/raw --seed 42
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+FLOAT_FILE = "Float - allocations.csv"
+CLICKUP_FILE = "ClickUp - clickup.csv"
+
+FLOAT_COLUMNS = ["Client", "Project", "Role", "Name", "Task", "Start Date", "End Date", "Estimated Hours"]
+CLICKUP_COLUMNS = ["Client", "Project", "Name", "Task", "Date", "Hours", "Note", "Billable"]
+CRITICAL_COLUMNS = ["Client", "Project", "Name", "Task"]
+
+ROLES = ["Developer", "Designer", "Project Manager", "QA", "Data Engineer"]
+NOTES = ["", "standup", "code review", "client call", "bug fixing", "documentation"]
+BAD_DATES = ["2023-13-01", "2023-02-30", "31/12/2023", "not a date"]
+
+# generated and written in fixed-size chunks, so memory stays flat and the output only depends on the seed
+CHUNK_SIZE = 1_000_000
+
+
+def _with_anomalies(df: pd.DataFrame, rng, date_columns, duplicate_rate, null_rate, bad_date_rate) -> pd.DataFrame:
+    rows = len(df)
+    # exact copies of other rows of the same chunk
+    duplicates = np.flatnonzero(rng.random(rows) < duplicate_rate)
+    if len(duplicates):
+        df.iloc[duplicates] = df.iloc[rng.integers(0, rows, len(duplicates))].to_numpy()
+
+    # one critical field left empty
+    nulls = np.flatnonzero(rng.random(rows) < null_rate)
+    for column_index, column in enumerate(CRITICAL_COLUMNS):
+        df.loc[df.index[nulls[rng.integers(0, len(CRITICAL_COLUMNS), len(nulls)) == column_index]], column] = None
+
+    bad_dates = np.flatnonzero(rng.random(rows) < bad_date_rate)
+    for column in date_columns:
+        df.loc[df.index[bad_dates], column] = rng.choice(BAD_DATES, len(bad_dates))
+    return df
+
+
+def _allocations(rng, members: int, projects: int, clients: int, tasks: int, allocations_per_member: int,
+                 start: pd.Timestamp, days: int) -> pd.DataFrame:
+    project_client = rng.integers(0, clients, projects)
+    member_role = rng.integers(0, len(ROLES), members)
+
+    member = np.repeat(np.arange(members), allocations_per_member)
+    project = rng.integers(0, projects, len(member))
+    task = rng.integers(0, tasks, len(member))
+    # one allocation per (member, project, task)
+    unique = ~pd.DataFrame({"m": member, "p": project, "t": task}).duplicated().to_numpy()
+    member, project, task = member[unique], project[unique], task[unique]
+
+    offset = rng.integers(0, max(days // 2, 1), len(member))
+    length = rng.integers(30, max(days, 31), len(member))
+    start_date = start + pd.to_timedelta(offset, unit="D")
+    end_date = start_date + pd.to_timedelta(length, unit="D")
+    return pd.DataFrame({
+        "Client": [f"Client {c:03d}" for c in project_client[project]],
+        "Project": [f"Project {p:04d}" for p in project],
+        "Role": np.array(ROLES)[member_role[member]],
+        "Name": [f"Member {m:05d}" for m in member],
+        "Task": [f"Task {t:03d}" for t in task],
+        "Start Date": start_date.strftime("%Y-%m-%d"),
+        "End Date": end_date.strftime("%Y-%m-%d"),
+        "Estimated Hours": rng.integers(8, 400, len(member)),
+    })
+
+
+def _timesheets(rng, allocations: pd.DataFrame, rows: int, start: pd.Timestamp, days: int) -> pd.DataFrame:
+    allocation = rng.integers(0, len(allocations), rows)
+    picked = allocations.iloc[allocation]
+    dates = start + pd.to_timedelta(rng.integers(0, days, rows), unit="D")
+    return pd.DataFrame({
+        "Client": picked["Client"].to_numpy(),
+        "Project": picked["Project"].to_numpy(),
+        "Name": picked["Name"].to_numpy(),
+        "Task": picked["Task"].to_numpy(),
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Hours": rng.integers(1, 41, rows) / 4,
+        "Note": rng.choice(NOTES, rows),
+        "Billable": np.where(rng.random(rows) < 0.75, "Yes", "No"),
+    })
+
+
+def generate(out_dir: str, rows: int = 10_000, members: int = 200, projects: int = 300, clients: int = 40,
+             tasks: int = 50, allocations_per_member: int = 10, start_date: str = "2023-01-01", days: int = 730,
+             duplicate_rate: float = 0.01, null_rate: float = 0.005, bad_date_rate: float = 0.002, seed: int = 0):
+    """
+    Writes the Float allocations and `rows` ClickUp time entries into out_dir, returns both paths.
+    The same arguments always produce byte-identical files.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    start = pd.Timestamp(start_date)
+    rates = dict(duplicate_rate=duplicate_rate, null_rate=null_rate, bad_date_rate=bad_date_rate)
+
+    rng = np.random.default_rng([seed, 0])
+    allocations = _allocations(rng, members, projects, clients, tasks, allocations_per_member, start, days)
+    float_path = os.path.join(out_dir, FLOAT_FILE)
+    float_rows = _with_anomalies(allocations.copy(), rng, ["Start Date", "End Date"], **rates)
+    float_rows[FLOAT_COLUMNS].to_csv(float_path, index=False)
+
+    clickup_path = os.path.join(out_dir, CLICKUP_FILE)
+    for chunk, offset in enumerate(range(0, max(rows, 1), CHUNK_SIZE)):
+        rng = np.random.default_rng([seed, chunk + 1])
+        timesheets = _timesheets(rng, allocations, min(CHUNK_SIZE, rows - offset), start, days)
+        timesheets = _with_anomalies(timesheets, rng, ["Date"], **rates)
+        timesheets[CLICKUP_COLUMNS].to_csv(clickup_path, index=False, mode="w" if chunk == 0 else "a", header=chunk == 0)
+
+    return float_path, clickup_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default="data/raw")
+    parser.add_argument("--rows", type=int, default=10_000, help="ClickUp time entries")
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=300)
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--allocations-per-member", type=int, default=10)
+    parser.add_argument("--start-date", default="2023-01-01")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--null-rate", type=float, default=0.005)
+    parser.add_argument("--bad-date-rate", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    float_path, clickup_path = generate(
+        args.out, args.rows, args.members, args.projects, args.clients, args.tasks, args.allocations_per_member,
+        args.start_date, args.days, args.duplicate_rate, args.null_rate, args.bad_date_rate, args.seed,
+    )
+    print(f"Wrote {float_path} and {clickup_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Checks that the columnar validate_frame and the per-row model path agree on the same messy exports
+(same valid rows, same rejected rows) and compares their run times.
+Exits non-zero when the two paths disagree.
+
+    python benchmarks/validation_benchmark.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic_data import generate
+from models.data_models import ClickUpDataModel, FloatDataModel
+from scripts.extract import read_csv_typed, validate_rows
+from scripts.validation import validate_frame
+
+# numeric cells the typed reader and both validators have to agree on, written over random rows:
+# fractions, text, infinities and whole numbers on both sides of the int64 range
+MESSY_NUMBERS = {
+    "Estimated Hours": ["2.5", "abc", "inf", "-inf", "1e20", "-1e20", "9.3e18", "9223372036854775807",
+                        "-9223372036854775808", "1e18", "-3", "0"],
+    "Hours": ["-0.25", "abc", "inf", "1e20", "nan", "0"],
+}
+
+
+def with_messy_numbers(path: str, column: str, rate: float, seed: int):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    rng = np.random.default_rng(seed)
+    rows = np.flatnonzero(rng.random(len(df)) < rate)
+    df.loc[rows, column] = rng.choice(MESSY_NUMBERS[column], len(rows))
+    df.to_csv(path, index=False)
+
+
+def compare(path: str, model) -> bool:
+    df = read_csv_typed(path, model)
+
+    start = time.perf_counter()
+    columnar, _, columnar_rejected = validate_frame(df, model, return_rejected=True)
+    columnar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    per_row, per_row_rejected = validate_rows(df, model)
+    per_row_s = time.perf_counter() - start
+
+    # the rule names differ between the paths (check names vs pydantic error types), the rows may not
+    same_rejected = sorted(columnar_rejected.index) == sorted(per_row_rejected.index)
+    # categoricals from the typed read come back as plain values from the model instances
+    columnar = columnar.apply(lambda s: s.astype(object) if isinstance(s.dtype, pd.CategoricalDtype) else s)
+    try:
+        pd.testing.assert_frame_equal(columnar, per_row[columnar.columns], check_dtype=False)
+        same_valid = True
+    except AssertionError as e:
+        print(e)
+        same_valid = False
+
+    agree = same_rejected and same_valid
+    print(f"{model.__name__:>18} {len(df):>9} {len(columnar_rejected):>9} {columnar_s:>10.3f} {per_row_s:>10.3f}  "
+          f"{'yes' if agree else 'NO'}")
+    return agree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="ClickUp time entries")
+    parser.add_argument("--messy-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        float_path, clickup_path = generate(directory, args.rows, seed=args.seed)
+        with_messy_numbers(float_path, "Estimated Hours", args.messy_rate, args.seed)
+        with_messy_numbers(clickup_path, "Hours", args.messy_rate, args.seed)
+
+        print(f"{'model':>18} {'rows':>9} {'rejected':>9} {'columnar s':>10} {'per-row s':>10}  agree")
+        agree = [compare(float_path, FloatDataModel), compare(clickup_path, ClickUpDataModel)]
+    sys.exit(0 if all(agree) else 1)
+
+
+if __name__ == "__main__":
+    main()
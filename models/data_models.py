@@ -1,9 +1,18 @@
 
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import ClassVar, Optional, Tuple
 from datetime import datetime
 
+# Shared with the columnar validator in scripts/validation.py
+DATE_FORMAT = "%Y-%m-%d"
+BILLABLE_VALUES = ("yes", "no")
+# integer fields are loaded as int64 columns
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
 class FloatDataModel(BaseModel):
+    # fields identifying an allocation across exports, the other fields are its payload
+    natural_key: ClassVar[Tuple[str, ...]] = ("client", "project", "name", "task", "start_date")
+
     client: str = Field(..., alias="Client")
     project: str = Field(..., alias="Project")
     role: str = Field(..., alias="Role")
@@ -13,45 +22,32 @@ class FloatDataModel(BaseModel):
     end_date: datetime = Field(..., alias="End Date")
     estimated_hours: int = Field(..., alias="Estimated Hours")
 
-    @classmethod
     @field_validator("start_date", "end_date", mode="before")
+    @classmethod
     def parse_date(cls, value: str) -> datetime:
         """
         Parses the 'Date' field from string to datetime object.
         """
         try:
-            return datetime.strptime(value, "%Y-%m-%d")
+            return datetime.strptime(value, DATE_FORMAT)
         except ValueError as e:
             raise ValueError(f"Invalid date format: {value}. Expected YYYY-MM-DD.") from e
 
-    @classmethod
     @field_validator("estimated_hours", mode="before")
-    def validate_estimated_hours(cls, value):
-        """
-        Validates the 'Estimated Hours' field to ensure it is an integer.
-        """
-        if isinstance(value, float):
-            if value.is_integer():
-                return int(value)
-            else:
-                raise ValueError("Estimated Hours must be an integer")
-        elif not isinstance(value, int):
-            raise ValueError("Estimated Hours must be an integer")
-        return value
-
     @classmethod
-    @field_validator("estimated_hours", mode="before")
     def validate_estimated_hours(cls, value):
         """
         Validates the 'Estimated Hours' field to ensure it is an integer.
         """
         if isinstance(value, float):
             if value.is_integer():
-                return int(value)
+                value = int(value)
             else:
                 raise ValueError("Estimated Hours must be an integer")
         elif not isinstance(value, int):
             raise ValueError("Estimated Hours must be an integer")
+        if not INT64_MIN <= value <= INT64_MAX:
+            raise ValueError("Estimated Hours must fit in a 64-bit integer")
         return value
 
     class Config:
@@ -60,6 +56,9 @@ class FloatDataModel(BaseModel):
 
 
 class ClickUpDataModel(BaseModel):
+    # fields identifying a time entry across exports, the other fields are its payload
+    natural_key: ClassVar[Tuple[str, ...]] = ("client", "project", "name", "task", "date")
+
     client: str = Field(..., alias="Client")
     project: str = Field(..., alias="Project")
     name: str = Field(..., alias="Name")
@@ -69,32 +68,29 @@ class ClickUpDataModel(BaseModel):
     note: Optional[str] = Field(None, alias="Note")
     billable: str = Field(..., alias="Billable")
 
-    @classmethod
     @field_validator("date", mode="before")
+    @classmethod
     def parse_date(cls, value: str) -> datetime:
         """
         Parses the 'Date' field from string to datetime object.
         """
         try:
-            return datetime.strptime(value, "%Y-%m-%d")
+            return datetime.strptime(value, DATE_FORMAT)
         except ValueError as e:
             raise ValueError(f"Invalid date format: {value}. Expected YYYY-MM-DD.") from e
 
-    @classmethod
     @field_validator("billable")
+    @classmethod
     def validate_billable(cls, value: str) -> str:
         """
         Validates the 'Billable' field to ensure it contains either 'Yes' or 'No'.
         """
-        if value.strip().lower() == "yes":
+        if value.strip().lower() in BILLABLE_VALUES:
             return value
-        elif value.strip().lower() == "no":
-            return value
-        else:
-            raise ValueError("Billable field must be 'Yes' or 'No'.")
+        raise ValueError("Billable field must be 'Yes' or 'No'.")
 
-    @classmethod
     @field_validator("hours", mode="before")
+    @classmethod
     def validate_hours(cls, value: float) -> float:
         """
         Validates the 'Hours' field to ensure it is a positive float.
@@ -0,0 +1,104 @@
+import os
+import pandas as pd
+from typing import List, Optional
+from loguru import logger
+from utils.instrumentation import instrument
+
+
+class CsvFormat:
+    """
+    The original handoff: untyped, re-parsed on every read.
+    """
+    extension = "csv"
+
+    def write(self, df: pd.DataFrame, path: str):
+        df.to_csv(path, index=False)
+
+    def read(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        return pd.read_csv(path, usecols=columns)
+
+
+class ParquetFormat:
+    """
+    Compressed columnar files that keep dtypes (dates, categoricals), read with column projection.
+    """
+    extension = "parquet"
+
+    def __init__(self, compression: str = "zstd"):
+        self.compression = compression
+
+    def write(self, df: pd.DataFrame, path: str):
+        df.to_parquet(path, engine="pyarrow", compression=self.compression, index=False)
+
+    def read(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+class ArrowFormat:
+    """
+    Arrow IPC (Feather v2) files, memory mapped on read so only the projected columns are touched.
+    """
+    extension = "arrow"
+
+    def __init__(self, compression: Optional[str] = "lz4"):
+        self.compression = compression
+
+    def write(self, df: pd.DataFrame, path: str):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+
+    def read(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        import pyarrow as pa
+
+        # not closed here, zero-copy columns of the frame keep the mapping alive
+        source = pa.memory_map(path, "r")
+        schema = pa.ipc.open_file(source).schema
+        included = None if columns is None else [schema.get_field_index(column) for column in columns]
+        reader = pa.ipc.open_file(source, options=pa.ipc.IpcReadOptions(included_fields=included))
+        return reader.read_all().to_pandas()
+
+
+FORMATS = {
+    "csv": CsvFormat,
+    "parquet": ParquetFormat,
+    "arrow": ArrowFormat,
+}
+
+
+class ArtifactStore:
+    """
+    Named intermediate DataFrames handed from one DAG task to the next.
+    """
+
+    def __init__(self, directory: str, fmt: str = "parquet", **options):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown artifact format: {fmt}")
+        self.directory = directory
+        self.format = FORMATS[fmt](**options)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.{self.format.extension}")
+
+    @instrument()
+    def write(self, df: pd.DataFrame, name: str) -> str:
+        path = self.path(name)
+        os.makedirs(self.directory, exist_ok=True)
+        self.format.write(df, path)
+        logger.info(f"Wrote {len(df)} rows to {path}")
+        return path
+
+    @instrument()
+    def read(self, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        path = self.path(name)
+        if not os.path.exists(path):
+            logger.error(f"Artifact not found: {path}")
+            raise FileNotFoundError(path)
+        df = self.format.read(path, columns)
+        logger.info(f"Read {len(df)} rows from {path}")
+        return df
@@ -0,0 +1,249 @@
+"""
+Reprocesses a date range month by month, months in parallel, resumable:
+
+    python -m scripts.backfill --start 2023-01 --end 2024-06 --workers 4
+
+Each month is staged (its raw rows replaced from the cleaned export, then its staging dates refreshed) and
+published (its staging facts rebuilt, its prod partition built and swapped in with its rollups) on its own.
+Dimensions are upserted once between the two steps, since the facts of any month can reference any member.
+Completed steps are recorded in raw.backfill_progress; running the same range again resumes after them.
+"""
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+from sqlalchemy import text
+from loguru import logger
+from models.data_models import ClickUpDataModel, FloatDataModel
+from scripts import load_staging, star_schema
+from scripts.ingest import ingest_files
+from scripts.load_raw import copy_to_raw, create_raw_schema, record_touched_dates
+from scripts.run_pipeline import pipeline_settings
+from scripts.star_builder import FACT_FOREIGN_KEYS
+from scripts.star_schema import FOREIGN_KEYS_LOCK, month_start, next_month, partition_name, restore_dropped_foreign_keys
+from utils.db import get_engine
+from utils.instrumentation import instrument, measure, run_id
+
+engine = get_engine("bulk_load")
+
+# raw tables backfilled by month, with the date column their staging rows are refreshed by
+RAW_DATES = {"float_allocations": "start_date", "clickup_timesheets": "date"}
+DATASETS = {"float_allocations": ("float", FloatDataModel, "Float Data"),
+            "clickup_timesheets": ("clickup", ClickUpDataModel, "ClickUp Data")}
+STEPS = ("staged", "published")
+
+
+def months(start_date, end_date) -> List[date]:
+    """
+    The first day of every month from the month of `start_date` through the month of `end_date`.
+    """
+    month, last = month_start(pd.Timestamp(start_date).date()), month_start(pd.Timestamp(end_date).date())
+    found = []
+    while month <= last:
+        found.append(month)
+        month = next_month(month)
+    return found
+
+def completed_steps(backfill_id: str) -> Dict[str, set]:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT step, month FROM raw.backfill_progress WHERE backfill_id = :backfill_id"),
+            {"backfill_id": backfill_id},
+        ).fetchall()
+    done = {step: set() for step in STEPS}
+    for step, month in rows:
+        done[step].add(month)
+    return done
+
+def _record(backfill_id: str, month: date, step: str, rows: int, seconds: float):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO raw.backfill_progress (backfill_id, month, step, run_id, rows, seconds)
+            VALUES (:backfill_id, :month, :step, :run_id, :rows, :seconds)
+            ON CONFLICT (backfill_id, month, step) DO UPDATE SET
+                run_id = EXCLUDED.run_id, rows = EXCLUDED.rows, seconds = EXCLUDED.seconds, completed_at = now()
+        """), {"backfill_id": backfill_id, "month": month, "step": step, "run_id": run_id(), "rows": rows,
+               "seconds": round(seconds, 3)})
+
+def _by_month(frame: pd.DataFrame, column: str) -> Dict[date, pd.DataFrame]:
+    periods = pd.to_datetime(frame[column]).dt.to_period("M")
+    return {period.to_timestamp().date(): rows for period, rows in frame.groupby(periods, observed=True)}
+
+def _cleaned_exports(settings: dict) -> Dict[str, Dict[date, pd.DataFrame]]:
+    # the whole export is read and cleaned once, then split by month for the staging step
+    rows = {}
+    for table, (dataset, model, name) in DATASETS.items():
+        cleaned, _ = ingest_files(settings["input_patterns"][dataset], model, name,
+                                  settings["raw_data_dir"], settings["ingest_workers"])
+        rows[table] = _by_month(cleaned, RAW_DATES[table])
+    return rows
+
+@instrument()
+def stage_month(backfill_id: str, month: date, rows: Dict[str, pd.DataFrame]) -> int:
+    """
+    Replaces the month's rows of each raw table with `rows` (cleaned export rows dated in the month)
+    and refreshes the month's staging dates from them.
+    """
+    start = time.perf_counter()
+    lower, upper = month, next_month(month)
+    loaded = 0
+    with engine.begin() as conn:
+        for table, column in RAW_DATES.items():
+            conn.execute(text(f"DELETE FROM raw.{table} WHERE {column} >= :lower AND {column} < :upper"),
+                         {"lower": lower, "upper": upper})
+            record_touched_dates(conn, table, lower, upper - timedelta(days=1), null_dates=False)
+            if rows.get(table) is not None and len(rows[table]):
+                loaded += copy_to_raw(rows[table], table, mode="append", con=conn)
+    load_staging.refresh_staging_incremental(lower, upper - timedelta(days=1), create_tables=False)
+    _record(backfill_id, month, "staged", loaded, time.perf_counter() - start)
+    return loaded
+
+@instrument()
+def publish_month(backfill_id: str, month: date) -> int:
+    """
+    Rebuilds the month's staging facts and swaps the month's partition, with its rollups, into prod.
+    """
+    start = time.perf_counter()
+    lower, last = month, next_month(month) - timedelta(days=1)
+    star_schema.populate_fact_table(lower, last)
+    with engine.connect() as conn:
+        affected = month in star_schema.affected_months(conn, lower, last)
+    facts = 0
+    if affected:
+        star_schema.build_fact_partition(month)
+        star_schema.swap_fact_partition(month)
+        with engine.connect() as conn:
+            facts = conn.execute(text(f"SELECT COUNT(*) FROM prod.{partition_name(month)}")).scalar()
+    _record(backfill_id, month, "published", facts, time.perf_counter() - start)
+    return facts
+
+@contextmanager
+def _fact_foreign_keys_dropped(backfill_id: str):
+    """
+    Drops the staging fact foreign keys while months publish and adds them back, validated once, afterwards.
+    Facts are built with inner joins on the dimensions, and checking every row on insert has concurrent months
+    share locks on the same dimension rows. The definitions are recorded in raw.backfill_dropped_constraints
+    with the drop, so keys a killed backfill never added back are restored by the next one (or by
+    create_staging_star_schema); FOREIGN_KEYS_LOCK is held meanwhile, released with the session if it dies.
+    """
+    with engine.connect() as lock:
+        lock.execute(text(f"SELECT pg_advisory_lock({FOREIGN_KEYS_LOCK})"))
+        lock.commit()
+        try:
+            with engine.begin() as conn:
+                restored = restore_dropped_foreign_keys(conn)
+                if restored:
+                    logger.warning(f"Restored {restored} staging foreign keys dropped by a backfill that did not finish")
+                foreign_keys = conn.execute(text(FACT_FOREIGN_KEYS)).fetchall()
+                for name, definition in foreign_keys:
+                    conn.execute(text(f'ALTER TABLE staging.fact_timesheet DROP CONSTRAINT "{name}"'))
+                    conn.execute(text("""
+                        INSERT INTO raw.backfill_dropped_constraints (table_name, name, definition, backfill_id, run_id)
+                        VALUES ('staging.fact_timesheet', :name, :definition, :backfill_id, :run_id)
+                    """), {"name": name, "definition": definition, "backfill_id": backfill_id, "run_id": run_id()})
+            try:
+                yield
+            finally:
+                with engine.begin() as conn:
+                    restore_dropped_foreign_keys(conn)
+        finally:
+            lock.execute(text(f"SELECT pg_advisory_unlock({FOREIGN_KEYS_LOCK})"))
+            lock.commit()
+
+def _run_months(step: str, units: List[date], work: Callable, workers: int) -> Dict[date, int]:
+    """
+    Runs `work` for every month on `workers` threads. Months that fail do not stop the others,
+    the first failure is raised once all have run.
+    """
+    def run(month):
+        with measure(f"backfill.{step}") as record:
+            record.extra["month"] = str(month)
+            return work(month)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"backfill-{step}") as pool:
+        futures = {month: pool.submit(run, month) for month in units}
+
+    results, failures = {}, {}
+    for month, future in futures.items():
+        try:
+            results[month] = future.result()
+        except Exception as e:
+            failures[month] = e
+    if failures:
+        for month, e in failures.items():
+            logger.error(f"Backfill of {month:%Y-%m} failed while {step}: {e}")
+        logger.error(f"{len(failures)} of {len(units)} months failed while {step}, run the backfill again to resume")
+        raise next(iter(failures.values()))
+    return results
+
+@instrument()
+def backfill(start_date, end_date, workers: int = None, backfill_id: str = None, restart: bool = False) -> dict:
+    """
+    Reprocesses every month from `start_date` through `end_date`, `workers` months at a time
+    (pipeline.backfill_workers by default). Months already completed under `backfill_id` (by default
+    the range, e.g. "2023-01..2024-06") are skipped, unless `restart` clears their progress first.
+    Returns the rows staged and fact rows published per month.
+    """
+    settings = pipeline_settings()
+    workers = workers or settings["backfill_workers"]
+    units = months(start_date, end_date)
+    if not units:
+        raise ValueError(f"Empty backfill range: {start_date} to {end_date}")
+    backfill_id = backfill_id or f"{units[0]:%Y-%m}..{units[-1]:%Y-%m}"
+
+    create_raw_schema()
+    with engine.begin() as conn:
+        load_staging.create_staging_tables(conn)
+        if restart:
+            conn.execute(text("DELETE FROM raw.backfill_progress WHERE backfill_id = :backfill_id"),
+                         {"backfill_id": backfill_id})
+    star_schema.create_staging_star_schema()
+
+    done = completed_steps(backfill_id)
+    to_stage = [month for month in units if month not in done["staged"]]
+    to_publish = [month for month in units if month not in done["published"]]
+    logger.info(f"Backfill {backfill_id}: {len(units)} months, {len(to_stage)} to stage and {len(to_publish)} "
+                f"to publish on {workers} workers")
+
+    staged, published = {}, {}
+    if to_stage:
+        exports = _cleaned_exports(settings)
+        staged = _run_months(
+            "staging", to_stage,
+            lambda month: stage_month(backfill_id, month, {table: rows.get(month) for table, rows in exports.items()}),
+            workers,
+        )
+
+    if to_publish:
+        star_schema.populate_dimensions()
+        with engine.begin() as conn:
+            backfill_rollups = star_schema.prepare_prod_schema(conn)
+        with _fact_foreign_keys_dropped(backfill_id):
+            published = _run_months("publishing", to_publish, lambda month: publish_month(backfill_id, month), workers)
+        star_schema.finish_prod_rollups(backfill_rollups)
+
+    logger.info(f"Backfill {backfill_id} complete: {sum(staged.values())} rows staged, "
+                f"{sum(published.values())} fact rows published")
+    return {"backfill_id": backfill_id, "staged": staged, "published": published}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reprocess a date range month by month, resuming completed months.")
+    parser.add_argument("--start", required=True, help="first month (or any date in it), e.g. 2023-01")
+    parser.add_argument("--end", required=True, help="last month (or any date in it), included")
+    parser.add_argument("--workers", type=int, help="months processed at the same time (pipeline.backfill_workers)")
+    parser.add_argument("--id", dest="backfill_id", help="progress key, by default the month range")
+    parser.add_argument("--restart", action="store_true", help="forget recorded progress and redo every month")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    backfill(args.start, args.end, args.workers, args.backfill_id, args.restart)
+    logger.info(f"Backfill finished in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,267 +1,315 @@
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 from sqlalchemy import text
-from utils.db import engine as db_engine
+from utils.db import get_engine
+from utils.instrumentation import instrument, measure
 
-def data_quality_checks_raw(engine=db_engine):
-    logger.info("Running data quality checks on raw schema...")
+# read-only checks run on their own pool, away from the bulk loads
+db_engine = get_engine("dq")
+
+
+class Rule:
+    """
+    One data quality check. Rules on the same `source` (a table, optionally with joins) are answered
+    together by a single scan, each as one aggregate column. The value must be zero, or non-zero for
+    row count checks (expect_rows). A rule with its own `query` runs it separately.
+    """
+
+    def __init__(self, source: str, aggregate: str, description: str, expect_rows: bool = False, query: str = None):
+        self.source = source
+        self.aggregate = aggregate
+        self.description = description
+        self.expect_rows = expect_rows
+        self.query = query
+
+    def passed(self, value) -> bool:
+        return value > 0 if self.expect_rows else value == 0
+
+
+def violations(source: str, condition: str, description: str) -> Rule:
+    return Rule(source, f"COUNT(*) FILTER (WHERE {condition})", description)
+
+
+def row_count(source: str, description: str) -> Rule:
+    return Rule(source, "COUNT(*)", description, expect_rows=True)
+
+
+def query_rule(query: str, description: str) -> Rule:
+    return Rule(None, None, description, query=f"SELECT COUNT(*) FROM ({query}) AS q")
+
+
+class DataQualityReport:
+    """
+    Outcome of every rule of a check run, in rule order.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.results = []
+
+    def add(self, check: str, source: str, value, passed: bool, error: str = None):
+        self.results.append({"check": check, "source": source, "value": value, "passed": passed, "error": error})
 
-    def check_missing_values(engine):
-        # check for missing valus in critical fields
-        critical_checks = [
-            ("raw.float_allocations", "name"),
-            ("raw.float_allocations", "project"),
-            ("raw.clickup_timesheets", "project"),
-            ("raw.clickup_timesheets", "name"),
-            ("raw.clickup_timesheets", "date"),
-        ]
-
-        for table, column in critical_checks:
-            query = text(f"SELECT COUNT(*) FROM {table} WHERE {column} IS NULL")
-            result = engine.execute(query).fetchone()
-            if result[0] > 0:
-                logger.error(f"Data quality check failed: Found {result[0]} missing values in {column} of table {table}")
-                raise
+    @property
+    def passed(self) -> bool:
+        return all(result["passed"] for result in self.results)
+
+    @property
+    def failures(self) -> list:
+        return [result for result in self.results if not result["passed"]]
+
+    def log(self):
+        for result in self.results:
+            if result["error"]:
+                logger.error(f"Data quality check errored: {result['check']} ({result['error']})")
+            elif result["passed"]:
+                logger.info(f"Data quality check passed: {result['check']}")
             else:
-                logger.info(f"Data quality check passed: No missing values in {column} of table {table}")
+                logger.error(f"Data quality check failed: {result['check']} (Count: {result['value']})")
+
+    def raise_for_failures(self):
+        if not self.passed:
+            failed = "; ".join(f"{result['check']} ({result['error'] or result['value']})" for result in self.failures)
+            raise ValueError(f"{self.name}: {len(self.failures)} of {len(self.results)} checks failed: {failed}")
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, "passed": self.passed, "results": self.results}
+
+
+def run_rules(name: str, rules: list, engine=db_engine, max_workers: int = 4) -> DataQualityReport:
+    """
+    Runs every rule with one scan per source, sources concurrently on pooled connections.
+    """
+    groups = {}
+    for rule in rules:
+        groups.setdefault(rule.query or rule.source, []).append(rule)
+
+    def scan(source, group):
+        # one stage per scan, named after the scanned table (or the check with its own query)
+        label = group[0].description if group[0].query else source.split()[0]
+        with measure(f"data_quality.{label}") as record, engine.connect() as conn:
+            record.extra["checks"] = len(group)
+            if group[0].query:
+                return [conn.execute(text(group[0].query)).scalar()]
+            columns = ", ".join(rule.aggregate for rule in group)
+            return list(conn.execute(text(f"SELECT {columns} FROM {source}")).fetchone())
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {source: pool.submit(scan, source, group) for source, group in groups.items()}
+
+    values = {}
+    for source, group in groups.items():
+        try:
+            values.update(zip(map(id, group), futures[source].result()))
+        except Exception as e:
+            values.update((id(rule), e) for rule in group)
 
-    def check_unique_constraints(engine):
-        # Check for unique constraints (such as combination of client, team member, project, and date)
-        unique_check_query = """
+    report = DataQualityReport(name)
+    for rule in rules:
+        value = values[id(rule)]
+        source = rule.source or "query"
+        if isinstance(value, Exception):
+            report.add(rule.description, source, None, False, str(value))
+        else:
+            report.add(rule.description, source, value, rule.passed(value))
+    return report
+
+
+RAW_RULES = [
+    # check for missing valus in critical fields
+    violations("raw.float_allocations", "name IS NULL", "No missing values in name of table raw.float_allocations"),
+    violations("raw.float_allocations", "project IS NULL", "No missing values in project of table raw.float_allocations"),
+    violations("raw.clickup_timesheets", "project IS NULL", "No missing values in project of table raw.clickup_timesheets"),
+    violations("raw.clickup_timesheets", "name IS NULL", "No missing values in name of table raw.clickup_timesheets"),
+    violations("raw.clickup_timesheets", "date IS NULL", "No missing values in date of table raw.clickup_timesheets"),
+
+    # Check for unique constraints (such as combination of client, team member, project, and date)
+    query_rule("""
         SELECT client, name, project, task, date, COUNT(*)
         FROM raw.clickup_timesheets
         GROUP BY client, name, project, task, date
         HAVING COUNT(*) > 1
-        """
-        result = engine.execute(text(unique_check_query)).fetchall()
-        if result:
-            logger.error(f"Data quality check failed: Duplicate entries found in ClickUp timesheets for client/name/project/date combination")
-            raise
-        else:
-            logger.info("Data quality check passed: No duplicate entries in ClickUp timesheets for name/project/date")
+    """, "No duplicate entries in ClickUp timesheets for client/name/project/task/date"),
 
-    def check_referential_integrity(engine):
-        # Check referential integrity between Float and ClickUp data
-        referential_query = """
+    # Check referential integrity between Float and ClickUp data
+    query_rule("""
         SELECT DISTINCT name
         FROM raw.clickup_timesheets
         WHERE name NOT IN (SELECT DISTINCT name FROM raw.float_allocations)
-        """
-        result = engine.execute(text(referential_query)).fetchall()
-        if result:
-            logger.error(f"Data quality check failed: {len(result)} team members found in ClickUp that do not exist in Float Allocations")
-            raise
-        else:
-            logger.info("Data quality check passed: Referential integrity between ClickUp and Float data is maintained")
-
-    def check_numeric_ranges(engine):
-        # Validate ranges for numeric columns
-        range_checks = [
-            ("raw.float_allocations", "estimated_hours", "estimated_hours >= 0"),
-            ("raw.clickup_timesheets", "hours", "hours >= 0")
-        ]
-
-        for table, column, condition in range_checks:
-            query = text(f"SELECT COUNT(*) FROM {table} WHERE NOT ({condition})")
-            result = engine.execute(query).fetchone()
-            if result[0] > 0:
-                logger.error(f"Data quality check failed: {result[0]} invalid values in {column} of table {table}")
-                raise
+    """, "Every ClickUp team member exists in Float Allocations"),
+
+    # Validate ranges for numeric columns
+    violations("raw.float_allocations", "NOT (estimated_hours >= 0)", "All values in estimated_hours of table raw.float_allocations are within the valid range"),
+    violations("raw.clickup_timesheets", "NOT (hours >= 0)", "All values in hours of table raw.clickup_timesheets are within the valid range"),
+]
+
+# Fact scans join every dimension on its primary key, so each fact row appears once
+STAGING_FACT = """
+    staging.fact_timesheet ft
+    LEFT JOIN staging.dim_team_member tm ON ft.team_member_id = tm.team_member_id
+    LEFT JOIN staging.dim_project dp ON ft.project_id = dp.project_id
+    LEFT JOIN staging.dim_task dt ON ft.task_id = dt.task_id
+"""
+
+STAGING_RULES = [
+    # Null Value Checks
+    violations(STAGING_FACT, "ft.date_id IS NULL", "Null values found in 'date_id' column of 'fact_timesheet'"),
+    violations(STAGING_FACT, "ft.team_member_id IS NULL", "Null values found in 'team_member_id' column of 'fact_timesheet'"),
+    violations(STAGING_FACT, "ft.project_id IS NULL", "Null values found in 'project_id' column of 'fact_timesheet'"),
+    violations(STAGING_FACT, "ft.task_id IS NULL", "Null values found in 'task_id' column of 'fact_timesheet'"),
+
+    # Duplicate Checks in Dimension Tables
+    Rule("staging.dim_team_member", "COUNT(name) - COUNT(DISTINCT name)", "Duplicate entries found in 'dim_team_member' table"),
+    Rule("staging.dim_project", "COUNT(project_name) - COUNT(DISTINCT project_name)", "Duplicate entries found in 'dim_project' table"),
+    Rule("staging.dim_task", "COUNT(task_name) - COUNT(DISTINCT task_name)", "Duplicate entries found in 'dim_task' table"),
+
+    # Referential Integrity Checks
+    violations(STAGING_FACT, "tm.team_member_id IS NULL", "Referential integrity check failed: 'team_member_id' in 'fact_timesheet' not found in 'dim_team_member'"),
+    violations(STAGING_FACT, "dp.project_id IS NULL", "Referential integrity check failed: 'project_id' in 'fact_timesheet' not found in 'dim_project'"),
+    violations(STAGING_FACT, "dt.task_id IS NULL", "Referential integrity check failed: 'task_id' in 'fact_timesheet' not found in 'dim_task'"),
+
+    # Range and Outlier Checks
+    violations(STAGING_FACT, "ft.log_hours < 0", "Negative values found in 'log_hours' column of 'fact_timesheet'"),
+    violations(STAGING_FACT, "ft.est_project_hours < 0", "Negative values found in 'est_project_hours' column of 'fact_timesheet'"),
+    violations(STAGING_FACT, "ft.log_hours > 1000", "Unrealistically high values found in 'log_hours' column of 'fact_timesheet'"),
+
+    # Consistency Checks
+    violations(STAGING_FACT, "ft.log_hours > ft.est_project_hours", "Inconsistent data: 'log_hours' exceeds 'estimated_hours' in 'fact_timesheet'"),
+]
+
+PROD_FACT = """
+    prod.fact_timesheet ft
+    LEFT JOIN prod.dim_team_member tm ON ft.team_member_id = tm.team_member_id
+    LEFT JOIN prod.dim_project dp ON ft.project_id = dp.project_id
+    LEFT JOIN prod.dim_task dt ON ft.task_id = dt.task_id
+"""
+
+PROD_RULES = [
+    # row count verification
+    row_count("prod.dim_team_member", "Row count check for 'dim_team_member' table"),
+    row_count("prod.dim_project", "Row count check for 'dim_project' table"),
+    row_count("prod.dim_task", "Row count check for 'dim_task' table"),
+    row_count(PROD_FACT, "Row count check for 'fact_timesheet' table"),
+
+    # Null value checks
+    violations(PROD_FACT, "ft.team_member_id IS NULL", "Null values check in 'team_member_id' column"),
+    violations(PROD_FACT, "ft.project_id IS NULL", "Null values check in 'project_id' column"),
+    violations(PROD_FACT, "ft.task_id IS NULL", "Null values check in 'task_id' column"),
+    violations(PROD_FACT, "ft.date_id IS NULL", "Null values check in 'date_id' column"),
+
+    # data integrity checks
+    violations(PROD_FACT, "tm.team_member_id IS NULL", "Foreign key relationship for 'team_member_id' in 'fact_timesheet'"),
+    violations(PROD_FACT, "dp.project_id IS NULL", "Foreign key relationship for 'project_id' in 'fact_timesheet'"),
+    violations(PROD_FACT, "dt.task_id IS NULL", "Foreign key relationship for 'task_id' in 'fact_timesheet'"),
+
+    # rollups in step with the facts they summarize, months whose totals differ
+    query_rule("""
+        SELECT month
+        FROM (
+            SELECT CAST(date_trunc('month', date) AS DATE) AS month, SUM(log_hours) AS log_hours, COUNT(*) AS entries
+            FROM prod.fact_timesheet
+            GROUP BY 1
+        ) f
+        FULL JOIN (
+            SELECT period_start AS month, SUM(log_hours) AS log_hours, SUM(entries) AS entries
+            FROM prod.rollup_monthly
+            GROUP BY 1
+        ) r USING (month)
+        WHERE f.entries IS DISTINCT FROM r.entries OR ABS(f.log_hours - r.log_hours) > 1e-6 * GREATEST(ABS(f.log_hours), 1)
+    """, "Monthly rollup totals match 'fact_timesheet'"),
+]
+
+PROD_DATA_TYPES = {
+    "prod.dim_date": {
+        "date_id": "integer",
+        "date": "date",
+        "day_of_week": "text",
+        "day": "integer",
+        "month": "integer",
+        "year": "integer",
+        "is_weekend": "boolean"
+    },
+    "prod.dim_team_member": {
+        "team_member_id": "integer",
+        "name": "text",
+        "role": "text",
+    },
+    "prod.dim_project": {
+        "project_id": "integer",
+        "project_name": "text",
+        "client": "text",
+    },
+    "prod.dim_task": {
+        "task_id": "integer",
+        "task_name": "text",
+    },
+    "prod.fact_timesheet": {
+        "date_id": "integer",
+        "team_member_id": "integer",
+        "project_id": "integer",
+        "task_id": "integer",
+        "log_hours": "double precision",
+        "est_project_hours": "integer",
+        "is_billable": "boolean",
+    }
+}
+
+
+@instrument()
+def check_data_types(engine, expected_data_types: dict, report: DataQualityReport):
+    # one catalog query for every expected column
+    schemas = sorted({table.split(".")[0] for table in expected_data_types})
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT table_schema || '.' || table_name, column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = ANY(:schemas)
+        """), {"schemas": schemas}).fetchall()
+    actual_types = {(table, column): data_type for table, column, data_type in rows}
+
+    for table, columns in expected_data_types.items():
+        for column, expected_type in columns.items():
+            actual_type = actual_types.get((table, column))
+            check = f"Data type of column '{column}' in '{table}' is '{expected_type}'"
+            if actual_type is None:
+                report.add(check, table, None, False, f"Column '{column}' not found in '{table}'")
             else:
-                logger.info(f"Data quality check passed: All values in {column} of table {table} are within the valid range")
+                report.add(check, table, actual_type, actual_type == expected_type)
 
-    check_missing_values(engine)
-    check_unique_constraints(engine)
-    check_referential_integrity(engine)
-    check_numeric_ranges(engine)
 
-def data_quality_checks_staging(engine=db_engine):
+@instrument()
+def data_quality_checks_raw(engine=db_engine) -> DataQualityReport:
+    logger.info("Running data quality checks on raw schema...")
+    report = run_rules("Raw data quality checks", RAW_RULES, engine)
+    report.log()
+    report.raise_for_failures()
+    return report
+
+
+@instrument()
+def data_quality_checks_staging(engine=db_engine) -> DataQualityReport:
     """
     Run a series of data quality checks on the data in the staging schema.
     Ensures data integrity before migration to the production schema.
     """
     logger.info("Running data quality checks on the staging star schema...")
+    report = run_rules("Staging data quality checks", STAGING_RULES, engine)
+    report.log()
+    report.raise_for_failures()
+    return report
+
 
-    def run_checks(engine, checks):
-        # Execute each check and log the results
-        with engine.connect() as conn:
-            for query, error_message in checks:
-                result = conn.execute(text(query)).fetchone()
-                if result[0] > 0:
-                    logger.error(f"Data quality check failed: {error_message} (Count: {result[0]})")
-                    raise
-                else:
-                    logger.info(f"Data quality check passed: {error_message}")
-
-    checks = [
-        # Null Value Checks
-        ("SELECT COUNT(*) FROM staging.fact_timesheet WHERE date_id IS NULL", "Null values found in 'date_id' column of 'fact_timesheet'"),
-        ("SELECT COUNT(*) FROM staging.fact_timesheet WHERE team_member_id IS NULL", "Null values found in 'team_member_id' column of 'fact_timesheet'"),
-        ("SELECT COUNT(*) FROM staging.fact_timesheet WHERE project_id IS NULL", "Null values found in 'project_id' column of 'fact_timesheet'"),
-        ("SELECT COUNT(*) FROM staging.fact_timesheet WHERE task_id IS NULL", "Null values found in 'task_id' column of 'fact_timesheet'"),
-
-        # Duplicate Checks in Dimension Tables
-        ("SELECT COUNT(name) - COUNT(DISTINCT name) FROM staging.dim_team_member", "Duplicate entries found in 'dim_team_member' table"),
-        ("SELECT COUNT(project_name) - COUNT(DISTINCT project_name) FROM staging.dim_project", "Duplicate entries found in 'dim_project' table"),
-        ("SELECT COUNT(task_name) - COUNT(DISTINCT task_name) FROM staging.dim_task", "Duplicate entries found in 'dim_task' table"),
-
-        # Referential Integrity Checks
-        ("""
-        SELECT COUNT(*)
-        FROM staging.fact_timesheet ft
-        LEFT JOIN staging.dim_team_member tm ON ft.team_member_id = tm.team_member_id
-        WHERE tm.team_member_id IS NULL
-        """, "Referential integrity check failed: 'team_member_id' in 'fact_timesheet' not found in 'dim_team_member'"),
-
-        ("""
-        SELECT COUNT(*)
-        FROM staging.fact_timesheet ft
-        LEFT JOIN staging.dim_project dp ON ft.project_id = dp.project_id
-        WHERE dp.project_id IS NULL
-        """, "Referential integrity check failed: 'project_id' in 'fact_timesheet' not found in 'dim_project'"),
-
-        ("""
-        SELECT COUNT(*)
-        FROM staging.fact_timesheet ft
-        LEFT JOIN staging.dim_task dt ON ft.task_id = dt.task_id
-        WHERE dt.task_id IS NULL
-        """, "Referential integrity check failed: 'task_id' in 'fact_timesheet' not found in 'dim_task'"),
-
-        # Range and Outlier Checks
-        ("SELECT COUNT(*) FROM staging.fact_timesheet WHERE log_hours < 0", "Negative values found in 'log_hours' column of 'fact_timesheet'"),
-        ("SELECT COUNT(*) FROM staging.fact_timesheet WHERE est_project_hours < 0", "Negative values found in 'est_project_hours' column of 'fact_timesheet'"),
-        ("SELECT COUNT(*) FROM staging.fact_timesheet WHERE log_hours > 1000", "Unrealistically high values found in 'log_hours' column of 'fact_timesheet'"),
-
-        # Consistency Checks
-        ("""
-        SELECT COUNT(*)
-        FROM staging.fact_timesheet
-        WHERE log_hours > est_project_hours
-        """, "Inconsistent data: 'log_hours' exceeds 'estimated_hours' in 'fact_timesheet'")
-    ]
-
-    run_checks(engine, checks)
-
-def run_prod_validation(engine=db_engine):
+@instrument()
+def run_prod_validation(engine=db_engine) -> DataQualityReport:
     """
     Perform final validation checks on the production schema
     to ensure data integrity before marking the pipeline as complete.
     """
     logger.info("Running final validation checks on the production schema...")
+    report = run_rules("Final validation checks", PROD_RULES, engine)
+    check_data_types(engine, PROD_DATA_TYPES, report)
+    report.log()
+    report.raise_for_failures()
 
-    def run_validation_checks(engine, validation_checks):
-        with engine.connect() as conn:
-            for query, validation_message in validation_checks:
-                result = conn.execute(text(query)).fetchone()
-                row_count = result[0]
-                if "Row count check" in validation_message and row_count == 0:
-                    logger.error(f"Final validation check failed: {validation_message} (Row count: {row_count})")
-                    raise ValueError(f"Final validation check failed: {validation_message} (Row count: {row_count})")
-                elif "Row count check" not in validation_message and row_count != 0:
-                    logger.error(f"Final validation check failed: {validation_message} (Discrepancy: {row_count})")
-                    raise
-                else:
-                    logger.info(f"Validation check passed: {validation_message}")
-
-    def check_data_types(engine, expected_data_types):
-        # data type checks
-        for table, columns in expected_data_types.items():
-            logger.info(f"Performing data type checks for table: {table}")
-            table_name = table.split('.')[-1]
-            for column, expected_type in columns.items():
-                type_query = f"""
-                        SELECT data_type
-                        FROM information_schema.columns
-                        WHERE table_schema = '{table.split('.')[0]}'
-                          AND table_name = '{table_name}'
-                          AND column_name = '{column}';
-                        """
-                with engine.connect() as conn:
-                    actual_type_result = conn.execute(text(type_query)).fetchone()
-                    if actual_type_result is None:
-                        logger.error(f"Column '{column}' not found in '{table}'")
-                        raise ValueError(f"Column '{column}' not found in '{table}'")
-
-                    actual_type = actual_type_result[0]
-                    if actual_type != expected_type:
-                        logger.error(
-                            f"Data type mismatch for column '{column}' in '{table}': expected '{expected_type}', found '{actual_type}'")
-                        raise TypeError(
-                            f"Data type mismatch for column '{column}' in '{table}': expected '{expected_type}', found '{actual_type}'")
-                    else:
-                        logger.info(f"Data type check passed for column '{column}' in '{table}': '{actual_type}'")
-
-    validation_checks = [
-        # row count verification
-        ("SELECT COUNT(*) FROM prod.dim_team_member", "Row count check for 'dim_team_member' table"),
-        ("SELECT COUNT(*) FROM prod.dim_project", "Row count check for 'dim_project' table"),
-        ("SELECT COUNT(*) FROM prod.dim_task", "Row count check for 'dim_task' table"),
-        ("SELECT COUNT(*) FROM prod.fact_timesheet", "Row count check for 'fact_timesheet' table"),
-
-        # Null value checks
-        ("SELECT COUNT(*) FROM prod.fact_timesheet WHERE team_member_id IS NULL", "Null values check in 'team_member_id' column"),
-        ("SELECT COUNT(*) FROM prod.fact_timesheet WHERE project_id IS NULL", "Null values check in 'project_id' column"),
-        ("SELECT COUNT(*) FROM prod.fact_timesheet WHERE task_id IS NULL", "Null values check in 'task_id' column"),
-        ("SELECT COUNT(*) FROM prod.fact_timesheet WHERE date_id IS NULL", "Null values check in 'date_id' column"),
-
-        # data integrity checks
-        ("""
-        SELECT COUNT(*)
-        FROM prod.fact_timesheet ft
-        LEFT JOIN prod.dim_team_member tm ON ft.team_member_id = tm.team_member_id
-        WHERE tm.team_member_id IS NULL
-        """, "Foreign key relationship for 'team_member_id' in 'fact_timesheet'"),
-
-        ("""
-        SELECT COUNT(*)
-        FROM prod.fact_timesheet ft
-        LEFT JOIN prod.dim_project dp ON ft.project_id = dp.project_id
-        WHERE dp.project_id IS NULL
-        """, "Foreign key relationship for 'project_id' in 'fact_timesheet'"),
-
-        ("""
-        SELECT COUNT(*)
-        FROM prod.fact_timesheet ft
-        LEFT JOIN prod.dim_task dt ON ft.task_id = dt.task_id
-        WHERE dt.task_id IS NULL
-        """, "Foreign key relationship for 'task_id' in 'fact_timesheet'")
-    ]
-
-    expected_data_types = {
-        "prod.dim_date": {
-            "date_id": "integer",
-            "date": "date",
-            "day_of_week": "text",
-            "day": "integer",
-            "month": "integer",
-            "year": "integer",
-            "is_weekend": "boolean"
-        },
-        "prod.dim_team_member": {
-            "team_member_id": "integer",
-            "name": "text",
-            "role": "text",
-        },
-        "prod.dim_project": {
-            "project_id": "integer",
-            "project_name": "text",
-            "client": "text",
-        },
-        "prod.dim_task": {
-            "task_id": "integer",
-            "task_name": "text",
-        },
-        "prod.fact_timesheet": {
-            "date_id": "integer",
-            "team_member_id": "integer",
-            "project_id": "integer",
-            "task_id": "integer",
-            "log_hours": "double precision",
-            "est_project_hours": "integer",
-            "is_billable": "boolean",
-        }
-    }
-
-    run_validation_checks(engine, validation_checks)
-    check_data_types(engine, expected_data_types)
-
-    logger.info("All data quality checks passed successfully.")
\ No newline at end of file
+    logger.info("All data quality checks passed successfully.")
+    return report
@@ -1,12 +1,85 @@
 
 import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from datetime import datetime
 from loguru import logger
+from pydantic import ValidationError
 from models.data_models import FloatDataModel, ClickUpDataModel
-from typing import List
+from scripts.validation import build_rules, validate_frame, log_rejections
+from scripts.quarantine import quarantine_rows
+from utils.instrumentation import instrument
+from typing import Dict, List, Tuple
 
+# Text fields with few distinct values, read dictionary encoded (categoricals in pandas)
+CATEGORY_FIELDS = ("client", "project", "role", "task", "billable")
+DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+# how pyarrow reports a value its column type cannot hold, as opposed to a structural CSV error
+CONVERSION_ERROR = "CSV conversion error"
 
-def extract_and_validate(file_path: str, model):
+
+def read_schema(model) -> dict:
+    """
+    CSV column types keyed by field alias. Dates stay dictionary encoded strings: the validator parses
+    each distinct value once with the model's date format, telling bad dates from missing ones.
+    Numbers are read as float64, the validator decides which ones are valid integers.
+    """
+    schema = {}
+    for rule in build_rules(model):
+        if rule["type"] is datetime or rule["name"] in CATEGORY_FIELDS:
+            schema[rule["alias"]] = DICTIONARY
+        elif rule["type"] is str:
+            schema[rule["alias"]] = pa.string()
+        else:
+            schema[rule["alias"]] = pa.float64()
+    return schema
+
+def numeric_columns(schema: dict) -> list:
+    return [alias for alias, column_type in schema.items() if pa.types.is_floating(column_type)]
+
+def numbers_or_text(values: pd.Series) -> pd.Series:
+    # a non-numeric value in a numeric column: numbers are kept, the other values stay strings
+    # for validation to reject, one row at a time
+    numbers = pd.to_numeric(values, errors="coerce")
+    return numbers.astype(object).where(numbers.notna() | values.isna(), values)
+
+def read_csv_typed(file_path: str, model) -> pd.DataFrame:
+    """
+    Reads only the model's columns with explicit types, parsed on all cores by the pyarrow CSV reader.
+    Missing columns come back empty, so validation reports them per row like before. A file with a non-number
+    in a numeric column is read again with those columns as text; a malformed file raises pyarrow.ArrowInvalid.
+    """
+    schema = read_schema(model)
+
+    def read(column_types):
+        convert_options = pacsv.ConvertOptions(
+            column_types=column_types,
+            include_columns=list(schema),
+            include_missing_columns=True,
+            strings_can_be_null=True,
+        )
+        return pacsv.read_csv(file_path, read_options=pacsv.ReadOptions(use_threads=True), convert_options=convert_options)
+
+    try:
+        return read(schema).to_pandas()
+    except pa.ArrowInvalid as e:
+        # only a value that is not a number is retried, a malformed file ("CSV parse error") fails as it is
+        if CONVERSION_ERROR not in str(e):
+            raise e
+        logger.warning(f"Typed read of {file_path} failed ({e}), reading numeric columns as text")
+
+    numeric = numeric_columns(schema)
+    df = read({**schema, **{alias: pa.string() for alias in numeric}}).to_pandas()
+    for alias in numeric:
+        df[alias] = numbers_or_text(df[alias])
+    return df
+
+def validate_file(file_path: str, model, vectorized: bool = True, quarantine: bool = True) -> Tuple[pd.DataFrame, Dict[str, int], int]:
+    """
+    Reads and validates a CSV export. Returns the valid rows (possibly none), rejected row counts per rule
+    and the number of rows read.
+    """
     logger.info(f"Extracting data from {file_path}")
 
     if not os.path.exists(file_path):
@@ -14,25 +87,53 @@ def extract_and_validate(file_path: str, model):
         raise FileNotFoundError
 
     try:
-        df = pd.read_csv(file_path)
+        df = read_csv_typed(file_path, model)
     except Exception as e:
         logger.error(f"Unable to read CSV file {file_path}: {e}")
         raise e
 
-    def validate_row(row):
-        try:
-            return model(**row.to_dict()).dict()
-        except Exception as e:
-            logger.error(f"Data validation error at row {row.name}: {e}")
+    if vectorized:
+        validated_data, rejections, rejected = validate_frame(df, model, return_rejected=True)
+    else:
+        validated_data, rejected = validate_rows(df, model)
+        rejections = rejected.value_counts().to_dict()
 
+    log_rejections(rejections, file_path)
+    if quarantine:
+        quarantine_rows(df.loc[rejected.index], rejected, file_path)
+    return validated_data, rejections, len(df)
 
-    validated_data = df.apply(validate_row, axis=1).dropna()
-
+@instrument()
+def extract_and_validate(file_path: str, model, vectorized: bool = True, quarantine: bool = True):
+    """
+    Reads and validates a CSV export. Rejected rows are not logged one by one: they go to
+    raw.rejected_rows in one bulk write (unless quarantine is off) and only counts per rule are logged.
+    """
+    validated_data, _, _ = validate_file(file_path, model, vectorized, quarantine)
     if validated_data.empty:
         logger.warning(f"No valid data extracted from {file_path}")
         return None
 
     logger.info(f"Extracted {len(validated_data)} valid data rows from {file_path}")
-    return pd.json_normalize(validated_data.reset_index(drop=True).tolist())
+    return validated_data
 
+def validate_rows(df: pd.DataFrame, model):
+    """
+    Validates row by row with model instances. Returns the valid rows and, for every rejected row,
+    its first error as "field: error type", like validate_frame(return_rejected=True).
+    """
+    errors = {}
 
+    def validate_row(row):
+        try:
+            # empty cells are missing fields, not NaN values
+            return model(**row.dropna().to_dict()).dict()
+        except ValidationError as e:
+            error = e.errors()[0]
+            errors[row.name] = f"{'.'.join(str(loc) for loc in error['loc'])}: {error['type']}"
+        except Exception as e:
+            errors[row.name] = f"row: {type(e).__name__}"
+
+    validated_data = df.apply(validate_row, axis=1).dropna()
+    rejected = pd.Series(errors, index=list(errors), dtype="category")
+    return pd.json_normalize(validated_data.reset_index(drop=True).tolist()), rejected
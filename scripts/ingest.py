@@ -0,0 +1,115 @@
+import glob
+import multiprocessing
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+from loguru import logger
+from scripts.extract import validate_file
+from scripts.transform import clean_data
+from utils.db import dispose_engines_after_fork
+from utils.instrumentation import current_stage, instrument
+
+
+def shard_paths(pattern: str, directory: str = "") -> List[str]:
+    """
+    The files matching a glob pattern (relative to `directory`), sorted so shards merge in a stable order.
+    """
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+    if not paths:
+        logger.error(f"No input file matches {os.path.join(directory, pattern)}")
+        raise FileNotFoundError(os.path.join(directory, pattern))
+    return paths
+
+def _init_worker():
+    # forked from the task process: own database connections, and one core each for the pyarrow reader
+    dispose_engines_after_fork()
+    pa.set_cpu_count(1)
+    pa.set_io_thread_count(1)
+
+def ingest_shard(file_path: str, model, dataset_name: str, quarantine: bool = True) -> Tuple[pd.DataFrame, np.ndarray, dict]:
+    """
+    Validates and cleans one file. Returns the cleaned rows, the hash of each of them as validated (before
+    cleaning, which is what clean_data deduplicates on) and the file's row and rejection counts.
+    """
+    start = time.perf_counter()
+    validated, rejections, rows_read = validate_file(file_path, model, quarantine=quarantine)
+    # validated rows are numbered from 0, so cleaned index labels are positions in `hashes`
+    hashes = pd.util.hash_pandas_object(validated, index=False).to_numpy()
+    cleaned = clean_data(validated, f"{dataset_name} ({os.path.basename(file_path)})")
+    stats = {
+        "file": file_path,
+        "rows_read": rows_read,
+        "rows_valid": len(validated),
+        "rows_rejected": sum(rejections.values()),
+        "rejections": rejections,
+        "rows_cleaned": len(cleaned),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    return cleaned, hashes[cleaned.index.to_numpy()], stats
+
+def merge_shards(frames: List[pd.DataFrame], hashes: List[np.ndarray]) -> Tuple[pd.DataFrame, int]:
+    """
+    Concatenates cleaned shards in order and drops the rows an earlier shard already had, so the result
+    is what clean_data gives on all the files read as one. Categoricals keep one union of categories.
+    Returns the merged rows and the number of cross-shard duplicates dropped.
+    """
+    hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+    first = ~pd.Series(hashes).duplicated().to_numpy()
+    rows = np.flatnonzero(first)
+
+    columns = {}
+    for column in frames[0].columns:
+        parts = [frame[column] for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            values = pd.api.types.union_categoricals([part.array for part in parts], ignore_order=True)
+        else:
+            values = pd.concat(parts, ignore_index=True).array
+        columns[column] = values.take(rows)
+    return pd.DataFrame(columns, copy=False), int(len(hashes) - len(rows))
+
+@instrument()
+def ingest_files(pattern: str, model, dataset_name: str, directory: str = "", workers: int = None,
+                 quarantine: bool = True) -> Tuple[pd.DataFrame, List[dict]]:
+    """
+    Validates and cleans every file matching `pattern` on a pool of `workers` processes (one per core by
+    default) and merges the results. Returns the cleaned rows and per-file stats, in file order.
+    A single file, or a single worker, runs in this process.
+    """
+    paths = shard_paths(pattern, directory)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    logger.info(f"Ingesting {len(paths)} {dataset_name} files on {workers} processes")
+
+    if workers == 1:
+        results = [ingest_shard(path, model, dataset_name, quarantine) for path in paths]
+    else:
+        # fork: workers start without re-importing pandas and the pipeline modules. Not from a stage thread of
+        # scripts/run_pipeline.py, other stages may hold locks the child would inherit held
+        main_thread = threading.current_thread() is threading.main_thread()
+        context = multiprocessing.get_context("fork" if main_thread else "forkserver")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+            results = list(pool.map(
+                ingest_shard, paths, [model] * len(paths), [dataset_name] * len(paths), [quarantine] * len(paths)
+            ))
+
+    frames, hashes, stats = (list(parts) for parts in zip(*results))
+    merged, duplicates = merge_shards(frames, hashes)
+
+    for entry in stats:
+        logger.info(
+            f"{entry['file']}: {entry['rows_read']} rows read, {entry['rows_rejected']} rejected, "
+            f"{entry['rows_cleaned']} kept after cleaning ({entry['seconds']}s)"
+        )
+    if duplicates:
+        logger.warning(f"{duplicates} rows of {dataset_name} duplicated rows of an earlier file, removed")
+    logger.info(f"{dataset_name}: {len(merged)} rows from {len(paths)} files")
+
+    record = current_stage()
+    if record is not None:
+        record.rows_in = sum(entry["rows_read"] for entry in stats)
+        record.extra.update({"files": stats, "cross_file_duplicates": duplicates, "workers": workers})
+    return merged, stats
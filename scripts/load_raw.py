@@ -1,21 +1,67 @@
-
+import io
+import time
+from contextlib import nullcontext
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
-from utils.db import engine
+from utils.db import get_engine
+from utils.instrumentation import current_stage, instrument, run_id
+from utils.sql import run_sql_script
 from loguru import logger
+from models.data_models import FloatDataModel, ClickUpDataModel
+from typing import Tuple
+
+engine = get_engine("bulk_load")
+
+COPY_BATCH_SIZE = 50_000
+# COPY NULL marker, so empty strings and missing values stay distinct
+COPY_NULL = "\\N"
+LOAD_MODES = ("truncate", "append", "delta")
+
+# raw tables with the model their rows follow, the model's natural key is hashed into key_hash
+RAW_MODELS = {"float_allocations": FloatDataModel, "clickup_timesheets": ClickUpDataModel}
+HASH_COLUMNS = ["key_hash", "row_hash"]
+# date column of each raw table, the unit the incremental staging refresh rebuilds
+RAW_DATE_COLUMNS = {"float_allocations": "start_date", "clickup_timesheets": "date"}
 
+@instrument()
 def create_raw_schema():
     logger.info("Creating schemas and raw tables")
     with engine.begin() as conn:
-        schema_creation_script = open("sql/create_raw_schema.sql", "r").read()
-        conn.execute(text(schema_creation_script))
+        run_sql_script(conn, "sql/create_raw_schema.sql")
         logger.info("Schemas and tables created successfully")
 
-def load_to_raw(df: pd.DataFrame, table_name: str):
+def record_touched_dates(con, table_name: str, start_date=None, end_date=None, null_dates: bool = True,
+                         every_date: bool = False, schema: str = "raw"):
+    """
+    Records in raw.pending_staging_dates that a load wrote or deleted rows of a raw table dated from `start_date`
+    through `end_date` (no bounds: no dated rows) and, with null_dates, rows without a date, in the load's
+    transaction. every_date stands for a table emptied or replaced as a whole.
+    """
+    if schema != "raw" or table_name not in RAW_DATE_COLUMNS:
+        return
+    con.execute(text("""
+        INSERT INTO raw.pending_staging_dates (source, every_date, start_date, end_date, null_dates, run_id)
+        VALUES (:source, :every_date, :start_date, :end_date, :null_dates, :run_id)
+    """), {"source": table_name, "every_date": every_date, "start_date": start_date, "end_date": end_date,
+           "null_dates": null_dates, "run_id": run_id()})
+
+def record_frame_dates(con, df: pd.DataFrame, table_name: str, schema: str = "raw"):
+    # the date range of the rows a load wrote
+    if schema != "raw" or table_name not in RAW_DATE_COLUMNS or not len(df):
+        return
+    dates = pd.to_datetime(df[RAW_DATE_COLUMNS[table_name]], errors="coerce")
+    start_date, end_date = (dates.min().date(), dates.max().date()) if dates.notna().any() else (None, None)
+    record_touched_dates(con, table_name, start_date, end_date, bool(dates.isna().any()), schema=schema)
+
+@instrument()
+def load_to_raw(df: pd.DataFrame, table_name: str, if_exists: str = "replace", con=None):
     logger.info(f"Loading data into raw table: {table_name}")
     try:
-        df.to_sql(table_name, con=engine, schema="raw", if_exists="replace", index=False)
+        with engine.begin() if con is None else nullcontext(con) as conn:
+            df.to_sql(table_name, con=conn, schema="raw", if_exists=if_exists, index=False)
+            record_touched_dates(conn, table_name, every_date=True)
         logger.info(f"Successfully loaded data into {table_name}")
     except SQLAlchemyError as e:
         logger.error(f"SQLAlchemy error: {e}")
@@ -23,3 +69,179 @@ def load_to_raw(df: pd.DataFrame, table_name: str):
     except Exception as e:
         logger.error(f"Unexpected error loading data into {table_name}: {e}")
         raise e
+
+@instrument()
+def copy_to_raw(df: pd.DataFrame, table_name: str, mode: str = "truncate", batch_size: int = COPY_BATCH_SIZE,
+                con=None, schema: str = "raw") -> int:
+    """
+    Bulk loads a DataFrame into an existing raw table with COPY, keeping the column types
+    declared in create_raw_schema.sql. mode is "truncate" (replace the contents), "append" or
+    "delta" (replace the contents by writing only the rows that changed, see DeltaLoad).
+    All batches run in one transaction, the caller's if a connection is passed in.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {mode}")
+
+    if con is None:
+        with engine.begin() as conn:
+            return copy_to_raw(df, table_name, mode, batch_size, conn, schema)
+
+    if mode == "delta":
+        delta = DeltaLoad(table_name, con, schema)
+        written = delta.add(df)
+        delta.finish()
+        return written
+
+    if table_name in RAW_MODELS and "row_hash" not in df.columns:
+        df = with_row_hashes(df, table_name)
+
+    logger.info(f"Copying {len(df)} rows into {schema}.{table_name} ({mode})")
+    start = time.perf_counter()
+    try:
+        cursor = con.connection.cursor()
+        if mode == "truncate":
+            cursor.execute(f"TRUNCATE {schema}.{table_name}")
+
+        columns = ", ".join(f'"{column}"' for column in df.columns)
+        copy_sql = f"COPY {schema}.{table_name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        for offset in range(0, len(df), batch_size):
+            buffer = io.StringIO()
+            df.iloc[offset:offset + batch_size].to_csv(
+                buffer, header=False, index=False, na_rep=COPY_NULL, date_format="%Y-%m-%d"
+            )
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+        if mode == "truncate":
+            record_touched_dates(con, table_name, every_date=True, schema=schema)
+        else:
+            record_frame_dates(con, df, table_name, schema)
+    except Exception as e:
+        logger.error(f"Error copying data into {schema}.{table_name}: {e}")
+        raise e
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Copied {len(df)} rows into {schema}.{table_name} in {elapsed:.2f}s ({len(df) / max(elapsed, 1e-9):.0f} rows/s)")
+    return len(df)
+
+
+def _canonical(s: pd.Series) -> pd.Series:
+    # one dtype per kind of value, so a row hashes the same from the batch and the streaming path
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        return s.astype("datetime64[ns]")
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        return s.astype("float64")
+    return s
+
+def row_hashes(df: pd.DataFrame, key_columns) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stable 64-bit hashes of each row's natural key and of the whole row (key and payload), as int64
+    for BIGINT columns. Text hashes the same as object or categorical, missing values as None or NaN.
+    """
+    columns = sorted(column for column in df.columns if column not in HASH_COLUMNS)
+    canonical = pd.DataFrame({column: _canonical(df[column]) for column in columns}, index=df.index)
+    key_hash = pd.util.hash_pandas_object(canonical[list(key_columns)], index=False).to_numpy()
+    row_hash = pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+    return key_hash.view(np.int64), row_hash.view(np.int64)
+
+def with_row_hashes(df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+    key_hash, row_hash = row_hashes(df, RAW_MODELS[table_name].natural_key)
+    return df.assign(key_hash=key_hash, row_hash=row_hash)
+
+
+class DeltaLoad:
+    """
+    Brings a raw table in line with a new export by writing only the difference, in the caller's transaction.
+    Rows whose row_hash the table already has are left alone, new rows are appended, and once every frame
+    of the export was added, rows the export no longer has are deleted. The table ends up as a truncate
+    load would leave it. A new row replacing a deleted one with the same natural key counts as updated.
+    """
+
+    def __init__(self, table_name: str, con, schema: str = "raw"):
+        self.table_name = table_name
+        self.con = con
+        self.schema = schema
+        self.existing = self._existing_hashes()
+        self.incoming = []
+        self.new_keys = []
+        self.unchanged = 0
+
+    def _existing_hashes(self) -> pd.DataFrame:
+        buffer = io.StringIO()
+        self.con.connection.cursor().copy_expert(
+            f"COPY (SELECT row_hash, key_hash FROM {self.schema}.{self.table_name} WHERE row_hash IS NOT NULL) "
+            f"TO STDOUT WITH (FORMAT csv)",
+            buffer,
+        )
+        buffer.seek(0)
+        if not buffer.getvalue():
+            return pd.DataFrame({"row_hash": np.array([], dtype=np.int64), "key_hash": np.array([], dtype=np.int64)})
+        return pd.read_csv(buffer, names=["row_hash", "key_hash"], dtype=np.int64)
+
+    def add(self, df: pd.DataFrame) -> int:
+        """
+        Appends the rows of df the table does not have yet, returns how many.
+        """
+        if "row_hash" not in df.columns:
+            df = with_row_hashes(df, self.table_name)
+        row_hash = df["row_hash"].to_numpy()
+        known = np.isin(row_hash, self.existing["row_hash"].to_numpy())
+        self.incoming.append(row_hash)
+        self.unchanged += int(known.sum())
+
+        new_rows = df[~known]
+        self.new_keys.append(new_rows["key_hash"].to_numpy())
+        if len(new_rows):
+            copy_to_raw(new_rows, self.table_name, "append", con=self.con, schema=self.schema)
+        return len(new_rows)
+
+    def finish(self) -> dict:
+        """
+        Deletes the rows missing from the export and returns the inserted/updated/deleted/unchanged counts.
+        """
+        if not self.incoming or not sum(len(hashes) for hashes in self.incoming):
+            # an empty export leaves the table alone, like a truncate load that never started
+            logger.warning(f"Delta load of {self.schema}.{self.table_name}: no rows, nothing deleted")
+            return {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+        incoming = np.concatenate(self.incoming)
+        new_keys = np.concatenate(self.new_keys)
+        gone = self.existing[~np.isin(self.existing["row_hash"].to_numpy(), incoming)]
+
+        cursor = self.con.connection.cursor()
+        gone_table = f"delta_gone_{self.table_name}"
+        cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {gone_table} (row_hash BIGINT) ON COMMIT DROP")
+        buffer = io.StringIO()
+        gone["row_hash"].to_csv(buffer, header=False, index=False)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {gone_table} (row_hash) FROM STDIN WITH (FORMAT csv)", buffer)
+        # rows loaded before the hash columns existed are replaced as well
+        date_column = RAW_DATE_COLUMNS.get(self.table_name, "NULL")
+        cursor.execute(f"""
+            WITH gone AS (
+                DELETE FROM {self.schema}.{self.table_name} t
+                WHERE t.row_hash IS NULL OR t.row_hash IN (SELECT row_hash FROM {gone_table})
+                RETURNING {date_column} AS date
+            )
+            SELECT COUNT(*), MIN(date), MAX(date), COALESCE(bool_or(date IS NULL), FALSE) FROM gone
+        """)
+        deleted, start_date, end_date, null_dates = cursor.fetchone()
+        cursor.execute(f"DROP TABLE {gone_table}")
+        if deleted:
+            record_touched_dates(self.con, self.table_name, start_date, end_date, null_dates, schema=self.schema)
+
+        updated = int(np.isin(new_keys, gone["key_hash"].to_numpy()).sum())
+        replaced = int(np.isin(gone["key_hash"].to_numpy(), new_keys).sum())
+        counts = {
+            "inserted": len(new_keys) - updated,
+            "updated": updated,
+            "deleted": deleted - replaced,
+            "unchanged": self.unchanged,
+        }
+        stage = current_stage()
+        if stage is not None:
+            stage.extra.update(counts)
+        logger.info(
+            f"Delta load of {self.schema}.{self.table_name}: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['deleted']} deleted, {counts['unchanged']} unchanged"
+        )
+        return counts
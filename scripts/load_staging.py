@@ -1,16 +1,141 @@
 
+from datetime import date
 from sqlalchemy import text
-from utils.db import engine
+from utils.db import get_engine
+from utils.instrumentation import instrument
+from utils.sql import run_sql_script
 from loguru import logger
 
-def create_and_refresh_materialized_views():
-    logger.info("Creating and refreshing materialized views in the staging schema")
+engine = get_engine("bulk_load")
+
+STAGING_VIEWS = ["mv_float_allocations", "mv_clickup_timesheets"]
+REFRESH_MODES = ("full", "concurrent", "incremental")
+
+def _relkind(conn, relation: str):
+    # 'm' for a materialized view, 'r' for a table, None if missing
+    return conn.execute(text("""
+        SELECT c.relkind
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'staging' AND c.relname = :relation
+    """), {"relation": relation}).scalar()
+
+def _has_column(conn, relation: str, column: str) -> bool:
+    return conn.execute(text("""
+        SELECT 1
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'staging' AND c.relname = :relation AND a.attname = :column AND NOT a.attisdropped
+    """), {"relation": relation, "column": column}).scalar() is not None
+
+@instrument()
+def create_and_refresh_materialized_views(mode: str = "full", start_date=None, end_date=None):
+    """
+    Builds staging.mv_float_allocations and staging.mv_clickup_timesheets from raw.
+    - full: plain REFRESH MATERIALIZED VIEW (exclusive lock while it runs)
+    - concurrent: REFRESH MATERIALIZED VIEW CONCURRENTLY, readers are not blocked
+    - incremental: ordinary staging tables, only dates whose raw rows changed are rebuilt
+    """
+    if mode not in REFRESH_MODES:
+        raise ValueError(f"Unknown staging refresh mode: {mode}")
+    if mode == "incremental":
+        return refresh_staging_incremental(start_date, end_date)
+
+    logger.info(f"Creating and refreshing materialized views in the staging schema ({mode})")
     try:
         with engine.begin() as conn:
-            view_creation_script = open("sql/create_staging_views.sql", "r").read()
-            conn.execute(text(view_creation_script))
+            for view in STAGING_VIEWS:
+                # replace tables left by incremental mode and views created before the row key existed
+                relkind = _relkind(conn, view)
+                if relkind == "r":
+                    conn.execute(text(f"DROP TABLE staging.{view}"))
+                elif relkind == "m" and not _has_column(conn, view, "row_seq"):
+                    conn.execute(text(f"DROP MATERIALIZED VIEW staging.{view}"))
+
+            run_sql_script(conn, "sql/create_staging_views.sql")
+
+        with engine.begin() as conn:
+            concurrently = "CONCURRENTLY " if mode == "concurrent" else ""
+            for view in STAGING_VIEWS:
+                conn.execute(text(f"REFRESH MATERIALIZED VIEW {concurrently}staging.{view}"))
+            # the views hold every raw date, nothing is left for an incremental refresh
+            conn.execute(text("DELETE FROM raw.pending_staging_dates"))
             logger.info("Materialized views created and refreshed successfully")
     except Exception as e:
         logger.error(f"Error creating or refreshing materialized views: {e}")
         raise e
 
+def create_staging_tables(conn):
+    """
+    Creates the incrementally maintained staging tables, replacing the materialized views of the other modes.
+    """
+    for view in STAGING_VIEWS:
+        if _relkind(conn, view) == "m":
+            conn.execute(text(f"DROP MATERIALIZED VIEW staging.{view}"))
+            # the rebuilt tables start empty, so every date is reloaded
+            conn.execute(text("DROP TABLE IF EXISTS staging.refresh_state"))
+
+    run_sql_script(conn, "sql/create_staging_tables.sql")
+
+def touched_dates(conn):
+    """
+    The raw.pending_staging_dates entries recorded by raw loads since the last refresh, as their ids and the
+    refresh parameters covering them: one date range over both sources and whether rows without a date were
+    written. Every date is covered on the first refresh or after a load that replaced a whole table;
+    the parameters are None when no load touched raw.
+    """
+    ids, every_date, start_date, end_date, null_dates = conn.execute(text("""
+        SELECT array_agg(id), bool_or(every_date), MIN(start_date), MAX(end_date), bool_or(null_dates)
+        FROM raw.pending_staging_dates
+    """)).one()
+    ids = ids or []
+    if not conn.execute(text("SELECT EXISTS (SELECT 1 FROM staging.refresh_state)")).scalar() or every_date:
+        return ids, {"start_date": None, "end_date": None, "null_dates": True}
+    if not ids:
+        return ids, None
+    if start_date is None:
+        # only undated rows were written: an empty date range, nothing is fingerprinted
+        start_date, end_date = date.max, date.min
+    return ids, {"start_date": start_date, "end_date": end_date, "null_dates": null_dates}
+
+@instrument()
+def refresh_staging_incremental(start_date=None, end_date=None, create_tables: bool = True):
+    """
+    Keeps the staging tables in step with raw for the dates whose raw row count or content fingerprint changed
+    since the previous refresh. Without a range only the dates raw loads recorded as touched are fingerprinted
+    (see touched_dates), and the rows without a date are restaged when a load wrote one; an explicit range is
+    fingerprinted as given and leaves the recorded dates for the next refresh.
+    Refreshes of disjoint ranges can run concurrently once the tables exist (create_tables=False).
+    """
+    try:
+        if create_tables:
+            with engine.begin() as conn:
+                create_staging_tables(conn)
+
+        with engine.begin() as conn:
+            ids, params = [], {"start_date": start_date, "end_date": end_date, "null_dates": False}
+            if start_date is None and end_date is None:
+                ids, params = touched_dates(conn)
+                if params is None:
+                    logger.info("Staging tables are up to date: no raw dates were loaded since the last refresh")
+                    return
+            dates = (
+                "undated rows only" if params["start_date"] == date.max
+                else f"dates {params['start_date'] or '-inf'} to {params['end_date'] or '+inf'}"
+            )
+            logger.info(f"Incrementally refreshing staging tables ({dates})")
+            run_sql_script(conn, "sql/refresh_staging_incremental.sql", params)
+            float_dates = conn.execute(text("SELECT COUNT(*) FROM changed_float_dates")).scalar()
+            clickup_dates = conn.execute(text("SELECT COUNT(*) FROM changed_clickup_dates")).scalar()
+            logger.info(f"Staging tables refreshed: {float_dates} Float and {clickup_dates} ClickUp dates rebuilt")
+            if params["null_dates"]:
+                undated = conn.execute(text("""
+                    SELECT (SELECT COUNT(*) FROM staging.mv_float_allocations WHERE start_date IS NULL),
+                           (SELECT COUNT(*) FROM staging.mv_clickup_timesheets WHERE date IS NULL)
+                """)).one()
+                logger.info(f"Restaged {undated[0]} Float and {undated[1]} ClickUp rows without a date")
+            conn.execute(text("DELETE FROM raw.pending_staging_dates WHERE id = ANY(:ids)"), {"ids": ids})
+    except Exception as e:
+        logger.error(f"Error refreshing staging tables incrementally: {e}")
+        raise e
@@ -0,0 +1,95 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Dict, List
+from sqlalchemy import bindparam, text
+from loguru import logger
+from utils.db import get_engine
+from utils.instrumentation import instrument, run_id
+from utils.sql import run_sql_script
+
+engine = get_engine("bulk_load")
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def content_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+def fingerprint(file_path: str, previous: dict = None) -> dict:
+    """
+    Path, size, mtime and content hash of an input file. When size and mtime match the previous
+    fingerprint the file is not read again and the previous hash is kept.
+    """
+    stat = os.stat(file_path)
+    mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+    if previous and previous["size_bytes"] == stat.st_size and previous["mtime"] == mtime:
+        file_hash = previous["content_hash"]
+    else:
+        file_hash = content_hash(file_path)
+    return {"file_path": file_path, "size_bytes": stat.st_size, "mtime": mtime, "content_hash": file_hash}
+
+def last_consumed(conn, file_paths: List[str]) -> Dict[str, dict]:
+    """
+    Latest fingerprint of each file consumed by a run that finished, keyed by path.
+    """
+    rows = conn.execute(
+        text("""
+            SELECT DISTINCT ON (file_path) file_path, size_bytes, mtime, content_hash, run_id
+            FROM raw.ingest_manifest
+            WHERE status = 'consumed' AND file_path IN :file_paths
+            ORDER BY file_path, recorded_at DESC
+        """).bindparams(bindparam("file_paths", expanding=True)),
+        {"file_paths": file_paths},
+    ).mappings()
+    return {row["file_path"]: dict(row) for row in rows}
+
+@instrument()
+def check_inputs(file_paths: List[str]) -> List[str]:
+    """
+    Fingerprints the input files and records them as pending for the current run.
+    Returns the files whose content changed since the run that last consumed them (all of them the first time).
+    """
+    with engine.begin() as conn:
+        run_sql_script(conn, "sql/create_raw_schema.sql")
+        consumed = last_consumed(conn, file_paths)
+        fingerprints = [fingerprint(file_path, consumed.get(file_path)) for file_path in file_paths]
+        conn.execute(
+            text("""
+                INSERT INTO raw.ingest_manifest (file_path, size_bytes, mtime, content_hash, run_id)
+                VALUES (:file_path, :size_bytes, :mtime, :content_hash, :run_id)
+                ON CONFLICT (file_path, run_id) DO UPDATE SET
+                    size_bytes = EXCLUDED.size_bytes, mtime = EXCLUDED.mtime, content_hash = EXCLUDED.content_hash,
+                    status = 'pending', recorded_at = now()
+            """),
+            [{**entry, "run_id": run_id()} for entry in fingerprints],
+        )
+
+    changed = []
+    for entry in fingerprints:
+        previous = consumed.get(entry["file_path"])
+        if previous is None or previous["content_hash"] != entry["content_hash"]:
+            changed.append(entry["file_path"])
+        else:
+            logger.info(f"{entry['file_path']} unchanged since run {previous['run_id']}")
+    return changed
+
+@instrument()
+def mark_consumed(file_paths: List[str]) -> int:
+    """
+    Marks the current run's fingerprints as consumed, once its data is published.
+    """
+    with engine.begin() as conn:
+        result = conn.execute(
+            text("""
+                UPDATE raw.ingest_manifest SET status = 'consumed', recorded_at = now()
+                WHERE run_id = :run_id AND file_path IN :file_paths
+            """).bindparams(bindparam("file_paths", expanding=True)),
+            {"run_id": run_id(), "file_paths": file_paths},
+        )
+    logger.info(f"Recorded {result.rowcount} input files as consumed by run {run_id()}")
+    return result.rowcount
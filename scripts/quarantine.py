@@ -0,0 +1,74 @@
+import io
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from sqlalchemy import text
+from loguru import logger
+from utils.db import get_engine
+from utils.instrumentation import instrument, run_id
+
+engine = get_engine("bulk_load")
+
+QUARANTINE_TABLE = "rejected_rows"
+QUARANTINE_COLUMNS = ["run_id", "source_file", "row_number", "rule", "field", "error_code", "row_data"]
+
+
+def rejected_rows_frame(rows: pd.DataFrame, rules: pd.Series, source_file: str) -> pd.DataFrame:
+    """
+    Rejected rows in the raw.rejected_rows layout: the row as read, as JSON, with the rule it failed.
+    Rules look like "Alias: check" (the field and error code), row_number is the row's position in the file.
+    """
+    if rows.empty:
+        return pd.DataFrame(columns=QUARANTINE_COLUMNS)
+
+    rules = rules.reindex(rows.index).astype("category")
+    # each distinct rule is split once, rows only carry its code
+    labels = pd.Series(rules.cat.categories.astype(str))
+    parts = labels.str.partition(": ")
+    codes = rules.cat.codes.to_numpy()
+    return pd.DataFrame({
+        "run_id": run_id(),
+        "source_file": source_file,
+        "row_number": rows.index.to_numpy(),
+        "rule": labels.to_numpy()[codes],
+        "field": parts[0].to_numpy()[codes],
+        "error_code": parts[2].to_numpy()[codes],
+        "row_data": rows.to_json(orient="records", lines=True, date_format="iso").splitlines(),
+    }, columns=QUARANTINE_COLUMNS)
+
+def _copy_rejected(quarantined: pd.DataFrame, con):
+    # pyarrow writes the CSV in C++, several times faster than to_csv on long JSON strings
+    buffer = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(quarantined, preserve_index=False), buffer,
+                    pacsv.WriteOptions(include_header=False))
+    buffer.seek(0)
+    columns = ", ".join(QUARANTINE_COLUMNS)
+    con.connection.cursor().copy_expert(f"COPY raw.{QUARANTINE_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+@instrument()
+def quarantine_rows(rows: pd.DataFrame, rules: pd.Series, source_file: str, replace: bool = True) -> int:
+    """
+    Bulk writes rejected rows to raw.rejected_rows with one COPY. With replace, rows quarantined earlier
+    for the same run and file are dropped first, so a retried task does not duplicate them.
+    A file without rejected rows does not touch the table: a retry reads the same file and rejects nothing again.
+    The table is created by create_raw_schema, which runs before any extraction.
+    """
+    if rows.empty:
+        return 0
+
+    quarantined = rejected_rows_frame(rows, rules, source_file)
+    try:
+        with engine.begin() as conn:
+            if replace:
+                conn.execute(
+                    text(f"DELETE FROM raw.{QUARANTINE_TABLE} WHERE run_id = :run_id AND source_file = :source_file"),
+                    {"run_id": run_id(), "source_file": source_file},
+                )
+            _copy_rejected(quarantined, conn)
+    except Exception as e:
+        logger.error(f"Error quarantining rejected rows of {source_file}: {e}")
+        raise e
+
+    logger.warning(f"Quarantined {len(quarantined)} rejected rows of {source_file} in raw.{QUARANTINE_TABLE}")
+    return len(quarantined)
@@ -0,0 +1,171 @@
+import pandas as pd
+from datetime import date, timedelta
+from typing import List
+from sqlalchemy import bindparam, text
+from loguru import logger
+from utils.query_cache import cached_query
+
+# Rollup tables, coarsest first. Every rollup has the grain columns and the summed measures of the fact table;
+# the daily rollup is aggregated from the facts, the coarser ones from the daily rollup.
+ROLLUPS = {
+    "monthly": {"table": "rollup_monthly", "period": "month"},
+    "weekly": {"table": "rollup_weekly", "period": "week"},
+    "daily": {"table": "rollup_daily", "period": "day"},
+}
+GRAIN = ["team_member_id", "project_id", "is_billable"]
+MEASURES = ["log_hours", "est_project_hours", "entries"]
+
+# Columns a query can group or filter by: expression and the table it needs (None: every rollup has it)
+COLUMNS = {
+    "team_member_id": ("{source}.team_member_id", None),
+    "name": ("tm.name", "dim_team_member"),
+    "role": ("tm.role", "dim_team_member"),
+    "project_id": ("{source}.project_id", None),
+    "client": ("p.client", "dim_project"),
+    "project_name": ("p.project_name", "dim_project"),
+    "is_billable": ("{source}.is_billable", None),
+    # only the base fact has the task
+    "task_id": ("{source}.task_id", "fact"),
+    "task_name": ("t.task_name", "dim_task"),
+}
+JOINS = {
+    "dim_team_member": "JOIN prod.dim_team_member tm ON tm.team_member_id = {source}.team_member_id",
+    "dim_project": "JOIN prod.dim_project p ON p.project_id = {source}.project_id",
+    "dim_task": "JOIN prod.dim_task t ON t.task_id = {source}.task_id",
+}
+# periods the date can be grouped by, and the rollups that can answer each
+PERIODS = {
+    "day": ["daily"],
+    "week": ["weekly", "daily"],
+    "month": ["monthly", "daily"],
+}
+
+
+def _period_bounds(period: str, lower: date, upper: date):
+    # the whole periods overlapping [lower, upper)
+    return text(f"""
+        SELECT CAST(date_trunc('{period}', CAST(:lower AS DATE)) AS DATE),
+               CAST(date_trunc('{period}', CAST(:upper AS DATE) - 1) + INTERVAL '1 {period}' AS DATE)
+    """), {"lower": lower, "upper": upper}
+
+def refresh_rollups(conn, lower: date = None, upper: date = None, schema: str = "prod"):
+    """
+    Recomputes the rollups of the facts dated in [lower, upper), every fact when no bounds are given.
+    Weekly and monthly rows are recomputed for the whole periods overlapping the range, from the daily rollup.
+    Runs on the caller's connection, so the rollups change in the same transaction as the facts.
+    """
+    window = "WHERE period_start >= :lower AND period_start < :upper" if lower else ""
+    facts_window = "WHERE f.date >= :lower AND f.date < :upper" if lower else ""
+    params = {"lower": lower, "upper": upper}
+
+    conn.execute(text(f"DELETE FROM {schema}.rollup_daily {window}"), params)
+    conn.execute(text(f"""
+        INSERT INTO {schema}.rollup_daily (period_start, {", ".join(GRAIN + MEASURES)})
+        SELECT f.date, f.team_member_id, f.project_id, f.is_billable,
+               SUM(f.log_hours), SUM(f.est_project_hours), COUNT(*)
+        FROM {schema}.fact_timesheet f
+        {facts_window}
+        GROUP BY f.date, f.team_member_id, f.project_id, f.is_billable
+    """), params)
+
+    for rollup in ("weekly", "monthly"):
+        spec = ROLLUPS[rollup]
+        period_params = dict(zip(("lower", "upper"), conn.execute(*_period_bounds(spec["period"], lower, upper)).one())) if lower else {}
+        conn.execute(text(f"DELETE FROM {schema}.{spec['table']} {window}"), period_params)
+        conn.execute(text(f"""
+            INSERT INTO {schema}.{spec['table']} (period_start, {", ".join(GRAIN + MEASURES)})
+            SELECT CAST(date_trunc('{spec["period"]}', period_start) AS DATE), {", ".join(GRAIN)},
+                   SUM(log_hours), SUM(est_project_hours), SUM(entries)
+            FROM {schema}.rollup_daily
+            {window}
+            GROUP BY 1, {", ".join(GRAIN)}
+        """), period_params)
+
+def route(group_by: List[str], period: str = None, start_date=None, end_date=None) -> str:
+    """
+    The coarsest rollup that answers the query exactly, "fact" when none does: every column must be in the
+    rollup, the period must be one it can be grouped to, and the date window must cover whole rollup periods.
+    """
+    if any(COLUMNS[column][1] in ("fact", "dim_task") for column in group_by):
+        return "fact"
+    candidates = PERIODS[period] if period else list(ROLLUPS)
+    for rollup in candidates:
+        unit = ROLLUPS[rollup]["period"]
+        if _aligned(start_date, unit, start=True) and _aligned(end_date, unit, start=False):
+            return rollup
+    return "fact"
+
+def _aligned(day, unit: str, start: bool) -> bool:
+    # whether the window bound falls on a period boundary: a period's first day, or its last day for the end
+    if day is None or unit == "day":
+        return True
+    day = pd.Timestamp(day).date() + (timedelta(0) if start else timedelta(days=1))
+    return day.weekday() == 0 if unit == "week" else day.day == 1
+
+def _query(source: str, group_by: List[str], period: str, start_date, end_date, filters: dict):
+    if source == "fact":
+        table, alias, date_column, unit = "prod.fact_timesheet", "f", "f.date", "day"
+        measures = "SUM(f.log_hours) AS log_hours, SUM(f.est_project_hours) AS est_project_hours, COUNT(*) AS entries"
+    else:
+        table, alias, date_column, unit = f"prod.{ROLLUPS[source]['table']}", "r", "r.period_start", ROLLUPS[source]["period"]
+        # SUM(BIGINT) is NUMERIC, cast back so both sources return the same types
+        measures = ("SUM(r.log_hours) AS log_hours, CAST(SUM(r.est_project_hours) AS BIGINT) AS est_project_hours, "
+                    "CAST(SUM(r.entries) AS BIGINT) AS entries")
+
+    columns = list(group_by) + [column for column in filters if column not in group_by]
+    joins = {COLUMNS[column][1] for column in columns} - {None, "fact"}
+    select, where, params = [], ["TRUE"], {}
+    if period == unit:
+        select.append(f"{date_column} AS {period}")
+    elif period:
+        select.append(f"CAST(date_trunc('{period}', {date_column}) AS DATE) AS {period}")
+    select += [f"{COLUMNS[column][0].format(source=alias)} AS {column}" for column in group_by]
+    if start_date is not None:
+        where.append(f"{date_column} >= :start_date")
+        params["start_date"] = pd.Timestamp(start_date).date()
+    if end_date is not None:
+        where.append(f"{date_column} <= :end_date")
+        params["end_date"] = pd.Timestamp(end_date).date()
+
+    expanding = []
+    for column, value in filters.items():
+        expression = COLUMNS[column][0].format(source=alias)
+        if isinstance(value, (list, tuple, set)):
+            where.append(f"{expression} IN :{column}")
+            params[column] = list(value)
+            expanding.append(column)
+        else:
+            where.append(f"{expression} = :{column}")
+            params[column] = value
+
+    keys = ([period] if period else []) + list(group_by)
+    query = f"""
+        SELECT {", ".join(select + [measures])}
+        FROM {table} {alias}
+        {" ".join(JOINS[join].format(source=alias) for join in sorted(joins))}
+        WHERE {" AND ".join(where)}
+        {"GROUP BY " + ", ".join(keys) if keys else ""}
+        {"ORDER BY " + ", ".join(keys) if keys else ""}
+    """
+    return text(query).bindparams(*(bindparam(column, expanding=True) for column in expanding)), params
+
+def query_hours(group_by: List[str] = (), period: str = None, start_date=None, end_date=None, filters: dict = None,
+                source: str = None) -> pd.DataFrame:
+    """
+    Logged and estimated hours and entry counts grouped by `group_by` (columns of COLUMNS) and optionally by
+    `period` (day | week | month, the period's first day), within an inclusive date window and equality filters
+    (a list means IN). Answered from the coarsest rollup that can, from prod.fact_timesheet otherwise;
+    source="fact" forces the base fact. Results are cached until the next publish (utils/query_cache.py).
+    """
+    filters = filters or {}
+    group_by = list(group_by)
+    unknown = [column for column in group_by + list(filters) if column not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown rollup columns: {unknown}")
+    if period is not None and period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+
+    source = source or route(group_by + list(filters), period, start_date, end_date)
+    logger.debug(f"Hours by {group_by} per {period or 'window'} answered from {source}")
+    query, params = _query(source, group_by, period, start_date, end_date, filters)
+    return cached_query(query, params)
@@ -0,0 +1,424 @@
+"""
+The pipeline as an in-process dependency graph, runnable without Airflow:
+
+    python -m scripts.run_pipeline
+    python -m scripts.run_pipeline --from create_staging_mv --to load_prod_schema --workers 4
+    python -m scripts.run_pipeline --list
+
+Independent stages run concurrently on a thread pool. dags/etl_pipeline_dag.py builds its tasks from the
+same graph, so both run the same stage functions in the same order.
+"""
+import time
+from typing import Callable, Dict, List
+from utils.db import load_config
+from utils.logger import logger
+
+# This module is imported when Airflow parses the DAG: pandas, sqlalchemy, the pipeline scripts and the
+# thread pool are imported inside the functions that use them, not here.
+
+# the staging dimensions (star_schema.DIMENSIONS), each populated by its own stage
+DIMENSIONS = ["dim_date", "dim_team_member", "dim_project", "dim_task"]
+
+
+class Stage:
+    """
+    One step of the pipeline. A short-circuit stage returning False skips every stage downstream of it.
+    """
+
+    def __init__(self, name: str, func: Callable, upstream: List[str] = (), short_circuit: bool = False):
+        self.name = name
+        self.func = func
+        self.upstream = list(upstream)
+        self.short_circuit = short_circuit
+
+
+def pipeline_settings(config: dict = None) -> dict:
+    config = config or load_config()
+    pipeline_config = config.get("pipeline", {})
+    streaming = pipeline_config.get("streaming", False)
+    return {
+        "raw_data_dir": config["paths"]["raw_data"],
+        "processed_data_dir": config["paths"]["processed_data"],
+        "input_patterns": {
+            "float": "Float - allocations*.csv",
+            "clickup": "ClickUp - clickup*.csv",
+            **pipeline_config.get("input_patterns", {}),
+        },
+        "ingest_workers": pipeline_config.get("ingest_workers", 0),
+        "backfill_workers": pipeline_config.get("backfill_workers", 4),
+        "streaming": streaming,
+        "chunk_size": pipeline_config.get("chunk_size", 100000),
+        "raw_load": pipeline_config.get("raw_load", "truncate"),
+        "staging_refresh": pipeline_config.get("staging_refresh", "full"),
+        "prod_publish": pipeline_config.get("prod_publish", "partition"),
+        "index_workers": pipeline_config.get("index_workers", 4),
+        "maintenance_work_mem": pipeline_config.get("maintenance_work_mem", "512MB"),
+        # the frame builder needs the cleaned artifacts, which streaming mode does not write
+        "star_builder": pipeline_config.get("star_builder", "sql") if not streaming else "sql",
+        "artifact_format": pipeline_config.get("artifact_format", "parquet"),
+        "skip_unchanged_inputs": pipeline_config.get("skip_unchanged_inputs", True),
+    }
+
+def build_pipeline(settings: dict = None) -> Dict[str, Stage]:
+    """
+    The stages for the configured modes, in a valid execution order.
+    """
+    settings = settings or pipeline_settings()
+    patterns = settings["input_patterns"]
+    stages = {}
+
+    def stage(name: str, upstream: List[str] = (), short_circuit: bool = False):
+        def register(func):
+            stages[name] = Stage(name, func, upstream, short_circuit)
+            return func
+        return register
+
+    def input_files(dataset: str = None):
+        # globbed at run time, the shards present when the stage runs
+        from scripts.ingest import shard_paths
+
+        datasets = [dataset] if dataset else list(patterns)
+        return [path for name in datasets for path in shard_paths(patterns[name], settings["raw_data_dir"])]
+
+    def artifact_store():
+        from scripts.artifacts import ArtifactStore
+
+        return ArtifactStore(settings["processed_data_dir"], settings["artifact_format"])
+
+    # Skip the whole run when no input file changed since the last published run, force=True reloads anyway
+    @stage("check_input_manifest", short_circuit=True)
+    def check_input_manifest(force: bool = False):
+        from scripts.manifest import check_inputs
+
+        changed = check_inputs(input_files())
+        if changed or not settings["skip_unchanged_inputs"] or force:
+            return True
+        logger.info("No input file changed since the last published run, skipping the pipeline")
+        return False
+
+    # create raw schema tables
+    @stage("create_raw_schema", ["check_input_manifest"])
+    def create_raw_schema():
+        from scripts import load_raw
+
+        load_raw.create_raw_schema()
+
+    if settings["streaming"]:
+        # Stream Float and ClickUp data chunk by chunk straight into the raw schema
+        @stage("extract_float_data", ["create_raw_schema"])
+        def stream_float_data():
+            from scripts.streaming import stream_to_raw
+            from models.data_models import FloatDataModel
+
+            stream_to_raw(input_files("float"), FloatDataModel, "Float Data", "float_allocations",
+                          settings["chunk_size"], settings["raw_load"])
+
+        @stage("extract_clickup_data", ["create_raw_schema"])
+        def stream_clickup_data():
+            from scripts.streaming import stream_to_raw
+            from models.data_models import ClickUpDataModel
+
+            stream_to_raw(input_files("clickup"), ClickUpDataModel, "ClickUp Data", "clickup_timesheets",
+                          settings["chunk_size"], settings["raw_load"])
+
+        raw_loads = ["extract_float_data", "extract_clickup_data"]
+    else:
+        # Extract, validate and clean the Float files, in parallel when there are several. Rejected rows are
+        # quarantined in raw.rejected_rows, so the raw schema comes first
+        @stage("extract_float_data", ["create_raw_schema"])
+        def extract_float_data():
+            from scripts.ingest import ingest_files
+            from models.data_models import FloatDataModel
+
+            float_data, _ = ingest_files(patterns["float"], FloatDataModel, "Float Data", settings["raw_data_dir"],
+                                         settings["ingest_workers"])
+            artifact_store().write(float_data, "float_cleaned")
+
+        # extract validate and clean the ClickUp files, in parallel when there are several
+        @stage("extract_clickup_data", ["create_raw_schema"])
+        def extract_clickup_data():
+            from scripts.ingest import ingest_files
+            from models.data_models import ClickUpDataModel
+
+            clickup_data, _ = ingest_files(patterns["clickup"], ClickUpDataModel, "ClickUp Data", settings["raw_data_dir"],
+                                           settings["ingest_workers"])
+            artifact_store().write(clickup_data, "clickup_cleaned")
+
+        # Load Float data into raw schema
+        @stage("load_float_data", ["extract_float_data"])
+        def load_float_data():
+            from scripts.load_raw import copy_to_raw
+
+            copy_to_raw(artifact_store().read("float_cleaned"), "float_allocations", mode=settings["raw_load"])
+
+        # Load ClickUp data into raw schema
+        @stage("load_clickup_data", ["extract_clickup_data"])
+        def load_clickup_data():
+            from scripts.load_raw import copy_to_raw
+
+            copy_to_raw(artifact_store().read("clickup_cleaned"), "clickup_timesheets", mode=settings["raw_load"])
+
+        raw_loads = ["load_float_data", "load_clickup_data"]
+
+    # Run data quality checks
+    @stage("run_raw_data_quality_checks", raw_loads)
+    def run_raw_data_quality_checks():
+        from scripts.data_quality import data_quality_checks_raw
+
+        return data_quality_checks_raw().as_dict()
+
+    # create or refresh staging materialized views
+    @stage("create_staging_mv", ["run_raw_data_quality_checks"])
+    def create_staging_mv():
+        from scripts.load_staging import create_and_refresh_materialized_views
+
+        create_and_refresh_materialized_views(settings["staging_refresh"])
+
+    # create star schema in staging
+    @stage("create_star_schema", ["create_staging_mv"])
+    def create_star_schema():
+        from scripts.star_schema import create_staging_star_schema
+
+        create_staging_star_schema()
+
+    # Find the dates whose staging rows changed since the last prod publish, once: the later stages rebuild those
+    @stage("detect_fact_changes", ["create_star_schema"])
+    def detect_fact_changes():
+        from scripts.star_schema import detect_fact_changes
+
+        detect_fact_changes()
+
+    if settings["star_builder"] == "frames":
+        # Build dimensions and facts from the cleaned artifacts, the facts are COPYed into staging,
+        # only for the dates whose staging rows changed since the last publish
+        @stage("build_star_schema", ["detect_fact_changes"])
+        def build_star_schema():
+            from scripts.star_builder import build_star_schema
+            from scripts.star_schema import changed_fact_window
+
+            window = changed_fact_window()
+            if window is None:
+                logger.info("No staging rows changed since the last prod publish, the star schema is current")
+                return
+            store = artifact_store()
+            build_star_schema(store.read("float_cleaned"), store.read("clickup_cleaned"), *window)
+
+        star_schema_done = "build_star_schema"
+    else:
+        # Populate each dimension table from the dates whose staging rows changed since the last publish,
+        # one stage per dimension: they share no rows and run in parallel
+        def dimension_stage(dimension: str):
+            @stage(f"populate_{dimension}", ["detect_fact_changes"])
+            def populate_dimension():
+                from scripts import star_schema
+
+                window = star_schema.changed_fact_window()
+                if window is None:
+                    logger.info(f"No staging rows changed since the last prod publish, {dimension} is current")
+                    return
+                star_schema.populate_dimension(dimension, *window)
+
+        for dimension in DIMENSIONS:
+            dimension_stage(dimension)
+
+        # Populate fact table once every dimension is, only the dates whose staging rows changed since the last publish
+        @stage("populate_fact_table", [f"populate_{dimension}" for dimension in DIMENSIONS])
+        def populate_fact_table():
+            from scripts import star_schema
+
+            window = star_schema.changed_fact_window()
+            if window is None:
+                logger.info("No staging rows changed since the last prod publish, the fact table is current")
+                return
+            star_schema.populate_fact_table(*window)
+
+        star_schema_done = "populate_fact_table"
+
+    # Run data quality checks on staging data
+    @stage("run_staging_data_quality_checks", [star_schema_done])
+    def run_staging_data_quality_checks():
+        from scripts.data_quality import data_quality_checks_staging
+
+        return data_quality_checks_staging().as_dict()
+
+    # Load star schema to prod, swapping in the months whose staging rows changed since the last publish
+    @stage("load_prod_schema", ["run_staging_data_quality_checks"])
+    def load_prod_schema():
+        from scripts import star_schema
+
+        window = star_schema.changed_fact_window()
+        if window is None:
+            logger.info("No staging rows changed since the last prod publish, prod is current")
+            return
+        star_schema.load_prod_schema(
+            *window,
+            mode=settings["prod_publish"],
+            index_workers=settings["index_workers"],
+            maintenance_work_mem=settings["maintenance_work_mem"],
+        )
+        star_schema.record_published_sources()
+
+    # Final validation check
+    @stage("run_prod_validation", ["load_prod_schema"])
+    def run_prod_validation():
+        from scripts import data_quality
+
+        return data_quality.run_prod_validation().as_dict()
+
+    # Record the input files as consumed, so the next run can skip them if they do not change
+    @stage("record_ingest_manifest", ["run_prod_validation"])
+    def record_ingest_manifest():
+        from scripts.manifest import mark_consumed
+
+        mark_consumed(input_files())
+
+    # Last stage: bump the publish version, which invalidates cached prod query results, and notify (placeholder)
+    @stage("send_success_notification", ["record_ingest_manifest"])
+    def send_success_notification():
+        from utils.query_cache import bump_publish_version
+
+        version = bump_publish_version()
+        logger.info(f"ETL pipeline completed successfully! (prod publish version {version})")
+
+    return stages
+
+def _downstream(stages: Dict[str, Stage], name: str) -> set:
+    found, frontier = set(), [name]
+    while frontier:
+        current = frontier.pop()
+        for stage in stages.values():
+            if current in stage.upstream and stage.name not in found:
+                found.add(stage.name)
+                frontier.append(stage.name)
+    return found
+
+def _upstream(stages: Dict[str, Stage], name: str) -> set:
+    found, frontier = set(), [name]
+    while frontier:
+        for parent in stages[frontier.pop()].upstream:
+            if parent not in found:
+                found.add(parent)
+                frontier.append(parent)
+    return found
+
+def select_stages(stages: Dict[str, Stage], start: str = None, stop: str = None, skip: List[str] = ()) -> List[str]:
+    """
+    The stages from `start` to `stop` (both included, each defaulting to the end of the graph), minus `skip`.
+    Stages left out are assumed done.
+    """
+    unknown = [name for name in [start, stop, *skip] if name is not None and name not in stages]
+    if unknown:
+        raise ValueError(f"Unknown stages: {unknown}, expected one of {list(stages)}")
+    selected = set(stages)
+    if start:
+        selected &= {start} | _downstream(stages, start)
+    if stop:
+        selected &= {stop} | _upstream(stages, stop)
+    return [name for name in stages if name in selected and name not in skip]
+
+def run_pipeline(start: str = None, stop: str = None, skip: List[str] = (), workers: int = 4, force: bool = False,
+                 stages: Dict[str, Stage] = None) -> List[dict]:
+    """
+    Runs the selected stages, each once all its selected upstream stages succeeded, up to `workers` at a time.
+    Returns the status and wall time of every selected stage; raises the first stage failure once
+    the stages already running have finished.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    from utils.instrumentation import measure
+
+    stages = stages or build_pipeline()
+    selected = select_stages(stages, start, stop, skip)
+
+    def parents(name: str) -> set:
+        # a skipped stage passes on its own upstream stages, stages before `start` are done
+        found = set()
+        for parent in stages[name].upstream:
+            if parent in selected:
+                found.add(parent)
+            elif parent in skip:
+                found |= parents(parent)
+        return found
+
+    waiting = {name: parents(name) for name in selected}
+    results = {name: {"stage": name, "status": "not run", "seconds": None} for name in selected}
+    failure = None
+
+    def run(name: str):
+        stage = stages[name]
+        started = time.perf_counter()
+        try:
+            with measure(f"pipeline.{name}"):
+                return stage.func(force=force) if stage.short_circuit else stage.func()
+        finally:
+            results[name]["seconds"] = round(time.perf_counter() - started, 3)
+
+    logger.info(f"Running {len(selected)} pipeline stages on {workers} threads")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage") as pool:
+        running = {}
+        while True:
+            if failure is None:
+                for name in [name for name, parents in waiting.items() if not parents]:
+                    del waiting[name]
+                    running[pool.submit(run, name)] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    logger.error(f"Stage {name} failed: {e}")
+                    results[name]["status"] = "failed"
+                    failure = failure or e
+                    continue
+                results[name]["status"] = "success"
+                skipped = _downstream(stages, name) if stages[name].short_circuit and value is False else set()
+                for child in skipped & set(waiting):
+                    del waiting[child]
+                    results[child]["status"] = "skipped"
+                for parents in waiting.values():
+                    parents.discard(name)
+
+    summary = [results[name] for name in selected]
+    log_summary(summary)
+    if failure is not None:
+        raise failure
+    return summary
+
+def log_summary(summary: List[dict]):
+    width = max([len(entry["stage"]) for entry in summary] + [5])
+    lines = [f"{'stage':<{width}}  {'status':<8}  seconds"]
+    for entry in summary:
+        seconds = f"{entry['seconds']:8.2f}" if entry["seconds"] is not None else f"{'-':>8}"
+        lines.append(f"{entry['stage']:<{width}}  {entry['status']:<8}  {seconds}")
+    total = sum(entry["seconds"] or 0 for entry in summary)
+    lines.append(f"{'stage time':<{width}}  {'':<8}  {total:8.2f}")
+    logger.info("Pipeline stages:\n" + "\n".join(lines))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the ETL pipeline in process, without Airflow.")
+    parser.add_argument("--from", dest="start", help="first stage to run, earlier stages are assumed done")
+    parser.add_argument("--to", dest="stop", help="last stage to run")
+    parser.add_argument("--skip", action="append", default=[], help="stage to leave out, can be repeated")
+    parser.add_argument("--workers", type=int, default=4, help="stages run at the same time")
+    parser.add_argument("--force", action="store_true", help="run even when no input file changed")
+    parser.add_argument("--list", action="store_true", help="print the stages and their upstream stages and exit")
+    args = parser.parse_args()
+
+    stages = build_pipeline()
+    if args.list:
+        for stage in stages.values():
+            print(f"{stage.name}" + (f" <- {', '.join(stage.upstream)}" if stage.upstream else ""))
+        return
+
+    started = time.perf_counter()
+    run_pipeline(args.start, args.stop, args.skip, args.workers, args.force, stages)
+    logger.info(f"Pipeline finished in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from typing import List, Tuple
+from loguru import logger
+from scripts.load_raw import copy_to_raw
+from scripts.star_schema import DIMENSIONS, SurrogateKeyCache, load_dimension
+from utils.db import get_engine
+from utils.instrumentation import instrument
+
+engine = get_engine("bulk_load")
+
+FACT_COLUMNS = ["date_id", "team_member_id", "project_id", "task_id", "log_hours", "est_project_hours", "is_billable"]
+
+# same window as populate_fact_table.sql
+DELETE_FACTS = """
+    DELETE FROM staging.fact_timesheet f
+    USING staging.dim_date d
+    WHERE f.date_id = d.date_id
+      AND (CAST(:start_date AS DATE) IS NULL OR d.date >= CAST(:start_date AS DATE))
+      AND (CAST(:end_date AS DATE) IS NULL OR d.date <= CAST(:end_date AS DATE))
+"""
+
+# foreign keys of the fact table, dropped around the COPY and added back with a single validating join each
+FACT_FOREIGN_KEYS = """
+    SELECT conname, pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE conrelid = CAST('staging.fact_timesheet' AS REGCLASS) AND contype = 'f'
+    ORDER BY conname
+"""
+
+# one role per member, ordered by the database so ties break under its collation like the SQL path
+MEMBER_ROLES = """
+    SELECT DISTINCT ON (name) name, role
+    FROM unnest(CAST(:name AS TEXT[]), CAST(:role AS TEXT[])) AS m(name, role)
+    ORDER BY name, role
+"""
+
+
+def _lower(s: pd.Series) -> pd.Series:
+    # LOWER() of the staging views, on the categories only when the column is categorical
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, uniques = pd.factorize(s.cat.categories.str.lower())
+        return pd.Series(pd.Categorical.from_codes(np.where(s.cat.codes >= 0, codes[s.cat.codes], -1), uniques), index=s.index)
+    return s.str.lower()
+
+def _codes(left: pd.Series, right: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Both columns as integer codes over their shared values, -1 for missing values.
+    Categoricals are coded through their categories, each distinct string is hashed once.
+    """
+    if isinstance(left.dtype, pd.CategoricalDtype) or isinstance(right.dtype, pd.CategoricalDtype):
+        left, right = left.astype("category"), right.astype("category")
+        vocabulary = left.cat.categories.append(right.cat.categories).unique()
+        return tuple(
+            np.where(s.cat.codes >= 0, vocabulary.get_indexer(s.cat.categories)[s.cat.codes], -1)
+            for s in (left, right)
+        )
+    if left.dtype != right.dtype:
+        left, right = left.astype(object), right.astype(object)
+    codes, _ = pd.factorize(pd.concat([left, right], ignore_index=True))
+    return codes[:len(left)], codes[len(left):]
+
+def join_keys(left: List[pd.Series], right: List[pd.Series]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One int64 key per row for an equi-join on several columns: equal on both sides exactly when every
+    column is equal. Rows with a missing value get -1 and must not be joined, like NULL in SQL.
+    """
+    key = np.zeros(len(left[0]) + len(right[0]), dtype=np.int64)
+    missing = np.zeros(len(key), dtype=bool)
+    for left_column, right_column in zip(left, right):
+        codes = np.concatenate(_codes(left_column, right_column))
+        missing |= codes < 0
+        # re-factorized after every column, so the combined key never outgrows int64
+        key, _ = pd.factorize(key * (codes.max(initial=0) + 2) + codes + 1)
+    key = key.astype(np.int64)
+    key[missing] = -1
+    return key[:len(left[0])], key[len(left[0]):]
+
+def lookup(columns: List[pd.Series], members: pd.DataFrame, key_columns: List[str], id_column: str) -> np.ndarray:
+    """
+    Surrogate keys of a dimension for each row of the natural key columns, -1 where there is no member.
+    """
+    row_key, member_key = join_keys(columns, [members[column] for column in key_columns])
+    position = pd.Index(member_key).get_indexer(row_key)
+    position[row_key < 0] = -1
+    return np.where(position >= 0, members[id_column].to_numpy()[np.maximum(position, 0)], -1)
+
+def _in_window(dates: pd.Series, start_date=None, end_date=None) -> pd.Series:
+    keep = dates.notna()
+    if start_date is not None:
+        keep &= dates >= pd.Timestamp(start_date)
+    if end_date is not None:
+        keep &= dates <= pd.Timestamp(end_date)
+    return keep
+
+def dimension_members(conn, float_data: pd.DataFrame, clickup_data: pd.DataFrame, start_date=None, end_date=None) -> dict:
+    """
+    Members of every dimension as natural key + attribute tuples, the same rows the DIMENSIONS sources
+    select from the staging views.
+    """
+    clickup = clickup_data[_in_window(clickup_data["date"], start_date, end_date)]
+    # every allocation of the members with one in the window, their role is picked from all of them
+    names = _lower(float_data["name"])
+    allocations = float_data[names.isin(names[_in_window(float_data["start_date"], start_date, end_date)])]
+
+    dates = pd.Series(pd.unique(clickup["date"].dropna()))
+    pairs = pd.DataFrame({"name": _lower(allocations["name"]), "role": allocations["role"]}).dropna().drop_duplicates()
+    roles = conn.execute(text(MEMBER_ROLES), {
+        "name": pairs["name"].astype(str).tolist(), "role": pairs["role"].astype(str).tolist(),
+    }).fetchall()
+    projects = clickup[["client", "project"]].dropna().drop_duplicates()
+    tasks = _lower(clickup["task"]).dropna().unique()
+
+    return {
+        "dim_date": [(day,) for day in dates.dt.date],
+        "dim_team_member": [tuple(row) for row in roles],
+        "dim_project": list(zip(projects["client"].astype(str), projects["project"].astype(str))),
+        "dim_task": [(str(task),) for task in tasks],
+    }
+
+def fact_frame(float_data: pd.DataFrame, clickup_data: pd.DataFrame, key_cache: SurrogateKeyCache, conn,
+               start_date=None, end_date=None) -> pd.DataFrame:
+    """
+    The fact rows populate_fact_table.sql inserts: every ClickUp entry in the window joined to the Float
+    allocations with the same member, client, project and task, with the surrogate keys of its dimensions.
+    An entry without an allocation, or whose allocation role is not the member's role, has no fact row.
+    """
+    clickup = clickup_data[_in_window(clickup_data["date"], start_date, end_date)].reset_index(drop=True)
+    allocations = float_data.reset_index(drop=True)
+    clickup_name, clickup_task = _lower(clickup["name"]), _lower(clickup["task"])
+
+    clickup_key, allocation_key = join_keys(
+        [clickup_name, clickup["client"], clickup["project"], clickup_task],
+        [_lower(allocations["name"]), allocations["client"], allocations["project"], _lower(allocations["task"])],
+    )
+    pairs = pd.merge(
+        pd.DataFrame({"key": clickup_key, "entry": np.arange(len(clickup))})[clickup_key >= 0],
+        pd.DataFrame({"key": allocation_key, "allocation": np.arange(len(allocations))})[allocation_key >= 0],
+        on="key",
+    )
+    entry, allocation = pairs["entry"].to_numpy(), pairs["allocation"].to_numpy()
+
+    def take(s: pd.Series, rows: np.ndarray) -> pd.Series:
+        return pd.Series(s.array.take(rows), name=s.name)
+
+    dates = key_cache.key_frame("dim_date", conn)
+    dates["date"] = pd.to_datetime(dates["date"])
+    facts = pd.DataFrame({
+        "date_id": lookup([take(clickup["date"], entry)], dates, ["date"], "date_id"),
+        "team_member_id": lookup(
+            [take(clickup_name, entry), take(allocations["role"], allocation)],
+            key_cache.key_frame("dim_team_member", conn), ["name", "role"], "team_member_id",
+        ),
+        "project_id": lookup(
+            [take(clickup["client"], entry), take(clickup["project"], entry)],
+            key_cache.key_frame("dim_project", conn), ["client", "project_name"], "project_id",
+        ),
+        "task_id": lookup([take(clickup_task, entry)], key_cache.key_frame("dim_task", conn), ["task_name"], "task_id"),
+        "log_hours": clickup["hours"].to_numpy(dtype=float)[entry],
+        "est_project_hours": pd.to_numeric(allocations["estimated_hours"]).fillna(0).to_numpy().astype(np.int64)[allocation],
+        "is_billable": (take(clickup["billable"], entry).astype(object).str.lower() == "yes").to_numpy(),
+    })
+    # inner joins on every dimension
+    return facts[(facts[["date_id", "team_member_id", "project_id", "task_id"]] >= 0).all(axis=1)][FACT_COLUMNS]
+
+@instrument()
+def build_star_schema(float_data: pd.DataFrame, clickup_data: pd.DataFrame, start_date=None, end_date=None,
+                      key_cache: SurrogateKeyCache = None) -> SurrogateKeyCache:
+    """
+    Builds the staging star schema from the cleaned Float and ClickUp frames instead of the staging views:
+    dimension members are computed in pandas and upserted through the surrogate key cache, fact foreign keys
+    are resolved with integer-coded merges and the facts of the (optional) date window are replaced with COPY,
+    with the foreign keys validated once afterwards instead of per row.
+    Produces the same tables as populate_dimensions() followed by populate_fact_table().
+    """
+    logger.info("Building the staging star schema from the cleaned frames")
+    key_cache = key_cache or SurrogateKeyCache()
+    try:
+        with engine.begin() as conn:
+            members = dimension_members(conn, float_data, clickup_data, start_date, end_date)
+            for dimension in DIMENSIONS:
+                load_dimension(conn, dimension, key_cache, rows=members[dimension])
+
+            facts = fact_frame(float_data, clickup_data, key_cache, conn, start_date, end_date)
+            # every key was just looked up in the dimensions, checking them row by row on COPY is pure overhead
+            foreign_keys = conn.execute(text(FACT_FOREIGN_KEYS)).fetchall()
+            for name, _ in foreign_keys:
+                conn.execute(text(f'ALTER TABLE staging.fact_timesheet DROP CONSTRAINT "{name}"'))
+            conn.execute(text(DELETE_FACTS), {"start_date": start_date, "end_date": end_date})
+            copy_to_raw(facts, "fact_timesheet", mode="append", con=conn, schema="staging")
+            for name, definition in foreign_keys:
+                conn.execute(text(f'ALTER TABLE staging.fact_timesheet ADD CONSTRAINT "{name}" {definition}'))
+        logger.info(f"Staging star schema built: {len(facts)} fact rows")
+        return key_cache
+    except Exception as e:
+        logger.error(f"Error building the staging star schema from frames: {e}")
+        raise e
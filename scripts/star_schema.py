@@ -1,48 +1,595 @@
 
+import re
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from sqlalchemy import text
-from utils.db import engine
+from scripts.rollups import ROLLUPS, refresh_rollups
+from utils.db import get_engine
+from utils.instrumentation import instrument, run_id
+from utils.sql import run_sql_script, sql_statements
 from loguru import logger
 
+engine = get_engine("bulk_load")
+
+# Optional date window applied to the staging source of each dimension
+DATE_WINDOW = """
+    AND (CAST(:start_date AS DATE) IS NULL OR {column} >= CAST(:start_date AS DATE))
+    AND (CAST(:end_date AS DATE) IS NULL OR {column} <= CAST(:end_date AS DATE))
+"""
+
+# Natural key, attributes, distinct members in staging and the upsert fed with one array per column.
+# Upserts return natural key + attributes + surrogate key, in that order.
+DIMENSIONS = {
+    "dim_date": {
+        "id": "date_id",
+        "natural_key": ["date"],
+        "attributes": [],
+        "source": """
+            SELECT DISTINCT date
+            FROM staging.mv_clickup_timesheets
+            WHERE date IS NOT NULL
+        """ + DATE_WINDOW.format(column="date"),
+        "upsert": """
+            INSERT INTO staging.dim_date (date, day_of_week, day, month, year, is_weekend)
+            SELECT
+                d,
+                TO_CHAR(d, 'Day'),
+                EXTRACT(DAY FROM d),
+                EXTRACT(MONTH FROM d),
+                EXTRACT(YEAR FROM d),
+                EXTRACT(DOW FROM d) IN (0, 6)
+            FROM unnest(CAST(:date AS DATE[])) AS d
+            ON CONFLICT (date) DO NOTHING
+            RETURNING date, date_id
+        """,
+    },
+    "dim_team_member": {
+        "id": "team_member_id",
+        "natural_key": ["name"],
+        "attributes": ["role"],
+        # a windowed load still picks each member's role from all of their allocations, like a full one
+        "source": """
+            SELECT DISTINCT ON (LOWER(name)) LOWER(name) AS name, role
+            FROM staging.mv_float_allocations
+            WHERE name IS NOT NULL AND role IS NOT NULL
+              AND ((CAST(:start_date AS DATE) IS NULL AND CAST(:end_date AS DATE) IS NULL) OR LOWER(name) IN (
+                  SELECT LOWER(name)
+                  FROM staging.mv_float_allocations
+                  WHERE TRUE
+        """ + DATE_WINDOW.format(column="start_date") + """
+              ))
+            ORDER BY LOWER(name), role
+        """,
+        "upsert": """
+            INSERT INTO staging.dim_team_member (name, role)
+            SELECT * FROM unnest(CAST(:name AS TEXT[]), CAST(:role AS TEXT[]))
+            ON CONFLICT (name) DO UPDATE SET role = EXCLUDED.role
+            RETURNING name, role, team_member_id
+        """,
+    },
+    "dim_project": {
+        "id": "project_id",
+        "natural_key": ["client", "project_name"],
+        "attributes": [],
+        "source": """
+            SELECT DISTINCT client, project
+            FROM staging.mv_clickup_timesheets
+            WHERE client IS NOT NULL AND project IS NOT NULL
+        """ + DATE_WINDOW.format(column="date"),
+        "upsert": """
+            INSERT INTO staging.dim_project (client, project_name)
+            SELECT * FROM unnest(CAST(:client AS TEXT[]), CAST(:project_name AS TEXT[]))
+            ON CONFLICT (client, project_name) DO NOTHING
+            RETURNING client, project_name, project_id
+        """,
+    },
+    "dim_task": {
+        "id": "task_id",
+        "natural_key": ["task_name"],
+        "attributes": [],
+        "source": """
+            SELECT DISTINCT task
+            FROM staging.mv_clickup_timesheets
+            WHERE task IS NOT NULL
+        """ + DATE_WINDOW.format(column="date"),
+        "upsert": """
+            INSERT INTO staging.dim_task (task_name)
+            SELECT * FROM unnest(CAST(:task_name AS TEXT[]))
+            ON CONFLICT (task_name) DO NOTHING
+            RETURNING task_name, task_id
+        """,
+    },
+}
+
+
+class SurrogateKeyCache:
+    """
+    Natural key -> (surrogate key, attributes) per dimension, read from staging once and kept up to date with
+    every upsert made through it. The frame builder (star_builder.py) resolves fact keys from its key frames.
+    """
+
+    def __init__(self):
+        self._members = {}
+
+    def members(self, dimension: str, conn) -> dict:
+        if dimension not in self._members:
+            spec = DIMENSIONS[dimension]
+            width = len(spec["natural_key"])
+            columns = ", ".join(spec["natural_key"] + spec["attributes"] + [spec["id"]])
+            rows = conn.execute(text(f"SELECT {columns} FROM staging.{dimension}")).fetchall()
+            self._members[dimension] = {tuple(row[:width]): (row[-1], tuple(row[width:-1])) for row in rows}
+        return self._members[dimension]
+
+    def update(self, dimension: str, rows):
+        width = len(DIMENSIONS[dimension]["natural_key"])
+        members = self._members[dimension]
+        for row in rows:
+            members[tuple(row[:width])] = (row[-1], tuple(row[width:-1]))
+
+    def invalidate(self, dimension: str):
+        self._members.pop(dimension, None)
+
+    def key_frame(self, dimension: str, conn=None) -> pd.DataFrame:
+        """
+        The cached members as a frame of natural key, attribute and surrogate key columns, for vectorized merges.
+        """
+        spec = DIMENSIONS[dimension]
+        if conn is None:
+            with engine.connect() as conn:
+                members = self.members(dimension, conn)
+        else:
+            members = self.members(dimension, conn)
+        return pd.DataFrame(
+            [key + attributes + (surrogate_key,) for key, (surrogate_key, attributes) in members.items()],
+            columns=spec["natural_key"] + spec["attributes"] + [spec["id"]],
+        )
+
+# advisory lock a backfill's session holds for as long as the staging fact foreign keys are dropped
+FOREIGN_KEYS_LOCK = "hashtext('raw.backfill_dropped_constraints')"
+
+def restore_dropped_foreign_keys(conn) -> int:
+    """
+    Adds back the staging foreign keys recorded in raw.backfill_dropped_constraints that are still missing
+    and forgets them. The caller holds FOREIGN_KEYS_LOCK, so no backfill has them dropped on purpose.
+    """
+    if conn.execute(text("SELECT to_regclass('raw.backfill_dropped_constraints')")).scalar() is None:
+        return 0
+    dropped = conn.execute(text("SELECT table_name, name, definition FROM raw.backfill_dropped_constraints")).fetchall()
+    restored = 0
+    for table, name, definition in dropped:
+        missing = conn.execute(text("""
+            SELECT to_regclass(:table) IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(:table) AND conname = :name
+            )
+        """), {"table": table, "name": name}).scalar()
+        if missing:
+            conn.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'))
+            restored += 1
+    conn.execute(text("DELETE FROM raw.backfill_dropped_constraints"))
+    return restored
+
+@instrument()
 def create_staging_star_schema():
     logger.info("Creating star schema tables in the staging schema")
     try:
         with engine.begin() as conn:
-            star_schema_script = open("sql/create_staging_star_schema.sql", "r").read()
-            conn.execute(text(star_schema_script))
+            run_sql_script(conn, "sql/create_staging_star_schema.sql")
+            # unless a backfill is publishing months right now, with the keys dropped
+            if conn.execute(text(f"SELECT pg_try_advisory_xact_lock({FOREIGN_KEYS_LOCK})")).scalar():
+                restored = restore_dropped_foreign_keys(conn)
+                if restored:
+                    logger.warning(f"Restored {restored} staging foreign keys dropped by a backfill that did not finish")
             logger.info("Star schema tables created successfully")
     except Exception as e:
         logger.error(f"Error creating star schema tables: {e}")
         raise e
 
-def load_prod_schema():
-    logger.info("Creating and loading tables in the prod schema")
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"fact_timesheet_p{month:%Y%m}"
+
+def _prod_fact_partitions(conn) -> dict:
+    """
+    Existing partitions of prod.fact_timesheet as {month start: partition name}.
+    """
+    rows = conn.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'prod.fact_timesheet'::regclass
+    """)).scalars()
+    return {date(int(name[-6:-2]), int(name[-2:]), 1): name for name in rows}
+
+@instrument()
+def create_fact_partitions(months_ahead: int = 3, start: date = None):
+    """
+    Creates empty monthly partitions of prod.fact_timesheet from `start` (this month by default)
+    through `months_ahead` months later, so new data never waits on partition DDL.
+    """
+    month = month_start(start or date.today())
+    with engine.begin() as conn:
+        existing = _prod_fact_partitions(conn)
+        for _ in range(months_ahead + 1):
+            if month not in existing:
+                conn.execute(text(f"""
+                    CREATE TABLE prod.{partition_name(month)}
+                    PARTITION OF prod.fact_timesheet
+                    FOR VALUES FROM ('{month}') TO ('{next_month(month)}')
+                """))
+                logger.info(f"Created partition prod.{partition_name(month)}")
+            month = next_month(month)
+
+@instrument()
+def build_fact_partition(month: date) -> str:
+    """
+    Builds one month of prod facts from staging into staging.<partition>, with the bounds CHECK,
+    primary key, indexes and foreign keys of prod.fact_timesheet already in place: ATTACH reuses them
+    instead of building indexes or validating constraints with a scan while it holds its lock.
+    """
+    staged = f"staging.{partition_name(month)}"
+    lower, upper = month, next_month(month)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {staged}"))
+        conn.execute(text(f"CREATE TABLE {staged} (LIKE prod.fact_timesheet INCLUDING DEFAULTS)"))
+        conn.execute(text(f"""
+            INSERT INTO {staged} (timesheet_id, date_id, team_member_id, project_id, task_id, log_hours, est_project_hours, is_billable, date)
+            SELECT f.timesheet_id, f.date_id, f.team_member_id, f.project_id, f.task_id, f.log_hours, f.est_project_hours, f.is_billable, d.date
+            FROM staging.fact_timesheet f
+            JOIN staging.dim_date d ON d.date_id = f.date_id
+            WHERE d.date >= :lower AND d.date < :upper
+        """), {"lower": lower, "upper": upper})
+        conn.execute(text(f"ALTER TABLE {staged} ADD CONSTRAINT {partition_name(month)}_bounds CHECK (date >= '{lower}' AND date < '{upper}')"))
+        conn.execute(text(f"ALTER TABLE {staged} ADD PRIMARY KEY (timesheet_id, date)"))
+
+        index_definitions = conn.execute(text("""
+            SELECT pg_get_indexdef(indexrelid)
+            FROM pg_index
+            WHERE indrelid = 'prod.fact_timesheet'::regclass AND NOT indisprimary
+        """)).scalars()
+        for definition in index_definitions:
+            conn.execute(text(re.sub(r"INDEX \S+ ON (ONLY )?prod\.fact_timesheet ", f"INDEX ON {staged} ", definition)))
+
+        # validated here, ATTACH adopts a matching foreign key as the partition's copy of the parent's
+        foreign_keys = conn.execute(text("""
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = 'prod.fact_timesheet'::regclass AND contype = 'f'
+        """)).fetchall()
+        for name, definition in foreign_keys:
+            conn.execute(text(f'ALTER TABLE {staged} ADD CONSTRAINT "{partition_name(month)}_{name}" {definition}'))
+        conn.execute(text(f"ANALYZE {staged}"))
+    return staged
+
+@instrument()
+def swap_fact_partition(month: date):
+    """
+    Replaces the prod partition of a month with the one built in staging and refreshes the month's rollups,
+    in one short transaction.
+    """
+    name = partition_name(month)
+    with engine.begin() as conn:
+        if month in _prod_fact_partitions(conn):
+            conn.execute(text(f"ALTER TABLE prod.fact_timesheet DETACH PARTITION prod.{name}"))
+            conn.execute(text(f"DROP TABLE prod.{name}"))
+        conn.execute(text(f"ALTER TABLE staging.{name} SET SCHEMA prod"))
+        conn.execute(text(f"""
+            ALTER TABLE prod.fact_timesheet ATTACH PARTITION prod.{name}
+            FOR VALUES FROM ('{month}') TO ('{next_month(month)}')
+        """))
+        refresh_rollups(conn, month, next_month(month))
+
+def affected_months(conn, start_date=None, end_date=None) -> list:
+    # months with staging facts in the window, plus non-empty prod partitions in it that may need emptying
+    params = {"start_date": start_date, "end_date": end_date}
+    months = set(conn.execute(text("""
+        SELECT DISTINCT CAST(date_trunc('month', d.date) AS DATE)
+        FROM staging.fact_timesheet f
+        JOIN staging.dim_date d ON d.date_id = f.date_id
+        WHERE TRUE
+    """ + DATE_WINDOW.format(column="d.date")), params).scalars())
+    for month, name in _prod_fact_partitions(conn).items():
+        in_window = (start_date is None or next_month(month) > pd.Timestamp(start_date).date()) and \
+                    (end_date is None or month <= pd.Timestamp(end_date).date())
+        if in_window and conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM prod.{name})")).scalar():
+            months.add(month)
+    return sorted(months)
+
+@instrument()
+def detect_fact_changes():
+    """
+    Finds the date window of staging facts that differ from what prod was last published from, once per run:
+    every ClickUp date whose entries changed, and every ClickUp and allocation date of a member whose Float
+    allocations changed. Stores it for changed_fact_window() and the new state for record_published_sources().
+    Returns None when nothing changed, and (None, None), every date, when prod has not been published from
+    the recorded state (first run, prod dropped or still unpartitioned).
+    """
     try:
         with engine.begin() as conn:
-            star_schema_script = open("sql/load_prod_schema.sql", "r").read()
-            conn.execute(text(star_schema_script))
-            logger.info("Prod tables star schema loaded successfully!")
+            run_sql_script(conn, "sql/fact_source_changes.sql")
+            unpublished = conn.execute(text("""
+                SELECT COALESCE((SELECT relkind FROM pg_class WHERE oid = to_regclass('prod.fact_timesheet')) <> 'p', TRUE)
+                    OR NOT EXISTS (SELECT 1 FROM staging.fact_source_state)
+            """)).scalar()
+            start_date, end_date = None, None
+            if not unpublished:
+                start_date, end_date = conn.execute(text("""
+                    SELECT MIN(date), MAX(date) FROM (
+                        SELECT CAST(key AS DATE) AS date FROM fact_source_changes WHERE source = 'clickup_timesheets'
+                        UNION ALL
+                        SELECT cu.date FROM staging.mv_clickup_timesheets cu
+                        JOIN fact_source_changes ch ON ch.source = 'float_allocations' AND ch.key = cu.name
+                        UNION ALL
+                        SELECT fa.start_date FROM staging.mv_float_allocations fa
+                        JOIN fact_source_changes ch ON ch.source = 'float_allocations' AND ch.key = fa.name
+                    ) dates
+                """)).one()
+            changed = unpublished or start_date is not None
+
+            conn.execute(text("DELETE FROM staging.fact_source_pending"))
+            keys = conn.execute(text("""
+                INSERT INTO staging.fact_source_pending (source, key, row_count, fingerprint)
+                SELECT source, key, row_count, fingerprint FROM fact_source_changes
+            """)).rowcount
+            conn.execute(text("DELETE FROM staging.fact_window"))
+            conn.execute(text("""
+                INSERT INTO staging.fact_window (run_id, start_date, end_date, changed)
+                VALUES (:run_id, :start_date, :end_date, :changed)
+            """), {"run_id": run_id(), "start_date": start_date, "end_date": end_date, "changed": changed})
+        if not changed:
+            logger.info("No staging rows changed since the last prod publish")
+            return None
+        logger.info(f"{keys} staging dates and members changed since the last prod publish, "
+                    f"facts to rebuild: {start_date or '-inf'} to {end_date or '+inf'}")
+        return start_date, end_date
     except Exception as e:
-        logger.error(f"Error loading prod star schema tables: {e}")
+        logger.error(f"Error detecting changed staging rows: {e}")
         raise e
 
-def populate_dimensions():
-    logger.info("Populating dimension tables")
+def changed_fact_window():
+    """
+    The window detect_fact_changes() found in this run (see there), detected now if it has not run yet.
+    """
+    with engine.connect() as conn:
+        found = conn.execute(text("""
+            SELECT start_date, end_date, changed FROM staging.fact_window WHERE run_id = :run_id
+        """), {"run_id": run_id()}).first()
+    if found is None:
+        return detect_fact_changes()
+    return (found.start_date, found.end_date) if found.changed else None
+
+@instrument()
+def record_published_sources():
+    """
+    Records the staging rows prod was just published from, the baseline of detect_fact_changes().
+    """
     try:
         with engine.begin() as conn:
-            dimension_script = open("sql/populate_dimensions.sql", "r").read()
-            conn.execute(text(dimension_script))
-            logger.info("Dimension tables populated successfully")
+            conn.execute(text("""
+                DELETE FROM staging.fact_source_state
+                WHERE (source, key) IN (SELECT source, key FROM staging.fact_source_pending)
+            """))
+            recorded = conn.execute(text("""
+                INSERT INTO staging.fact_source_state (source, key, row_count, fingerprint)
+                SELECT source, key, row_count, fingerprint
+                FROM staging.fact_source_pending
+                WHERE row_count IS NOT NULL
+            """)).rowcount
+            conn.execute(text("DELETE FROM staging.fact_source_pending"))
+            conn.execute(text("DELETE FROM staging.fact_window"))
+            logger.info(f"Recorded the published staging sources ({recorded} changed dates and members)")
     except Exception as e:
-        logger.error(f"Error populating dimension tables: {e}")
+        logger.error(f"Error recording the published staging sources: {e}")
+        raise e
+
+def _run_parallel(statements: list, workers: int, maintenance_work_mem: str):
+    """
+    Runs independent DDL statements on `workers` pooled connections, each with its own maintenance_work_mem.
+    """
+    def run(statement):
+        with engine.begin() as conn:
+            conn.execute(text("SELECT set_config('maintenance_work_mem', :mem, true)"), {"mem": maintenance_work_mem})
+            conn.execute(text(statement))
+
+    if not statements:
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # list() re-raises the first failure
+        list(pool.map(run, statements))
+
+@instrument()
+def publish_prod_schema(index_workers: int = 4, maintenance_work_mem: str = "512MB", partitions_ahead: int = 3):
+    """
+    Rebuilds the whole star schema in prod_shadow and swaps it in for prod:
+    bulk load without indexes, build indexes and keys in parallel, ANALYZE,
+    then rename the schemas in one short transaction. Live tables never see a load or an index build.
+    """
+    logger.info("Building the prod star schema in the shadow schema")
+    try:
+        with engine.begin() as conn:
+            run_sql_script(conn, "sql/create_prod_shadow_schema.sql")
+            months = conn.execute(text("""
+                SELECT DISTINCT CAST(date_trunc('month', d.date) AS DATE)
+                FROM staging.fact_timesheet f
+                JOIN staging.dim_date d ON d.date_id = f.date_id
+            """)).scalars().all()
+            partitions = []
+            for month in sorted(months):
+                partitions.append(f"prod_shadow.{partition_name(month)}")
+                conn.execute(text(f"""
+                    CREATE TABLE {partitions[-1]}
+                    PARTITION OF prod_shadow.fact_timesheet
+                    FOR VALUES FROM ('{month}') TO ('{next_month(month)}')
+                """))
+
+        with engine.begin() as conn:
+            run_sql_script(conn, "sql/load_prod_shadow.sql")
+        with engine.begin() as conn:
+            refresh_rollups(conn, schema="prod_shadow")
+        logger.info(f"Shadow schema loaded ({len(partitions)} fact partitions), building indexes")
+
+        per_table, on_fact = [], []
+        for statement in sql_statements("sql/create_prod_shadow_indexes.sql"):
+            if "prod_shadow.fact_timesheet(" not in statement and "prod_shadow.fact_timesheet " not in statement:
+                per_table.append(statement)
+                continue
+            on_fact.append(statement)
+            if "FOREIGN KEY" not in statement:
+                # build the partition-level copy first, the parent statement only attaches it
+                partition_statement = re.sub(r"INDEX \S+ ON", "INDEX ON", statement)
+                per_table += [re.sub(r"prod_shadow\.fact_timesheet\b", partition, partition_statement) for partition in partitions]
+
+        _run_parallel(per_table, index_workers, maintenance_work_mem)
+        with engine.begin() as conn:
+            for statement in on_fact:
+                conn.execute(text(statement))
+        tables = ["prod_shadow.dim_date", "prod_shadow.dim_team_member", "prod_shadow.dim_project", "prod_shadow.dim_task"]
+        tables += [f"prod_shadow.{rollup['table']}" for rollup in ROLLUPS.values()]
+        _run_parallel([f"ANALYZE {table}" for table in tables + partitions + ["prod_shadow.fact_timesheet"]], index_workers, maintenance_work_mem)
+
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA IF EXISTS prod_previous CASCADE"))
+        with engine.begin() as conn:
+            conn.execute(text("SET LOCAL lock_timeout = '10s'"))
+            if conn.execute(text("SELECT to_regnamespace('prod')")).scalar() is not None:
+                conn.execute(text("ALTER SCHEMA prod RENAME TO prod_previous"))
+            conn.execute(text("ALTER SCHEMA prod_shadow RENAME TO prod"))
+        logger.info("Swapped the shadow schema in as prod")
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA IF EXISTS prod_previous CASCADE"))
+
+        create_fact_partitions(partitions_ahead)
+        logger.info("Prod tables star schema published successfully!")
+    except Exception as e:
+        logger.error(f"Error publishing prod star schema: {e}")
+        raise e
+
+def prepare_prod_schema(conn) -> bool:
+    """
+    Creates the prod tables that are missing and upserts the staging dimensions into prod, ahead of fact
+    partition swaps. Returns whether the rollups are empty and must be filled from every fact afterwards.
+    """
+    if conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('prod.fact_timesheet')")).scalar() == "r":
+        # unpartitioned fact table from before partitioning, every month is rebuilt by the caller
+        logger.warning("Replacing unpartitioned prod.fact_timesheet with the partitioned table")
+        conn.execute(text("DROP TABLE prod.fact_timesheet"))
+    run_sql_script(conn, "sql/load_prod_schema.sql")
+    # rollup tables just created next to facts published before them
+    return not conn.execute(text("SELECT EXISTS (SELECT 1 FROM prod.rollup_daily)")).scalar()
+
+def finish_prod_rollups(backfill: bool = False):
+    with engine.begin() as conn:
+        if backfill:
+            refresh_rollups(conn)
+        # the router's range scans need current statistics on the refreshed periods
+        for rollup in ROLLUPS.values():
+            conn.execute(text(f"ANALYZE prod.{rollup['table']}"))
+
+@instrument()
+def load_prod_schema(start_date=None, end_date=None, partitions_ahead: int = 3, mode: str = "partition",
+                     index_workers: int = 4, maintenance_work_mem: str = "512MB"):
+    """
+    Publishes the staging star schema to prod. In "partition" mode dimensions are upserted, and every month of facts
+    touched by the (optional) date window is rebuilt in staging and swapped into the partitioned prod table,
+    together with its rows of the prod rollups.
+    "shadow" mode rebuilds everything with publish_prod_schema().
+    """
+    if mode == "shadow":
+        return publish_prod_schema(index_workers, maintenance_work_mem, partitions_ahead)
+    if mode != "partition":
+        raise ValueError(f"Unknown prod publish mode: {mode}")
+
+    logger.info("Creating and loading tables in the prod schema")
+    try:
+        with engine.begin() as conn:
+            backfill_rollups = prepare_prod_schema(conn)
+            months = affected_months(conn, start_date, end_date)
+
+        for month in months:
+            build_fact_partition(month)
+            swap_fact_partition(month)
+            logger.info(f"Swapped in prod.{partition_name(month)}")
+        finish_prod_rollups(backfill_rollups)
+        create_fact_partitions(partitions_ahead)
+        logger.info(f"Prod tables star schema loaded successfully! ({len(months)} fact partitions)")
+    except Exception as e:
+        logger.error(f"Error loading prod star schema tables: {e}")
         raise e
 
-def populate_fact_table():
+@instrument()
+def populate_fact_table(start_date=None, end_date=None):
     logger.info("Populating fact table")
     try:
         with engine.begin() as conn:
-            fact_script = open("sql/populate_fact_table.sql", "r").read()
-            conn.execute(text(fact_script))
+            run_sql_script(conn, "sql/populate_fact_table.sql", {"start_date": start_date, "end_date": end_date})
             logger.info("Fact table populated successfully")
     except Exception as e:
         logger.error(f"Error populating fact table: {e}")
         raise e
+
+@instrument()
+def load_dimension(conn, dimension: str, key_cache: SurrogateKeyCache, start_date=None, end_date=None,
+                   rows: list = None) -> int:
+    """
+    Upserts the staging members of one dimension that are new or whose attributes changed.
+    `rows` (natural key + attribute tuples) replaces the query on the staging views.
+    """
+    spec = DIMENSIONS[dimension]
+    width = len(spec["natural_key"])
+    members = key_cache.members(dimension, conn)
+
+    if rows is None:
+        rows = conn.execute(text(spec["source"]), {"start_date": start_date, "end_date": end_date}).fetchall()
+    changed = [row for row in rows if members.get(tuple(row[:width]), (None, None))[1] != tuple(row[width:])]
+    if changed:
+        columns = spec["natural_key"] + spec["attributes"]
+        params = {column: [row[i] for row in changed] for i, column in enumerate(columns)}
+        upserted = conn.execute(text(spec["upsert"]), params).fetchall()
+        key_cache.update(dimension, upserted)
+        if len(upserted) < len(changed):
+            # another writer inserted some of these members first, re-read them on next use
+            key_cache.invalidate(dimension)
+
+    logger.info(f"{dimension}: {len(changed)} new or changed members out of {len(rows)} in staging")
+    return len(changed)
+
+@instrument()
+def populate_dimension(dimension: str, start_date=None, end_date=None) -> int:
+    """
+    Upserts the new or changed members of one staging dimension in the (optional) date window, in a transaction
+    of its own: the dimensions share no rows, so the pipeline populates them in parallel.
+    """
+    try:
+        with engine.begin() as conn:
+            return load_dimension(conn, dimension, SurrogateKeyCache(), start_date, end_date)
+    except Exception as e:
+        logger.error(f"Error populating {dimension}: {e}")
+        raise e
+
+@instrument()
+def populate_dimensions(incremental: bool = True, start_date=None, end_date=None):
+    """
+    Populates the staging dimensions. Incremental mode upserts only the new or changed members of the (optional)
+    date window, otherwise populate_dimensions.sql rescans the staging views. populate_fact_table.sql joins the
+    facts to the dimensions in the database, the surrogate key cache only diffs the members here.
+    """
+    logger.info("Populating dimension tables")
+    try:
+        with engine.begin() as conn:
+            if not incremental:
+                run_sql_script(conn, "sql/populate_dimensions.sql")
+                logger.info("Dimension tables populated successfully")
+                return
+
+            key_cache = SurrogateKeyCache()
+            for dimension in DIMENSIONS:
+                load_dimension(conn, dimension, key_cache, start_date, end_date)
+            logger.info("Dimension tables populated successfully")
+    except Exception as e:
+        logger.error(f"Error populating dimension tables: {e}")
+        raise e
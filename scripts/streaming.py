@@ -0,0 +1,269 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from queue import Queue, Full
+from threading import Event, Thread
+from typing import Iterable, Iterator, List, Tuple, Union
+from sqlalchemy import text
+from loguru import logger
+from scripts.extract import numbers_or_text, numeric_columns, read_schema
+from scripts.validation import validate_frame, log_rejections
+from scripts.transform import clean_data
+from scripts.load_raw import LOAD_MODES, DeltaLoad, copy_to_raw, record_touched_dates
+from scripts.quarantine import quarantine_rows
+from utils.db import get_engine
+from utils.instrumentation import instrument
+
+engine = get_engine("bulk_load")
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+# the second row hash: another SipHash key for text, and the bits of numbers and dates flipped with a constant
+# before pandas mixes them (it mixes them without a key), so it does not repeat the first hash's collisions
+SECOND_HASH_KEY = "seen-rows-hash-2"
+SECOND_HASH_FLIP = np.uint64(0x9E3779B97F4A7C15)
+
+
+def row_hashes(chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Two independent 64-bit hashes of every row, equal for equal rows in any chunk.
+    """
+    first = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    flipped = {}
+    for name, values in chunk.items():
+        if not isinstance(values.dtype, np.dtype) or values.dtype.kind not in "biufmM":
+            flipped[name] = values
+            continue
+        values = values.to_numpy()
+        if values.dtype.kind == "b":
+            bits = values.astype("u8")
+        else:
+            bits = values.view(f"u{values.dtype.itemsize}").astype("u8")
+        flipped[name] = pd.Series(bits ^ SECOND_HASH_FLIP, index=chunk.index)
+    second = pd.util.hash_pandas_object(pd.DataFrame(flipped), index=False, hash_key=SECOND_HASH_KEY).to_numpy()
+    return first, second
+
+
+def _sorted_run(first: np.ndarray, second: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # distinct (first, second) pairs ordered by the first hash
+    order = np.lexsort((second, first))
+    first, second = first[order], second[order]
+    distinct = np.ones(len(first), dtype=bool)
+    distinct[1:] = (first[1:] != first[:-1]) | (second[1:] != second[:-1])
+    return first[distinct], second[distinct]
+
+
+class SeenRows:
+    """
+    Set of rows remembered by their two row_hashes (16 bytes a row) instead of their values, kept as a few
+    runs sorted by the first hash and merged binary-counter style, which keeps O(log n) of them around.
+    A row counts as seen only when both hashes match: two distinct rows are mistaken for each other
+    (and the later one dropped) with odds of about n^2 / 2^129 for n rows, where a single 64-bit hash
+    has n^2 / 2^65, already about one in 4000 at 10^8 rows.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def contains(self, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(first), dtype=bool)
+        for run_first, run_second in self.runs:
+            left = np.searchsorted(run_first, first, side="left")
+            right = np.searchsorted(run_first, first, side="right")
+            single = right - left == 1
+            found[single] |= run_second[left[single]] == second[single]
+            # rows whose first hash collides with several remembered rows, compared one at a time
+            for row in np.flatnonzero(right - left > 1):
+                found[row] |= bool((run_second[left[row]:right[row]] == second[row]).any())
+        return found
+
+    def add(self, first: np.ndarray, second: np.ndarray):
+        run = _sorted_run(first, second)
+        if len(run[0]) == 0:
+            return
+        while self.runs and len(self.runs[-1][0]) <= len(run[0]):
+            previous = self.runs.pop()
+            run = _sorted_run(np.concatenate([previous[0], run[0]]), np.concatenate([previous[1], run[1]]))
+        self.runs.append(run)
+
+
+def _typed_chunk(table: pa.Table, numeric: List[str], start: int) -> pd.DataFrame:
+    # numeric columns are read as text and cast per chunk; a column with a non-number falls back
+    # like read_csv_typed, for this chunk only
+    fallback = []
+    for alias in numeric:
+        try:
+            table = table.set_column(table.schema.get_field_index(alias), alias, pc.cast(table[alias], pa.float64()))
+        except pa.ArrowInvalid:
+            fallback.append(alias)
+    chunk = table.to_pandas()
+    for alias in fallback:
+        chunk[alias] = numbers_or_text(chunk[alias])
+    # row numbers continue across chunks, as positions in the file
+    chunk.index = pd.RangeIndex(start, start + len(chunk))
+    return chunk
+
+def read_chunks(file_path: str, model, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Streams a CSV export in frames of `chunk_size` rows, typed like read_csv_typed: the model's columns only,
+    with the same types, so a value in one chunk cannot change how the others are read.
+    """
+    logger.info(f"Streaming data from {file_path} in chunks of {chunk_size} rows")
+
+    if not os.path.exists(file_path):
+        logger.error(f"File not found: {file_path}")
+        raise FileNotFoundError
+
+    schema = read_schema(model)
+    numeric = numeric_columns(schema)
+    convert_options = pacsv.ConvertOptions(
+        column_types={**schema, **{alias: pa.string() for alias in numeric}},
+        include_columns=list(schema),
+        include_missing_columns=True,
+        strings_can_be_null=True,
+    )
+    reader = pacsv.open_csv(file_path, convert_options=convert_options)
+    pending, pending_rows, start = [], 0, 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield _typed_chunk(table.slice(0, chunk_size), numeric, start)
+            start += chunk_size
+            rest = table.slice(chunk_size)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        yield _typed_chunk(pa.Table.from_batches(pending), numeric, start)
+
+
+def validate_chunks(chunks: Iterable[pd.DataFrame], model, source: str, quarantine: bool = True) -> Iterator[pd.DataFrame]:
+    rejections = {}
+    valid_rows = 0
+    quarantined = False
+    for chunk in chunks:
+        validated, chunk_rejections, rejected = validate_frame(chunk, model, return_rejected=True)
+        for rule, count in chunk_rejections.items():
+            rejections[rule] = rejections.get(rule, 0) + count
+        if quarantine and len(rejected):
+            # the first chunk with rejected rows clears what an earlier attempt of this run quarantined
+            quarantine_rows(chunk.loc[rejected.index], rejected, source, replace=not quarantined)
+            quarantined = True
+        valid_rows += len(validated)
+        if not validated.empty:
+            yield validated
+
+    log_rejections(rejections, source)
+    logger.info(f"Extracted {valid_rows} valid data rows from {source}")
+
+
+def validate_files(file_paths: List[str], model, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    # the valid chunks of every file in turn, rejections are counted and quarantined per file
+    for file_path in file_paths:
+        yield from validate_chunks(read_chunks(file_path, model, chunk_size), model, file_path)
+
+
+def drop_duplicate_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Drops rows already seen in this or an earlier chunk, same as drop_duplicates() on the full file
+    up to the hash collision odds of SeenRows.
+    """
+    seen = SeenRows()
+    for chunk in chunks:
+        first, second = row_hashes(chunk)
+        # within the chunk the values themselves are compared, earlier chunks are only remembered by hash
+        keep = ~chunk.duplicated().to_numpy() & ~seen.contains(first, second)
+        seen.add(first[keep], second[keep])
+        yield chunk[keep]
+
+
+def clean_chunks(chunks: Iterable[pd.DataFrame], dataset_name: str) -> Iterator[pd.DataFrame]:
+    for chunk in chunks:
+        cleaned = clean_data(chunk, dataset_name)
+        if not cleaned.empty:
+            yield cleaned
+
+
+def prefetch(chunks: Iterable[pd.DataFrame], depth: int = 1) -> Iterator[pd.DataFrame]:
+    """
+    Produces the next chunks on a background thread while the caller works on the current one.
+    At most `depth` chunks wait in the queue, so memory stays bounded by the chunk size.
+    """
+    queue = Queue(maxsize=depth)
+    stop = Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+
+    def produce():
+        try:
+            for chunk in chunks:
+                put(chunk)
+                if stop.is_set():
+                    return
+            put(done)
+        except BaseException as e:
+            put(e)
+
+    producer = Thread(target=produce, name="chunk-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+@instrument()
+def stream_to_raw(file_paths: Union[str, List[str]], model, dataset_name: str, table_name: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  load_mode: str = "truncate") -> int:
+    """
+    Extracts, validates, cleans and loads a CSV, or several in order, into the raw schema one chunk at a time.
+    Duplicates are dropped across files as well as within them.
+    Loads every chunk with COPY in a single transaction, like copy_to_raw: "truncate" replaces the raw table
+    contents, "append" adds the rows to it and "delta" writes only new rows and deletes rows gone from the file.
+    """
+    if load_mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {load_mode}")
+    file_paths = [file_paths] if isinstance(file_paths, str) else list(file_paths)
+    source = file_paths[0] if len(file_paths) == 1 else f"{len(file_paths)} {dataset_name} files"
+    chunks = validate_files(file_paths, model, chunk_size)
+    chunks = drop_duplicate_chunks(chunks)
+    chunks = clean_chunks(chunks, dataset_name)
+
+    loaded = 0
+    with engine.begin() as conn:
+        delta = DeltaLoad(table_name, conn) if load_mode == "delta" else None
+        if load_mode == "truncate":
+            # emptied up front: an export without a single valid row replaces the table too, like copy_to_raw
+            conn.execute(text(f"TRUNCATE raw.{table_name}"))
+            record_touched_dates(conn, table_name, every_date=True)
+        for chunk in prefetch(chunks):
+            if delta is not None:
+                delta.add(chunk)
+            else:
+                copy_to_raw(chunk, table_name, mode="append", con=conn)
+            loaded += len(chunk)
+        if delta is not None:
+            delta.finish()
+
+    if loaded == 0:
+        logger.warning(f"No valid data extracted from {source}")
+    logger.info(f"Streamed {loaded} rows from {source} into raw.{table_name}")
+    return loaded
@@ -1,70 +1,101 @@
 
 from loguru import logger
+import numpy as np
 import pandas as pd
-
-from star_schema import create_staging_star_schema, populate_dimensions, populate_fact_table, load_prod_schema
+from utils.instrumentation import instrument
+
+#TODO: move critical columns and other data quality thresholds to config
+CRITICAL_COLUMNS = ["client", "project", "name", "task"]
+DATE_COLUMNS = ["start_date", "end_date", "date"]
+# at most a few hundred distinct values each, kept as categoricals
+CATEGORY_COLUMNS = ["client", "project", "name", "task", "role", "billable"]
+# lowercased and stripped
+NORMALIZED_COLUMNS = ["role", "task", "billable", "client"]
+
+
+def _normalize_categories(s: pd.Series) -> pd.Series:
+    """
+    Lowercases and strips a categorical column once per category, merging categories that become equal.
+    """
+    if len(s.cat.categories) == 0:
+        return s
+    codes, categories = pd.factorize(pd.Series(s.cat.categories).str.lower().str.strip())
+    # code -1 (missing) picks up the trailing -1
+    codes = np.append(codes, -1)
+    return pd.Series(pd.Categorical.from_codes(codes[s.cat.codes.to_numpy()], categories=categories), index=s.index)
 
 #TODO: modularize data cleaning
+@instrument()
 def clean_data(df: pd.DataFrame, dataset_name: str) -> pd.DataFrame:
+    """
+    Drops duplicate rows, rows missing a critical field, rows with an invalid date and rows with negative hours,
+    fills missing notes and billable flags and normalizes the text columns.
+    Every drop rule is evaluated on the whole frame and the combined mask applied once, the input is left untouched.
+    """
     logger.info(f"Starting data cleaning for dataset: {dataset_name}")
 
-    # Drop duplicates
-    initial_count = len(df)
-
-    df.drop_duplicates(inplace=True)
-    logger.warning(f"{initial_count - len(df)} duplicate rows removed from {dataset_name}")
-    curr_count = len(df)
-
-    # Drop rows with critical missing values
-    #TODO: move critical columns and other data quality thresholds to config
-    critical_columns = ["client", "project", "name", "task"]
-    df.dropna(subset=critical_columns, inplace=True)
-    logger.warning(f"{curr_count - len(df)} rows with missing critical fields removed from: {dataset_name}")
-    curr_count = len(df)
+    columns = {column: df[column] for column in df.columns}
+    for column in CATEGORY_COLUMNS:
+        if column in columns:
+            columns[column] = columns[column].astype("category")
+    typed = pd.DataFrame(columns, copy=False)
+
+    # rules in the order they used to run, each drop counted among the rows the earlier rules kept
+    rules = [
+        ("duplicate", typed.duplicated().to_numpy()),
+        ("missing critical", typed[CRITICAL_COLUMNS].isna().any(axis=1).to_numpy()),
+    ]
+    for column in DATE_COLUMNS:
+        if column in columns:
+            columns[column] = pd.to_datetime(columns[column], errors="coerce")
+            rules.append((column, columns[column].isna().to_numpy()))
+    if "hours" in columns:
+        rules.append(("hours", ~(columns["hours"] >= 0).to_numpy()))
+
+    keep = np.ones(len(df), dtype=bool)
+    dropped = {}
+    for rule, drop in rules:
+        dropped[rule] = int(np.count_nonzero(keep & drop))
+        keep &= ~drop
+
+    logger.warning(f"{dropped['duplicate']} duplicate rows removed from {dataset_name}")
+    logger.warning(f"{dropped['missing critical']} rows with missing critical fields removed from: {dataset_name}")
+    for column in DATE_COLUMNS:
+        if dropped.get(column):
+            logger.warning(
+                f"Found {dropped[column]} invalid dates in column {column} of {dataset_name}, removing invalid rows")
+    logger.warning(f"Removed {sum(dropped.get(column, 0) for column in DATE_COLUMNS)} invalid date rows from {dataset_name}")
+    if "hours" in columns:
+        logger.warning(f"{dropped['hours']} negative values in 'hours' column removed from {dataset_name}")
+
+    # the only row copy: every column taken once with the combined mask
+    rows = np.flatnonzero(keep)
+    cleaned = pd.DataFrame({column: values.array.take(rows) for column, values in columns.items()},
+                           index=df.index[rows], copy=False)
 
     # handle missing values in non-critical columns
-    if "note" in df.columns:
-        df["note"].fillna("", inplace=True)
-
-    if "billable" in df.columns:
-        df["billable"].fillna("No", inplace=True)
-
-    # Ensure date columns are in correct datetime format
-    date_columns = ["start_date", "end_date", "date"]
-    for col in date_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-            invalid_dates = df[col].isnull().sum()
-            if invalid_dates > 0:
-                logger.warning(
-                    f"Found {invalid_dates} invalid dates in column {col} of {dataset_name}, removing invalid rows")
-            df = df[df[col].notna()]
-    logger.warning(f"Removed {curr_count - len(df)} invalid date rows from {dataset_name}")
-    curr_count = len(df)
-
-    if "hours" in df.columns:
-        df = df[df["hours"] >= 0]
-        logger.warning(f"{curr_count - len(df)} negative values in 'hours' column removed from {dataset_name}")
-        curr_count = len(df)
+    if "note" in cleaned.columns:
+        cleaned["note"] = cleaned["note"].fillna("")
 
     # clean text columns
-    if "role" in df.columns:
-        df["role"] = df["role"].str.lower().str.strip()
-
-    if "task" in df.columns:
-        df["task"] = df["task"].str.lower().str.strip()
-
-    if "billable" in df.columns:
-        df["billable"] = df["billable"].str.lower().str.strip()
+    for column in NORMALIZED_COLUMNS:
+        if column in cleaned.columns:
+            cleaned[column] = _normalize_categories(cleaned[column])
 
-    if "client" in df.columns:
-        df["client"] = df["client"].str.lower().str.strip()
+    if "billable" in cleaned.columns and cleaned["billable"].hasnans:
+        # "No" once normalized
+        billable = cleaned["billable"]
+        if "no" not in billable.cat.categories:
+            billable = billable.cat.add_categories("no")
+        cleaned["billable"] = billable.fillna("no")
 
     logger.info(f"Finished data cleaning for dataset: {dataset_name}")
-    logger.info(f"{dataset_name} now has {curr_count} rows.")
-    return df
+    logger.info(f"{dataset_name} now has {len(cleaned)} rows.")
+    return cleaned
 
 def star_schema_transformation():
+    # imported here: cleaning the frames should not load the star schema module and its engine
+    from scripts.star_schema import create_staging_star_schema, populate_dimensions, populate_fact_table, load_prod_schema
     create_staging_star_schema()
     populate_dimensions()
     populate_fact_table()
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple, Union, get_args, get_origin
+from loguru import logger
+from models.data_models import DATE_FORMAT, BILLABLE_VALUES, INT64_MAX, INT64_MIN
+
+# A check takes a column and returns (mask of values that passed, converted column)
+Check = Callable[[pd.Series], Tuple[pd.Series, pd.Series]]
+
+
+def _on_categories(s: pd.Series, fn: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Evaluates a boolean column function once per category instead of once per row.
+    """
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        return fn(s).fillna(False).astype(bool)
+    per_category = fn(pd.Series(s.cat.categories)).fillna(False).to_numpy(dtype=bool)
+    # code -1 (missing) picks up the trailing False
+    per_category = np.append(per_category, False)
+    return pd.Series(per_category[s.cat.codes.to_numpy()], index=s.index)
+
+
+def _is_str(s: pd.Series) -> pd.Series:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return _on_categories(s, _is_str)
+    if pd.api.types.is_string_dtype(s.dtype):
+        if pd.api.types.infer_dtype(s, skipna=True) in ("string", "empty"):
+            return s.notna()
+        return s.map(lambda value: isinstance(value, str)).astype(bool)
+    return pd.Series(False, index=s.index)
+
+
+def _to_number(s: pd.Series, integral: bool) -> Tuple[pd.Series, pd.Series]:
+    """
+    Mirrors the lax pydantic number types: real int/float values only, never strings.
+    """
+    if pd.api.types.is_bool_dtype(s.dtype):
+        return pd.Series(False, index=s.index), s
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        values = s.astype("float64")
+    else:
+        is_number = s.map(lambda value: isinstance(value, (int, float)) and not isinstance(value, bool))
+        values = pd.to_numeric(s.where(is_number.astype(bool)), errors="coerce").astype("float64")
+    ok = values.notna()
+    if integral:
+        # NaN and +/-inf both fail here, matching float.is_integer(); whole numbers beyond int64
+        # would wrap around when cast to the int64 output column
+        ok &= np.isfinite(values) & (values % 1 == 0) & (values >= INT64_MIN) & (values < INT64_MAX + 1)
+    return ok, values
+
+
+def _check_str(s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    return _is_str(s), s
+
+
+def _check_int(s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    return _to_number(s, integral=True)
+
+
+def _check_float(s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    return _to_number(s, integral=False)
+
+
+def _check_datetime(s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    if not pd.api.types.is_datetime64_any_dtype(s.dtype):
+        raise TypeError(f"Expected a column of parsed dates, got {s.dtype}: datetime fields need a date parsing validator")
+    return s.notna(), s
+
+
+def _parse_date(s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        # strptime() only accepts strings, already-parsed values fail the per-row validator
+        return pd.Series(False, index=s.index), s
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # each distinct date string parsed once, missing values (code -1) become NaT
+        ok, parsed = _parse_date(pd.Series(s.cat.categories))
+        parsed = parsed.where(ok).array.take(s.cat.codes.to_numpy(), allow_fill=True)
+        return pd.Series(parsed, index=s.index).notna(), pd.Series(parsed, index=s.index)
+    is_str = _is_str(s)
+    parsed = pd.to_datetime(s.where(is_str).astype(object), format=DATE_FORMAT, errors="coerce")
+    return is_str & parsed.notna(), parsed
+
+
+def _non_negative(s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    ok, values = _to_number(s, integral=False)
+    return ok & ~(values < 0), s
+
+
+def _billable(s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    return _on_categories(s, lambda values: values.str.strip().str.lower().isin(BILLABLE_VALUES)), s
+
+
+# Columnar counterparts of the pydantic field validators, keyed by validator name
+COLUMNAR_VALIDATORS: Dict[str, Tuple[str, Check]] = {
+    "parse_date": ("date_format", _parse_date),
+    "validate_estimated_hours": ("integer", _check_int),
+    "validate_hours": ("non_negative", _non_negative),
+    "validate_billable": ("billable", _billable),
+}
+
+TYPE_CHECKS: Dict[type, Check] = {
+    str: _check_str,
+    int: _check_int,
+    float: _check_float,
+    datetime: _check_datetime,
+}
+
+OUTPUT_DTYPES = {int: "int64", float: "float64"}
+
+
+def _field_type(annotation):
+    # Optional[X] -> X
+    if get_origin(annotation) is Union:
+        return next(arg for arg in get_args(annotation) if arg is not type(None))
+    return annotation
+
+
+@lru_cache(maxsize=None)
+def build_rules(model) -> List[dict]:
+    """
+    Derives the columnar rule set (alias, required flag, ordered checks) for a pydantic model.
+    Raises TypeError for a field type or field validator without a columnar counterpart.
+    """
+    validators = model.__pydantic_decorators__.field_validators.values()
+    rules = []
+    for name, field in model.model_fields.items():
+        field_type = _field_type(field.annotation)
+        if field_type not in TYPE_CHECKS:
+            raise TypeError(
+                f"{model.__name__}.{name} has type {field.annotation}, columnar validation supports "
+                f"{', '.join(t.__name__ for t in TYPE_CHECKS)}"
+            )
+
+        before, after = [], []
+        for decorator in validators:
+            if name not in decorator.info.fields:
+                continue
+            if decorator.cls_var_name not in COLUMNAR_VALIDATORS:
+                raise TypeError(
+                    f"Validator {model.__name__}.{decorator.cls_var_name} has no columnar counterpart, "
+                    f"add one to COLUMNAR_VALIDATORS or validate {model.__name__} row by row"
+                )
+            check = COLUMNAR_VALIDATORS[decorator.cls_var_name]
+            (before if decorator.info.mode == "before" else after).append(check)
+        if field_type is datetime and not before:
+            raise TypeError(f"{model.__name__}.{name} is a datetime field without a date parsing validator")
+
+        rules.append({
+            "name": name,
+            "alias": field.alias or name,
+            "required": field.is_required(),
+            "type": field_type,
+            "checks": before + [("type", TYPE_CHECKS[field_type])] + after,
+        })
+    return rules
+
+
+def validate_frame(df: pd.DataFrame, model, return_rejected: bool = False):
+    """
+    Validates a whole frame against a pydantic model with column masks instead of per-row model instances.
+    Returns the valid rows (same columns and dtypes as the per-row path) and rejected row counts per rule,
+    plus with return_rejected the first failed rule of every rejected row (a Series on the input index).
+    """
+    valid = pd.Series(True, index=df.index)
+    rejections = {}
+    columns = {}
+    rules = []
+    first_failure = np.full(len(df), -1, dtype=np.int32)
+
+    def reject(rule, failed):
+        count = int(failed.sum())
+        if count:
+            rejections[rule] = count
+            if return_rejected:
+                first_failure[failed.to_numpy() & (first_failure == -1)] = len(rules)
+                rules.append(rule)
+
+    for rule in build_rules(model):
+        alias = rule["alias"]
+        values = df[alias] if alias in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+        present = values.notna()
+        if rule["required"]:
+            reject(f"{alias}: missing", ~present)
+            field_ok = present.copy()
+        else:
+            field_ok = pd.Series(True, index=df.index)
+
+        # like pydantic, only the first failing check of a field is reported
+        pending = present.copy()
+        for check_name, check in rule["checks"]:
+            passed, values = check(values)
+            failed = pending & ~passed
+            reject(f"{alias}: {check_name}", failed)
+            field_ok &= ~failed
+            pending &= passed
+
+        valid &= field_ok
+        columns[rule["name"]] = values
+
+    result = pd.DataFrame(columns)[valid].reset_index(drop=True)
+    for rule in build_rules(model):
+        name = rule["name"]
+        if not rule["required"]:
+            result[name] = result[name].astype(object).where(result[name].notna(), None)
+        elif rule["type"] in OUTPUT_DTYPES:
+            result[name] = result[name].astype(OUTPUT_DTYPES[rule["type"]])
+
+    if not return_rejected:
+        return result, rejections
+    failed = first_failure >= 0
+    rejected = pd.Series(pd.Categorical.from_codes(first_failure[failed], categories=rules), index=df.index[failed])
+    return result, rejections, rejected
+
+
+def log_rejections(rejections: Dict[str, int], source: str):
+    for rule, count in sorted(rejections.items(), key=lambda item: -item[1]):
+        logger.error(f"Data validation: {count} rows of {source} failed '{rule}'")
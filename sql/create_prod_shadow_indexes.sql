@@ -0,0 +1,38 @@
+-- Constraints and indexes of the shadow schema, one statement each.
+-- Statements on prod_shadow.fact_timesheet are first built per partition in parallel,
+-- the parent statement then only attaches them.
+
+-- Dimension keys
+ALTER TABLE prod_shadow.dim_date ADD PRIMARY KEY (date_id);
+ALTER TABLE prod_shadow.dim_team_member ADD PRIMARY KEY (team_member_id);
+ALTER TABLE prod_shadow.dim_project ADD PRIMARY KEY (project_id);
+ALTER TABLE prod_shadow.dim_task ADD PRIMARY KEY (task_id);
+CREATE UNIQUE INDEX ux_dim_date_date ON prod_shadow.dim_date(date);
+ALTER TABLE prod_shadow.dim_team_member ADD UNIQUE (name);
+ALTER TABLE prod_shadow.dim_project ADD UNIQUE (client, project_name);
+ALTER TABLE prod_shadow.dim_task ADD UNIQUE (task_name);
+
+-- create Indexes for Dimension tables
+CREATE INDEX idx_dim_date_date ON prod_shadow.dim_date(date);
+CREATE INDEX idx_dim_team_member_name ON prod_shadow.dim_team_member(name);
+CREATE INDEX idx_dim_project_client ON prod_shadow.dim_project(client);
+CREATE INDEX idx_dim_project_project_name ON prod_shadow.dim_project(project_name);
+
+-- Rollup keys
+ALTER TABLE prod_shadow.rollup_daily ADD PRIMARY KEY (period_start, team_member_id, project_id, is_billable);
+ALTER TABLE prod_shadow.rollup_weekly ADD PRIMARY KEY (period_start, team_member_id, project_id, is_billable);
+ALTER TABLE prod_shadow.rollup_monthly ADD PRIMARY KEY (period_start, team_member_id, project_id, is_billable);
+
+-- Fact key and indexes
+ALTER TABLE prod_shadow.fact_timesheet ADD PRIMARY KEY (timesheet_id, date);
+CREATE INDEX idx_fact_timesheet_team_member_id ON prod_shadow.fact_timesheet(team_member_id);
+CREATE INDEX idx_fact_timesheet_project_id ON prod_shadow.fact_timesheet(project_id);
+CREATE INDEX idx_fact_timesheet_task_id ON prod_shadow.fact_timesheet(task_id);
+CREATE INDEX idx_fact_timesheet_date_id ON prod_shadow.fact_timesheet(date_id);
+CREATE INDEX idx_fact_timesheet_is_billable ON prod_shadow.fact_timesheet(is_billable);
+
+-- Foreign keys, validated once the dimension keys exist
+ALTER TABLE prod_shadow.fact_timesheet ADD CONSTRAINT fk_fact_timesheet_date_id FOREIGN KEY (date_id) REFERENCES prod_shadow.dim_date(date_id);
+ALTER TABLE prod_shadow.fact_timesheet ADD CONSTRAINT fk_fact_timesheet_team_member_id FOREIGN KEY (team_member_id) REFERENCES prod_shadow.dim_team_member(team_member_id);
+ALTER TABLE prod_shadow.fact_timesheet ADD CONSTRAINT fk_fact_timesheet_project_id FOREIGN KEY (project_id) REFERENCES prod_shadow.dim_project(project_id);
+ALTER TABLE prod_shadow.fact_timesheet ADD CONSTRAINT fk_fact_timesheet_task_id FOREIGN KEY (task_id) REFERENCES prod_shadow.dim_task(task_id);
@@ -0,0 +1,62 @@
+BEGIN;
+
+-- Shadow copy of the prod star schema, built without indexes or constraints
+DROP SCHEMA IF EXISTS prod_shadow CASCADE;
+CREATE SCHEMA prod_shadow;
+
+-- Same columns as the staging dimensions, with identity keys instead of serials: their sequences belong to
+-- the shadow tables and move with them on the swap, where LIKE would copy defaults calling staging's sequences
+CREATE TABLE prod_shadow.dim_date (
+    date_id INTEGER GENERATED BY DEFAULT AS IDENTITY,
+    date DATE NOT NULL,
+    day_of_week TEXT,
+    day INTEGER,
+    month INTEGER,
+    year INTEGER,
+    is_weekend BOOLEAN
+);
+
+CREATE TABLE prod_shadow.dim_team_member (
+    team_member_id INTEGER GENERATED BY DEFAULT AS IDENTITY,
+    name TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+
+CREATE TABLE prod_shadow.dim_project (
+    project_id INTEGER GENERATED BY DEFAULT AS IDENTITY,
+    client TEXT NOT NULL,
+    project_name TEXT NOT NULL
+);
+
+CREATE TABLE prod_shadow.dim_task (
+    task_id INTEGER GENERATED BY DEFAULT AS IDENTITY,
+    task_name TEXT NOT NULL
+);
+
+-- Same layout as prod.fact_timesheet in load_prod_schema.sql, partitions are added per month
+CREATE TABLE prod_shadow.fact_timesheet (
+    timesheet_id INTEGER NOT NULL,
+    date_id INTEGER,
+    team_member_id INTEGER,
+    project_id INTEGER,
+    task_id INTEGER,
+    log_hours FLOAT,
+    est_project_hours INTEGER,
+    is_billable BOOLEAN DEFAULT FALSE,
+    date DATE NOT NULL
+) PARTITION BY RANGE (date);
+
+-- Same layout as the prod rollups in load_prod_schema.sql
+CREATE TABLE prod_shadow.rollup_daily (
+    period_start DATE NOT NULL,
+    team_member_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    is_billable BOOLEAN NOT NULL,
+    log_hours FLOAT NOT NULL,
+    est_project_hours BIGINT NOT NULL,
+    entries BIGINT NOT NULL
+);
+CREATE TABLE prod_shadow.rollup_weekly (LIKE prod_shadow.rollup_daily INCLUDING DEFAULTS);
+CREATE TABLE prod_shadow.rollup_monthly (LIKE prod_shadow.rollup_daily INCLUDING DEFAULTS);
+
+COMMIT;
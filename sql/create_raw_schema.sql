@@ -14,7 +14,9 @@ CREATE TABLE IF NOT EXISTS raw.float_allocations (
     task TEXT,
     start_date DATE,
     end_date DATE,
-    estimated_hours INTEGER
+    estimated_hours INTEGER,
+    key_hash BIGINT,
+    row_hash BIGINT
 );
 
 -- Create Raw table for ClickUp data
@@ -26,7 +28,94 @@ CREATE TABLE IF NOT EXISTS raw.clickup_timesheets (
     date DATE,
     hours FLOAT,
     note TEXT,
-    billable TEXT
+    billable TEXT,
+    key_hash BIGINT,
+    row_hash BIGINT
+);
+
+-- 64-bit hashes of each row's natural key and of the whole row, computed by load_raw.row_hashes().
+-- Delta loads find the rows an export dropped through the row_hash index
+ALTER TABLE raw.float_allocations ADD COLUMN IF NOT EXISTS key_hash BIGINT, ADD COLUMN IF NOT EXISTS row_hash BIGINT;
+ALTER TABLE raw.clickup_timesheets ADD COLUMN IF NOT EXISTS key_hash BIGINT, ADD COLUMN IF NOT EXISTS row_hash BIGINT;
+CREATE INDEX IF NOT EXISTS idx_float_allocations_row_hash ON raw.float_allocations (row_hash);
+CREATE INDEX IF NOT EXISTS idx_clickup_timesheets_row_hash ON raw.clickup_timesheets (row_hash);
+
+-- The incremental staging refresh and month backfills read raw by the date the staging rows are rebuilt by
+CREATE INDEX IF NOT EXISTS idx_float_allocations_start_date ON raw.float_allocations (start_date);
+CREATE INDEX IF NOT EXISTS idx_clickup_timesheets_date ON raw.clickup_timesheets (date);
+
+-- Dates each raw load wrote or deleted rows of (load_raw.record_touched_dates), until the incremental staging
+-- refresh fingerprinted them: a truncating load touches every date, null_dates flags rows without a date
+CREATE TABLE IF NOT EXISTS raw.pending_staging_dates (
+    id BIGSERIAL PRIMARY KEY,
+    source TEXT NOT NULL,
+    every_date BOOLEAN NOT NULL,
+    start_date DATE,
+    end_date DATE,
+    null_dates BOOLEAN NOT NULL,
+    run_id TEXT NOT NULL,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Rows rejected by validation, with the rule they failed, per pipeline run and source file.
+-- row_data is JSON rather than JSONB: written in bulk on every bad export, read only when investigating
+CREATE TABLE IF NOT EXISTS raw.rejected_rows (
+    run_id TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    row_number BIGINT NOT NULL,
+    rule TEXT NOT NULL,
+    field TEXT,
+    error_code TEXT NOT NULL,
+    row_data JSON,
+    rejected_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS rejected_rows_run_idx ON raw.rejected_rows (run_id, source_file);
+
+-- Fingerprint of every input file a run saw. Rows stay 'pending' until the run publishes to prod,
+-- unchanged inputs are detected against the last 'consumed' fingerprint of the file
+CREATE TABLE IF NOT EXISTS raw.ingest_manifest (
+    file_path TEXT NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    mtime TIMESTAMPTZ NOT NULL,
+    content_hash TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    recorded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (file_path, run_id)
+);
+
+-- One row per successful publish to prod. Outside prod, which the shadow publish swaps out;
+-- query result caches are keyed by the latest version
+CREATE TABLE IF NOT EXISTS raw.publish_versions (
+    version BIGSERIAL PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    published_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Completed months of date-range backfills (scripts/backfill.py): 'staged' once raw and staging hold the month,
+-- 'published' once its fact partition is swapped into prod. A restarted backfill skips what is recorded here
+CREATE TABLE IF NOT EXISTS raw.backfill_progress (
+    backfill_id TEXT NOT NULL,
+    month DATE NOT NULL,
+    step TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    rows BIGINT,
+    seconds FLOAT,
+    completed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (backfill_id, month, step)
+);
+
+-- Staging foreign keys a backfill dropped while its months publish, recorded with the drop: a backfill killed
+-- before adding them back leaves them here, and the next backfill or staging star schema setup restores them
+CREATE TABLE IF NOT EXISTS raw.backfill_dropped_constraints (
+    table_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    backfill_id TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    dropped_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (table_name, name)
 );
 
 COMMIT;
\ No newline at end of file
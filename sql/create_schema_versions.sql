@@ -0,0 +1,11 @@
+-- Scripts of sql/ whose idempotent DDL (CREATE ... IF NOT EXISTS) is applied, with the checksum of the applied
+-- version (utils/sql.py). Outside prod and staging, which are swapped and rebuilt
+CREATE SCHEMA IF NOT EXISTS raw;
+
+CREATE TABLE IF NOT EXISTS raw.schema_versions (
+    script TEXT PRIMARY KEY,
+    checksum TEXT NOT NULL,
+    ddl_statements INTEGER NOT NULL,
+    run_id TEXT,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -48,4 +48,52 @@ CREATE TABLE IF NOT EXISTS staging.fact_timesheet (
     FOREIGN KEY (task_id) REFERENCES staging.dim_task(task_id),
     FOREIGN KEY (date_id) REFERENCES staging.dim_date(date_id)
 );
+
+-- dim_date had no natural key before, and repeated loads duplicated dates: keep the first row of each date
+-- and point the facts of the others at it (nothing to do once the unique index below exists)
+UPDATE staging.fact_timesheet f
+SET date_id = kept.date_id
+FROM staging.dim_date d
+JOIN (
+    SELECT date, MIN(date_id) AS date_id FROM staging.dim_date GROUP BY date HAVING COUNT(*) > 1
+) kept ON kept.date = d.date
+WHERE f.date_id = d.date_id AND d.date_id <> kept.date_id;
+
+DELETE FROM staging.dim_date d
+USING (
+    SELECT date, MIN(date_id) AS date_id FROM staging.dim_date GROUP BY date HAVING COUNT(*) > 1
+) kept
+WHERE d.date = kept.date AND d.date_id <> kept.date_id;
+
+-- Natural key for dim_date upserts (also covers tables created before it existed)
+CREATE UNIQUE INDEX IF NOT EXISTS ux_dim_date_date ON staging.dim_date(date);
+
+-- Row count and content fingerprint of the staging rows the prod facts were last published from,
+-- per ClickUp date and per Float member (see fact_source_changes.sql)
+CREATE TABLE IF NOT EXISTS staging.fact_source_state (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    row_count BIGINT NOT NULL,
+    fingerprint NUMERIC NOT NULL,
+    PRIMARY KEY (source, key)
+);
+
+-- What the run's detect_fact_changes stage found: the new state of the changed dates and members
+-- (NULL row count when gone), recorded as fact_source_state once prod is published from it
+CREATE TABLE IF NOT EXISTS staging.fact_source_pending (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    row_count BIGINT,
+    fingerprint NUMERIC,
+    PRIMARY KEY (source, key)
+);
+
+-- The date window the later stages of that run rebuild (NULL bounds: every date)
+CREATE TABLE IF NOT EXISTS staging.fact_window (
+    run_id TEXT NOT NULL,
+    start_date DATE,
+    end_date DATE,
+    changed BOOLEAN NOT NULL,
+    detected_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
 COMMIT;
\ No newline at end of file
@@ -0,0 +1,37 @@
+BEGIN;
+
+-- Incrementally maintained staging tables, same names and columns as the materialized views
+CREATE TABLE IF NOT EXISTS staging.mv_float_allocations (
+    client TEXT,
+    project TEXT,
+    role TEXT,
+    name TEXT,
+    task TEXT,
+    start_date DATE,
+    end_date DATE,
+    est_project_hours INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS staging.mv_clickup_timesheets (
+    client TEXT,
+    project TEXT,
+    name TEXT,
+    task TEXT,
+    date DATE,
+    log_hours FLOAT,
+    is_billable BOOLEAN
+);
+
+CREATE INDEX IF NOT EXISTS idx_mv_float_allocations_start_date ON staging.mv_float_allocations (start_date);
+CREATE INDEX IF NOT EXISTS idx_mv_clickup_timesheets_date ON staging.mv_clickup_timesheets (date);
+
+-- Per-date row count and content fingerprint of the raw rows each staging date was built from
+CREATE TABLE IF NOT EXISTS staging.refresh_state (
+    source TEXT NOT NULL,
+    date DATE NOT NULL,
+    row_count BIGINT NOT NULL,
+    fingerprint NUMERIC NOT NULL,
+    PRIMARY KEY (source, date)
+);
+
+COMMIT;
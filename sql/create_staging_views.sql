@@ -10,9 +10,12 @@ SELECT
     LOWER(task) AS task,
     CAST(start_date AS DATE) AS start_date,
     CAST(end_date AS DATE) AS end_date,
-    CAST(COALESCE(estimated_hours,0) AS INTEGER) AS est_project_hours
+    CAST(COALESCE(estimated_hours,0) AS INTEGER) AS est_project_hours,
+    -- row identity for REFRESH MATERIALIZED VIEW CONCURRENTLY, duplicates are numbered
+    md5(CAST(fa AS TEXT)) AS row_key,
+    ROW_NUMBER() OVER (PARTITION BY md5(CAST(fa AS TEXT))) AS row_seq
 FROM
-    raw.float_allocations;
+    raw.float_allocations fa;
 
 -- Create Materialized View for ClickUp Data
 CREATE MATERIALIZED VIEW IF NOT EXISTS staging.mv_clickup_timesheets AS
@@ -28,12 +31,14 @@ SELECT
             WHEN billable ILIKE 'Yes' THEN TRUE
             ELSE FALSE
         END
-    AS BOOLEAN) AS is_billable
+    AS BOOLEAN) AS is_billable,
+    md5(CAST(cu AS TEXT)) AS row_key,
+    ROW_NUMBER() OVER (PARTITION BY md5(CAST(cu AS TEXT))) AS row_seq
 FROM
-    raw.clickup_timesheets;
+    raw.clickup_timesheets cu;
 
--- Refresh the materialized views
-REFRESH MATERIALIZED VIEW staging.mv_float_allocations;
-REFRESH MATERIALIZED VIEW staging.mv_clickup_timesheets;
+-- Unique indexes required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_float_allocations_row ON staging.mv_float_allocations (row_key, row_seq);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_clickup_timesheets_row ON staging.mv_clickup_timesheets (row_key, row_seq);
 
 COMMIT;
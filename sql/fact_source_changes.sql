@@ -0,0 +1,24 @@
+-- Runs inside the caller's transaction, the temp tables are dropped on commit
+
+-- Row count and content fingerprint of the staging rows the facts are built from: ClickUp entries per date,
+-- Float allocations per member (a member's allocations set the role and estimates of every ClickUp date of theirs)
+CREATE TEMP TABLE fact_source_current ON COMMIT DROP AS
+SELECT 'clickup_timesheets' AS source, CAST(date AS TEXT) AS key, COUNT(*) AS row_count,
+       SUM(hashtextextended(CAST(ROW(client, project, name, task, log_hours, is_billable) AS TEXT), 0)) AS fingerprint
+FROM staging.mv_clickup_timesheets
+WHERE date IS NOT NULL
+GROUP BY date
+UNION ALL
+SELECT 'float_allocations', name, COUNT(*),
+       SUM(hashtextextended(CAST(ROW(client, project, role, task, start_date, end_date, est_project_hours) AS TEXT), 0))
+FROM staging.mv_float_allocations
+WHERE name IS NOT NULL
+GROUP BY name;
+
+-- Dates and members that are new, changed or gone (NULL row count) since the last prod publish, with their new state
+CREATE TEMP TABLE fact_source_changes ON COMMIT DROP AS
+SELECT COALESCE(c.source, s.source) AS source, COALESCE(c.key, s.key) AS key, c.row_count, c.fingerprint
+FROM fact_source_current c
+FULL JOIN staging.fact_source_state s ON s.source = c.source AND s.key = c.key
+WHERE c.row_count IS DISTINCT FROM s.row_count
+   OR c.fingerprint IS DISTINCT FROM s.fingerprint;
@@ -5,37 +5,70 @@ CREATE TABLE IF NOT EXISTS prod.dim_date (LIKE staging.dim_date INCLUDING ALL);
 CREATE TABLE IF NOT EXISTS prod.dim_team_member (LIKE staging.dim_team_member INCLUDING ALL);
 CREATE TABLE IF NOT EXISTS prod.dim_project (LIKE staging.dim_project INCLUDING ALL);
 CREATE TABLE IF NOT EXISTS prod.dim_task (LIKE staging.dim_task INCLUDING ALL);
-CREATE TABLE IF NOT EXISTS prod.fact_timesheet (LIKE staging.fact_timesheet INCLUDING ALL);
-
--- Insert Data into Prod Tables
-INSERT INTO prod.dim_date SELECT * FROM staging.dim_date;
-INSERT INTO prod.dim_team_member SELECT * FROM staging.dim_team_member;
-INSERT INTO prod.dim_project SELECT * FROM staging.dim_project;
-INSERT INTO prod.dim_task SELECT * FROM staging.dim_task;
-INSERT INTO prod.fact_timesheet SELECT * FROM staging.fact_timesheet;
-
--- Add Foreign Key Constraints to Fact Tables
-ALTER TABLE prod.fact_timesheet
-    ADD CONSTRAINT fk_fact_timesheet_date_id FOREIGN KEY (date_id) REFERENCES prod.dim_date(date_id),
-    ADD CONSTRAINT fk_fact_timesheet_team_member_id FOREIGN KEY (team_member_id) REFERENCES prod.dim_team_member(team_member_id),
-    ADD CONSTRAINT fk_fact_timesheet_project_id FOREIGN KEY (project_id) REFERENCES prod.dim_project(project_id),
-    ADD CONSTRAINT fk_fact_timesheet_task_id FOREIGN KEY (task_id) REFERENCES prod.dim_task(task_id);
 
--- create Indexes for Dimension tables
-CREATE INDEX idx_dim_date_date ON prod.dim_date(date);
-CREATE INDEX idx_dim_team_member_name ON prod.dim_team_member(name);
-CREATE INDEX idx_dim_project_client ON prod.dim_project(client);
-CREATE INDEX idx_dim_project_project_name ON prod.dim_project(project_name);
+-- Fact table range partitioned by month on its (denormalized) date, filter on it for partition pruning
+CREATE TABLE IF NOT EXISTS prod.fact_timesheet (
+    timesheet_id INTEGER NOT NULL,
+    date_id INTEGER,
+    team_member_id INTEGER,
+    project_id INTEGER,
+    task_id INTEGER,
+    log_hours FLOAT,
+    est_project_hours INTEGER,
+    is_billable BOOLEAN DEFAULT FALSE,
+    date DATE NOT NULL,
+    PRIMARY KEY (timesheet_id, date),
+    CONSTRAINT fk_fact_timesheet_date_id FOREIGN KEY (date_id) REFERENCES prod.dim_date(date_id),
+    CONSTRAINT fk_fact_timesheet_team_member_id FOREIGN KEY (team_member_id) REFERENCES prod.dim_team_member(team_member_id),
+    CONSTRAINT fk_fact_timesheet_project_id FOREIGN KEY (project_id) REFERENCES prod.dim_project(project_id),
+    CONSTRAINT fk_fact_timesheet_task_id FOREIGN KEY (task_id) REFERENCES prod.dim_task(task_id)
+) PARTITION BY RANGE (date);
+
+-- Hours pre-aggregated per member, project and billability at day, week (from Monday) and month grain,
+-- refreshed with every fact partition swap (scripts/rollups.py)
+CREATE TABLE IF NOT EXISTS prod.rollup_daily (
+    period_start DATE NOT NULL,
+    team_member_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    is_billable BOOLEAN NOT NULL,
+    log_hours FLOAT NOT NULL,
+    est_project_hours BIGINT NOT NULL,
+    entries BIGINT NOT NULL,
+    PRIMARY KEY (period_start, team_member_id, project_id, is_billable)
+);
+CREATE TABLE IF NOT EXISTS prod.rollup_weekly (LIKE prod.rollup_daily INCLUDING ALL);
+CREATE TABLE IF NOT EXISTS prod.rollup_monthly (LIKE prod.rollup_daily INCLUDING ALL);
 
+-- Insert or refresh Data in Prod Dimension Tables
+INSERT INTO prod.dim_date SELECT * FROM staging.dim_date
+ON CONFLICT (date_id) DO UPDATE SET
+    date = EXCLUDED.date,
+    day_of_week = EXCLUDED.day_of_week,
+    day = EXCLUDED.day,
+    month = EXCLUDED.month,
+    year = EXCLUDED.year,
+    is_weekend = EXCLUDED.is_weekend;
+INSERT INTO prod.dim_team_member SELECT * FROM staging.dim_team_member
+ON CONFLICT (team_member_id) DO UPDATE SET name = EXCLUDED.name, role = EXCLUDED.role;
+INSERT INTO prod.dim_project SELECT * FROM staging.dim_project
+ON CONFLICT (project_id) DO UPDATE SET client = EXCLUDED.client, project_name = EXCLUDED.project_name;
+INSERT INTO prod.dim_task SELECT * FROM staging.dim_task
+ON CONFLICT (task_id) DO UPDATE SET task_name = EXCLUDED.task_name;
+
+-- create Indexes for Dimension tables
+CREATE INDEX IF NOT EXISTS idx_dim_date_date ON prod.dim_date(date);
+CREATE INDEX IF NOT EXISTS idx_dim_team_member_name ON prod.dim_team_member(name);
+CREATE INDEX IF NOT EXISTS idx_dim_project_client ON prod.dim_project(client);
+CREATE INDEX IF NOT EXISTS idx_dim_project_project_name ON prod.dim_project(project_name);
 
--- Create Indexes for Fact tables
-CREATE INDEX idx_fact_timesheet_team_member_id ON prod.fact_timesheet(team_member_id);
-CREATE INDEX idx_fact_timesheet_project_id ON prod.fact_timesheet(project_id);
-CREATE INDEX idx_fact_timesheet_task_id ON prod.fact_timesheet(task_id);
-CREATE INDEX idx_fact_timesheet_date_id ON prod.fact_timesheet(date_id);
-CREATE INDEX idx_fact_timesheet_is_billable ON prod.fact_timesheet(is_billable);
+-- Create Indexes for Fact tables (cascade to every partition)
+CREATE INDEX IF NOT EXISTS idx_fact_timesheet_team_member_id ON prod.fact_timesheet(team_member_id);
+CREATE INDEX IF NOT EXISTS idx_fact_timesheet_project_id ON prod.fact_timesheet(project_id);
+CREATE INDEX IF NOT EXISTS idx_fact_timesheet_task_id ON prod.fact_timesheet(task_id);
+CREATE INDEX IF NOT EXISTS idx_fact_timesheet_date_id ON prod.fact_timesheet(date_id);
+CREATE INDEX IF NOT EXISTS idx_fact_timesheet_is_billable ON prod.fact_timesheet(is_billable);
 
 -- -- Composite index
 -- CREATE INDEX idx_fact_timesheet_project_task_date ON prod.fact_timesheet(project_id, task_id, date_id);
 
-COMMIT;
\ No newline at end of file
+COMMIT;
@@ -0,0 +1,20 @@
+BEGIN;
+
+-- Bulk load the shadow schema from staging
+INSERT INTO prod_shadow.dim_date SELECT * FROM staging.dim_date;
+INSERT INTO prod_shadow.dim_team_member SELECT * FROM staging.dim_team_member;
+INSERT INTO prod_shadow.dim_project SELECT * FROM staging.dim_project;
+INSERT INTO prod_shadow.dim_task SELECT * FROM staging.dim_task;
+
+-- The keys were copied from staging, new members continue after them
+SELECT setval(pg_get_serial_sequence('prod_shadow.dim_date', 'date_id'), COALESCE(MAX(date_id), 0) + 1, false) FROM prod_shadow.dim_date;
+SELECT setval(pg_get_serial_sequence('prod_shadow.dim_team_member', 'team_member_id'), COALESCE(MAX(team_member_id), 0) + 1, false) FROM prod_shadow.dim_team_member;
+SELECT setval(pg_get_serial_sequence('prod_shadow.dim_project', 'project_id'), COALESCE(MAX(project_id), 0) + 1, false) FROM prod_shadow.dim_project;
+SELECT setval(pg_get_serial_sequence('prod_shadow.dim_task', 'task_id'), COALESCE(MAX(task_id), 0) + 1, false) FROM prod_shadow.dim_task;
+
+INSERT INTO prod_shadow.fact_timesheet (timesheet_id, date_id, team_member_id, project_id, task_id, log_hours, est_project_hours, is_billable, date)
+SELECT f.timesheet_id, f.date_id, f.team_member_id, f.project_id, f.task_id, f.log_hours, f.est_project_hours, f.is_billable, d.date
+FROM staging.fact_timesheet f
+JOIN staging.dim_date d ON d.date_id = f.date_id;
+
+COMMIT;
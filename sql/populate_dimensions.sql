@@ -8,27 +8,35 @@ SELECT DISTINCT
     EXTRACT(MONTH FROM date) AS month,
     EXTRACT(YEAR FROM date) AS year,
     CASE WHEN EXTRACT(DOW FROM date) IN (0, 6) THEN TRUE ELSE FALSE END AS is_weekend
-FROM staging.mv_clickup_timesheets;
+FROM staging.mv_clickup_timesheets
+WHERE date IS NOT NULL
+ON CONFLICT (date) DO NOTHING;
 
--- Populate Team Member Dimension
+-- Populate Team Member Dimension (one role per member)
 INSERT INTO staging.dim_team_member (name, role)
-SELECT DISTINCT
+SELECT DISTINCT ON (LOWER(name))
     LOWER(name) AS name,
     role
-FROM staging.mv_float_allocations;
+FROM staging.mv_float_allocations
+WHERE name IS NOT NULL AND role IS NOT NULL
+ORDER BY LOWER(name), role
+ON CONFLICT (name) DO UPDATE SET role = EXCLUDED.role;
 
 -- Populate Project Dimension
 INSERT INTO staging.dim_project (client, project_name)
 SELECT DISTINCT
     client,
     project
-FROM staging.mv_clickup_timesheets;
+FROM staging.mv_clickup_timesheets
+WHERE client IS NOT NULL AND project IS NOT NULL
+ON CONFLICT (client, project_name) DO NOTHING;
 
 -- Populate Task Dimension
 INSERT INTO staging.dim_task (task_name)
 SELECT DISTINCT
     task
 FROM staging.mv_clickup_timesheets
-;
+WHERE task IS NOT NULL
+ON CONFLICT (task_name) DO NOTHING;
 
-COMMIT;
\ No newline at end of file
+COMMIT;
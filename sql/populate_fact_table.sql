@@ -1,5 +1,12 @@
 BEGIN;
 
+-- Rebuild the fact rows of the requested date window (every date when no window is given)
+DELETE FROM staging.fact_timesheet f
+USING staging.dim_date d
+WHERE f.date_id = d.date_id
+  AND (CAST(:start_date AS DATE) IS NULL OR d.date >= CAST(:start_date AS DATE))
+  AND (CAST(:end_date AS DATE) IS NULL OR d.date <= CAST(:end_date AS DATE));
+
 -- Populate Fact Timesheet Table
 INSERT INTO staging.fact_timesheet (date_id, team_member_id, project_id, task_id, log_hours, est_project_hours, is_billable)
 SELECT
@@ -26,6 +33,8 @@ JOIN staging.dim_project p
     AND cu.client = p.client
 JOIN staging.dim_task t
     ON cu.task = t.task_name
+WHERE (CAST(:start_date AS DATE) IS NULL OR cu.date >= CAST(:start_date AS DATE))
+  AND (CAST(:end_date AS DATE) IS NULL OR cu.date <= CAST(:end_date AS DATE))
 ;
 
-COMMIT;
\ No newline at end of file
+COMMIT;
@@ -0,0 +1,100 @@
+-- Runs inside the caller's transaction, the temp tables are dropped on commit
+
+-- Fingerprint raw per date within the requested range (NULL bounds mean open-ended),
+-- from the row hashes written at load time where present
+CREATE TEMP TABLE raw_float_state ON COMMIT DROP AS
+SELECT start_date AS date, COUNT(*) AS row_count, SUM(COALESCE(row_hash, hashtextextended(CAST(fa AS TEXT), 0))) AS fingerprint
+FROM raw.float_allocations fa
+WHERE start_date IS NOT NULL
+  AND (CAST(:start_date AS DATE) IS NULL OR start_date >= CAST(:start_date AS DATE))
+  AND (CAST(:end_date AS DATE) IS NULL OR start_date <= CAST(:end_date AS DATE))
+GROUP BY start_date;
+
+CREATE TEMP TABLE raw_clickup_state ON COMMIT DROP AS
+SELECT date, COUNT(*) AS row_count, SUM(COALESCE(row_hash, hashtextextended(CAST(cu AS TEXT), 0))) AS fingerprint
+FROM raw.clickup_timesheets cu
+WHERE date IS NOT NULL
+  AND (CAST(:start_date AS DATE) IS NULL OR date >= CAST(:start_date AS DATE))
+  AND (CAST(:end_date AS DATE) IS NULL OR date <= CAST(:end_date AS DATE))
+GROUP BY date;
+
+-- Dates that are new, changed or gone since the last refresh
+CREATE TEMP TABLE changed_float_dates ON COMMIT DROP AS
+SELECT COALESCE(r.date, s.date) AS date
+FROM raw_float_state r
+FULL JOIN (
+    SELECT * FROM staging.refresh_state
+    WHERE source = 'float_allocations'
+      AND (CAST(:start_date AS DATE) IS NULL OR date >= CAST(:start_date AS DATE))
+      AND (CAST(:end_date AS DATE) IS NULL OR date <= CAST(:end_date AS DATE))
+) s ON r.date = s.date
+WHERE r.row_count IS DISTINCT FROM s.row_count
+   OR r.fingerprint IS DISTINCT FROM s.fingerprint;
+
+CREATE TEMP TABLE changed_clickup_dates ON COMMIT DROP AS
+SELECT COALESCE(r.date, s.date) AS date
+FROM raw_clickup_state r
+FULL JOIN (
+    SELECT * FROM staging.refresh_state
+    WHERE source = 'clickup_timesheets'
+      AND (CAST(:start_date AS DATE) IS NULL OR date >= CAST(:start_date AS DATE))
+      AND (CAST(:end_date AS DATE) IS NULL OR date <= CAST(:end_date AS DATE))
+) s ON r.date = s.date
+WHERE r.row_count IS DISTINCT FROM s.row_count
+   OR r.fingerprint IS DISTINCT FROM s.fingerprint;
+
+-- Rebuild only the changed dates. Rows without a date have no fingerprint: with :null_dates (a load wrote
+-- or deleted one) they are restaged in full
+DELETE FROM staging.mv_float_allocations WHERE start_date IN (SELECT date FROM changed_float_dates);
+DELETE FROM staging.mv_float_allocations WHERE start_date IS NULL AND CAST(:null_dates AS BOOLEAN);
+INSERT INTO staging.mv_float_allocations
+SELECT
+    client,
+    project,
+    role,
+    LOWER(name) AS name,
+    LOWER(task) AS task,
+    CAST(start_date AS DATE) AS start_date,
+    CAST(end_date AS DATE) AS end_date,
+    CAST(COALESCE(estimated_hours,0) AS INTEGER) AS est_project_hours
+FROM (
+    SELECT * FROM raw.float_allocations WHERE start_date IN (SELECT date FROM changed_float_dates)
+    UNION ALL
+    SELECT * FROM raw.float_allocations WHERE start_date IS NULL AND CAST(:null_dates AS BOOLEAN)
+) fa;
+
+DELETE FROM staging.mv_clickup_timesheets WHERE date IN (SELECT date FROM changed_clickup_dates);
+DELETE FROM staging.mv_clickup_timesheets WHERE date IS NULL AND CAST(:null_dates AS BOOLEAN);
+INSERT INTO staging.mv_clickup_timesheets
+SELECT
+    client,
+    project,
+    LOWER(name) AS name,
+    LOWER(task) AS task,
+    CAST(date AS DATE) AS date,
+    CAST(hours AS FLOAT) AS log_hours,
+    CAST(
+        CASE
+            WHEN billable ILIKE 'Yes' THEN TRUE
+            ELSE FALSE
+        END
+    AS BOOLEAN) AS is_billable
+FROM (
+    SELECT * FROM raw.clickup_timesheets WHERE date IN (SELECT date FROM changed_clickup_dates)
+    UNION ALL
+    SELECT * FROM raw.clickup_timesheets WHERE date IS NULL AND CAST(:null_dates AS BOOLEAN)
+) cu;
+
+-- Record the new state of the changed dates
+DELETE FROM staging.refresh_state
+WHERE (source = 'float_allocations' AND date IN (SELECT date FROM changed_float_dates))
+   OR (source = 'clickup_timesheets' AND date IN (SELECT date FROM changed_clickup_dates));
+
+INSERT INTO staging.refresh_state (source, date, row_count, fingerprint)
+SELECT 'float_allocations', date, row_count, fingerprint
+FROM raw_float_state
+WHERE date IN (SELECT date FROM changed_float_dates)
+UNION ALL
+SELECT 'clickup_timesheets', date, row_count, fingerprint
+FROM raw_clickup_state
+WHERE date IN (SELECT date FROM changed_clickup_dates);
@@ -1,19 +1,172 @@
 
 import os
-import yaml
-from sqlalchemy import create_engine
+import threading
+import time
+from functools import lru_cache
 
 
 # Read config.yaml
+@lru_cache(maxsize=None)
 def load_config():
+    import yaml
+
     config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
     with open(config_path, 'r') as file:
         conf = yaml.safe_load(file)
     return conf
 
-config = load_config()
+def database_url():
+    # DATABASE_URL in the environment wins, e.g. to point benchmarks at a scratch database
+    if os.environ.get("DATABASE_URL"):
+        return os.environ["DATABASE_URL"]
+    db_config = load_config()["database"]
+    return f"postgresql+psycopg2://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['dbname']}"
+
+# Pool settings used when neither database.pool nor the profile sets them
+POOL_DEFAULTS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
+POOL_KEYS = tuple(POOL_DEFAULTS) + ("pool_use_lifo",)
+
+
+class PoolMetrics:
+    """
+    Counters for one connection pool: checkouts, new connections, checkouts that had to wait
+    for a connection to come back, and the peak number of connections in use and in overflow.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+
+    def record_checkout(self, waited: bool, seconds: float, checked_out: int, overflow: int):
+        with self._lock:
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds += seconds
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+            }
+
+
+def _metered_pool_class():
+    from sqlalchemy.pool import QueuePool
+
+    class MeteredQueuePool(QueuePool):
+        def __init__(self, creator, pool_size=5, max_overflow=10, **kw):
+            super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+            # max_overflow=-1 means no limit, checkouts never wait
+            self.capacity = pool_size + max_overflow if max_overflow > -1 else None
+            self.metrics = PoolMetrics()
+
+        def _do_get(self):
+            waited = self.capacity is not None and self.checkedout() >= self.capacity
+            start = time.perf_counter()
+            connection = super()._do_get()
+            self.metrics.record_checkout(waited, time.perf_counter() - start, self.checkedout(), max(self.overflow(), 0))
+            return connection
+
+        def _create_connection(self):
+            self.metrics.record_connect()
+            return super()._create_connection()
+
+        def recreate(self):
+            # engine.dispose() swaps in a fresh pool, keep counting into the same metrics
+            pool = super().recreate()
+            pool.metrics = self.metrics
+            return pool
+
+    return MeteredQueuePool
+
+def _session_options(settings: dict) -> str:
+    # libpq startup options, so the GUCs are set when the connection is opened, not with an extra round trip
+    return " ".join(f"-c {name}=" + str(value).replace(" ", "\\ ") for name, value in settings.items())
+
+def profile_config(profile: str) -> dict:
+    db_config = load_config()["database"]
+    profiles = db_config.get("profiles", {})
+    if profile != "default" and profile not in profiles:
+        raise ValueError(f"Unknown database profile: {profile}")
+    return {**POOL_DEFAULTS, **db_config.get("pool", {}), **(profiles.get(profile) or {})}
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(profile: str = "default"):
+    """
+    One engine, with its own pool and session settings, per connection profile in database.profiles.
+    sqlalchemy is only imported, and an engine only built, the first time a task needs it.
+    """
+    with _engines_lock:
+        if profile not in _engines:
+            _engines[profile] = _create_engine(profile)
+        return _engines[profile]
+
+def _create_engine(profile: str):
+    from sqlalchemy import create_engine
+
+    settings = profile_config(profile)
+    session = {"application_name": f"etl_{profile}", **settings.get("settings", {})}
+    executemany = load_config()["database"].get("executemany", {})
+
+    return create_engine(
+        database_url(),
+        poolclass=_metered_pool_class(),
+        connect_args={"options": _session_options(session)},
+        execution_options={"stream_results": True} if settings.get("stream_results") else {},
+        **{key: settings[key] for key in POOL_KEYS if key in settings},
+        **executemany,
+    )
+
+def dispose_engines_after_fork():
+    """
+    For a forked child process: drops the pooled connections inherited from the parent without closing them,
+    they still belong to the parent. The child opens its own on first use.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose(close=False)
+
+def pool_metrics() -> dict:
+    """
+    Pool counters per profile, for the engines built so far.
+    """
+    with _engines_lock:
+        engines = dict(_engines)
+    return {profile: engine.pool.metrics.as_dict() for profile, engine in sorted(engines.items())}
 
-db_config = config["database"]
-DATABASE_URL = f"postgresql+psycopg2://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['dbname']}"
+# `from utils.db import config, engine` keeps working, resolved on first access (PEP 562)
+_LAZY_ATTRIBUTES = {
+    "config": load_config,
+    "DATABASE_URL": database_url,
+    "engine": get_engine,
+}
 
-engine = create_engine(DATABASE_URL)
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,181 @@
+# utils/instrumentation.py
+
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from utils.db import load_config
+from utils.logger import setup_logging
+
+METRICS_DIR = "logs/metrics"
+
+_local = threading.local()
+_metrics_logger = None
+_metrics_lock = threading.Lock()
+_process_run_id = datetime.now(timezone.utc).strftime("local__%Y%m%dT%H%M%S")
+
+
+class StageRecord:
+    """
+    What one pipeline stage did. Row counts and `extra` can be filled in by the stage itself.
+    """
+
+    def __init__(self, name: str, rows_in: int = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.extra = {}
+
+
+def run_id() -> str:
+    # Airflow exports the DAG run id to task processes, outside Airflow one id per process
+    return os.environ.get("AIRFLOW_CTX_DAG_RUN_ID") or os.environ.get("PIPELINE_RUN_ID") or _process_run_id
+
+def metrics_path(run: str = None) -> str:
+    directory = load_config().get("pipeline", {}).get("metrics_dir", METRICS_DIR)
+    task = os.environ.get("AIRFLOW_CTX_TASK_ID") or f"pid{os.getpid()}"
+    return os.path.join(directory, run or run_id(), f"{task}.jsonl")
+
+class _MetricsFiles:
+    """
+    Loguru sink appending each metrics record to the file of its run, so one process can serve several runs.
+    """
+
+    def __init__(self):
+        self.files = {}
+
+    def __call__(self, message):
+        path = message.record["extra"]["metrics_path"]
+        if path not in self.files:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.files[path] = open(path, "a")
+        self.files[path].write(message)
+        self.files[path].flush()
+
+def _logger():
+    """
+    The pipeline log file sink plus a JSON-lines sink for stage metrics, one file per task of a DAG run.
+    Both are enqueued, so writing a record never blocks the stage on disk I/O.
+    """
+    global _metrics_logger
+    with _metrics_lock:
+        if _metrics_logger is None:
+            logger = setup_logging()
+            logger.add(
+                _MetricsFiles(),
+                format="{extra[metrics]}",
+                filter=lambda record: "metrics" in record["extra"],
+                level="INFO",
+                enqueue=True,
+            )
+            _metrics_logger = logger
+        return _metrics_logger
+
+def _peak_rss_mb() -> float:
+    # high-water mark of the process, kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+def _rows(value):
+    if hasattr(value, "shape") and hasattr(value, "columns"):
+        return len(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, tuple) and value:
+        return _rows(value[0])
+    return None
+
+@contextmanager
+def measure(name: str, rows_in: int = None):
+    """
+    Records wall time, CPU time, rows in/out, throughput and peak RSS of the enclosed block as one stage.
+    """
+    logger = _logger()
+    record = StageRecord(name, rows_in)
+    stack = _local.__dict__.setdefault("stages", [])
+    parent = stack[-1].name if stack else None
+    stack.append(record)
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    rss_before = _peak_rss_mb()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    status, error = "success", None
+    try:
+        yield record
+    except BaseException as e:
+        status, error = "failed", repr(e)
+        raise
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        stack.pop()
+        rows = record.rows_out if record.rows_out is not None else record.rows_in
+        peak_rss = _peak_rss_mb()
+        metrics = {
+            "run_id": run_id(),
+            "stage": name,
+            "parent": parent,
+            "status": status,
+            "error": error,
+            "started_at": started_at,
+            "wall_seconds": round(wall, 4),
+            # process CPU time, includes other threads running at the same time
+            "cpu_seconds": round(cpu, 4),
+            "rows_in": record.rows_in,
+            "rows_out": record.rows_out,
+            "rows_per_second": round(rows / wall, 1) if rows is not None and wall > 0 else None,
+            "peak_rss_mb": round(peak_rss, 1),
+            "peak_rss_growth_mb": round(peak_rss - rss_before, 1),
+            **record.extra,
+        }
+        logger.bind(metrics=json.dumps(metrics, default=str), metrics_path=metrics_path()).info(
+            f"Stage {name} {status} in {wall:.2f}s (cpu {cpu:.2f}s)"
+            + (f", {rows} rows, {metrics['rows_per_second']} rows/s" if metrics["rows_per_second"] is not None else "")
+            + f", peak RSS {peak_rss:.0f} MB"
+        )
+
+def current_stage():
+    """
+    The innermost stage being measured on this thread, so a stage can add to its own record.
+    """
+    stack = getattr(_local, "stages", None)
+    return stack[-1] if stack else None
+
+def instrument(name: str = None):
+    """
+    Decorator form of measure(). Rows in is the length of the first DataFrame argument,
+    rows out the length of a returned DataFrame (or first tuple item) or a returned row count.
+    """
+    def decorator(fn):
+        stage_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            rows_in = next((_rows(value) for value in list(args) + list(kwargs.values()) if hasattr(value, "columns")), None)
+            with measure(stage_name, rows_in) as record:
+                result = fn(*args, **kwargs)
+                record.rows_out = _rows(result)
+                return result
+
+        return wrapper
+    return decorator
+
+def read_run_metrics(run: str = None) -> list:
+    """
+    All stage records written for a DAG run, across its tasks, in start order.
+    """
+    if _metrics_logger is not None:
+        # wait for enqueued records of this process to reach the file
+        _metrics_logger.complete()
+    directory = os.path.dirname(metrics_path(run))
+    records = []
+    if os.path.isdir(directory):
+        for file_name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, file_name), "r") as file:
+                records.extend(json.loads(line) for line in file if line.strip())
+    return sorted(records, key=lambda record: record["started_at"])
@@ -1,5 +1,26 @@
 # utils/logger.py
 
-from loguru import logger
+LOG_FILE = "logs/data_pipeline.log"
 
-logger.add("logs/data_pipeline.log", rotation="1 MB", retention="7 days", level="INFO")
+_file_sink = None
+
+
+def setup_logging():
+    """
+    Imports loguru and adds the pipeline log file sink once, on first use instead of on import.
+    The sink is enqueued: records are written by a background worker, not by the logging call.
+    """
+    global _file_sink
+    from loguru import logger as _logger
+
+    if _file_sink is None:
+        _file_sink = _logger.add(LOG_FILE, rotation="1 MB", retention="7 days", level="INFO", enqueue=True)
+    return _logger
+
+
+class _LazyLogger:
+    def __getattr__(self, name):
+        return getattr(setup_logging(), name)
+
+
+logger = _LazyLogger()
@@ -0,0 +1,203 @@
+# utils/query_cache.py
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+from loguru import logger
+from utils.db import get_engine, load_config
+from utils.instrumentation import run_id
+
+# quoted literals and identifiers are kept as written, everything else has its whitespace and comments collapsed
+_SQL_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|((?:\s+|--[^\n]*|/\*.*?\*/)+)", re.DOTALL)
+
+
+def normalize_sql(sql) -> str:
+    """
+    The statement with comments dropped, whitespace collapsed and no trailing semicolon,
+    so formatting differences of the same query share a cache entry.
+    """
+    return _SQL_TOKENS.sub(lambda match: match.group(1) or " ", str(sql)).strip().rstrip(";").strip()
+
+def cache_key(sql, params: dict, version: int) -> str:
+    payload = json.dumps([normalize_sql(sql), params or {}, version], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def publish_version(conn) -> int:
+    # 0 until the first publish
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM raw.publish_versions")).scalar()
+
+def bump_publish_version() -> int:
+    """
+    Records a successful publish of prod, invalidating every cached query result. Returns the new version.
+    """
+    with get_engine("bulk_load").begin() as conn:
+        version = conn.execute(
+            text("INSERT INTO raw.publish_versions (run_id) VALUES (:run_id) RETURNING version"),
+            {"run_id": run_id()},
+        ).scalar()
+    logger.info(f"Published prod version {version}")
+    return version
+
+
+class QueryCache:
+    """
+    Results of read-only queries on prod, as DataFrames, in an LRU bounded by entry count and bytes,
+    optionally backed by Parquet files in `disk_dir`. Entries are keyed by the normalized SQL, the parameters
+    and the publish version; the version is read at most once per `version_ttl` seconds, so repeat queries
+    between publishes never reach Postgres, and a publish is noticed within `version_ttl`.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 256 * 1024 * 1024, disk_dir: str = None,
+                 version_ttl: float = 60, engine=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.version_ttl = version_ttl
+        self.engine = engine or get_engine("analytics")
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._version_read_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "uncacheable": 0}
+
+    def version(self) -> int:
+        """
+        The current publish version. A change drops every cached result, in memory and on disk.
+        """
+        now = time.monotonic()
+        if self._version is not None and now - self._version_read_at < self.version_ttl:
+            return self._version
+        with self.engine.connect() as conn:
+            version = publish_version(conn)
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    logger.info(f"Prod publish version {self._version} -> {version}, dropping {len(self._entries)} cached results")
+                self._stats["invalidations"] += len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                self._drop_stale_files(version)
+            self._version, self._version_read_at = version, now
+        return version
+
+    def query(self, sql, params: dict = None) -> pd.DataFrame:
+        """
+        The result of `sql` (text or a text() clause) with `params`, from the cache when this publish version
+        already answered it. Callers get their own copy.
+        """
+        version = self.version()
+        key = cache_key(sql, params, version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._entries[key][0].copy()
+
+        frame = self._read_file(version, key)
+        if frame is not None:
+            with self._lock:
+                self._stats["disk_hits"] += 1
+        else:
+            # results are read whole: a plain cursor, the analytics profile's server-side cursors get fast-start plans
+            with self.engine.connect().execution_options(stream_results=False) as conn:
+                frame = pd.read_sql_query(sql if isinstance(sql, TextClause) else text(sql), conn, params=params or {})
+            with self._lock:
+                self._stats["misses"] += 1
+            self._write_file(version, key, frame)
+
+        self._store(key, frame, version)
+        return frame.copy()
+
+    def _store(self, key: str, frame: pd.DataFrame, version: int):
+        size = int(frame.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            if version != self._version:
+                # published while the query ran
+                return
+            if size > self.max_bytes:
+                self._stats["uncacheable"] += 1
+                return
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (frame, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    def _file_path(self, version: int, key: str) -> str:
+        return os.path.join(self.disk_dir, str(version), f"{key}.parquet")
+
+    def _read_file(self, version: int, key: str):
+        if not self.disk_dir or not os.path.exists(self._file_path(version, key)):
+            return None
+        try:
+            return pd.read_parquet(self._file_path(version, key))
+        except Exception as e:
+            # a file another process is still writing, or a damaged one: query instead
+            logger.warning(f"Unreadable cached result {self._file_path(version, key)}: {e}")
+            return None
+
+    def _write_file(self, version: int, key: str, frame: pd.DataFrame):
+        if not self.disk_dir:
+            return
+        path = self._file_path(version, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            # written under a temporary name and renamed, readers never see a partial file
+            frame.to_parquet(f"{path}.{os.getpid()}.tmp", index=False)
+            os.replace(f"{path}.{os.getpid()}.tmp", path)
+        except Exception as e:
+            logger.warning(f"Could not cache the result on disk: {e}")
+
+    def _drop_stale_files(self, version: int):
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return
+        for name in os.listdir(self.disk_dir):
+            if name.isdigit() and int(name) != version:
+                shutil.rmtree(os.path.join(self.disk_dir, name), ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": round((self._stats["hits"] + self._stats["disk_hits"]) / lookups, 3) if lookups else None,
+                "entries": len(self._entries),
+                "mb": round(self._bytes / 1024 / 1024, 3),
+                "version": self._version,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_query_cache() -> QueryCache:
+    """
+    The process-wide cache, configured by query_cache in config.yaml.
+    """
+    settings = load_config().get("query_cache", {})
+    return QueryCache(
+        max_entries=settings.get("max_entries", 1024),
+        max_bytes=int(settings.get("max_mb", 256) * 1024 * 1024),
+        disk_dir=settings.get("disk_dir"),
+        version_ttl=settings.get("version_ttl", 60),
+    )
+
+def cached_query(sql, params: dict = None) -> pd.DataFrame:
+    return get_query_cache().query(sql, params)
@@ -0,0 +1,269 @@
+# utils/sql.py
+
+import hashlib
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+from sqlalchemy import text
+from loguru import logger
+from utils.db import load_config
+from utils.instrumentation import measure, run_id
+
+# sql/ paths are relative to the repository, not to the working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_VERSIONS_SQL = "sql/create_schema_versions.sql"
+
+# statements EXPLAIN ANALYZE can run (and so executes exactly once, like the plain script)
+EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|MERGE)\b", re.IGNORECASE)
+# every script runs in its caller's transaction, the scripts' own BEGIN/COMMIT are dropped
+TRANSACTION_CONTROL = re.compile(r"^(BEGIN|COMMIT|START TRANSACTION|END)$", re.IGNORECASE)
+
+# DDL that does nothing once the objects it names exist: (kind, pattern capturing the names)
+IDEMPOTENT_DDL = [
+    ("schema", re.compile(r"^CREATE SCHEMA IF NOT EXISTS (\w+)$", re.IGNORECASE)),
+    ("relation", re.compile(r"^CREATE (?:UNLOGGED )?TABLE IF NOT EXISTS ([\w.]+)", re.IGNORECASE)),
+    ("relation", re.compile(r"^CREATE MATERIALIZED VIEW IF NOT EXISTS ([\w.]+)", re.IGNORECASE)),
+    ("index", re.compile(r"^CREATE (?:UNIQUE )?INDEX IF NOT EXISTS (\w+) ON (?:ONLY )?([\w.]+)", re.IGNORECASE)),
+]
+ADD_COLUMNS = re.compile(r"^ALTER TABLE ([\w.]+) (ADD .+)$", re.IGNORECASE | re.DOTALL)
+ADD_COLUMN = re.compile(r"^ADD COLUMN IF NOT EXISTS (\w+) ", re.IGNORECASE)
+# opening of a dollar-quoted body: $$ or $tag$ ($1 is a positional parameter)
+DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_]\w*)?\$")
+
+
+class Statement(NamedTuple):
+    sql: str
+    # catalog objects ("schema", name) | ("relation", name) | ("column", table, name) the statement
+    # creates if missing; empty for statements that always run
+    objects: Tuple[tuple, ...]
+
+
+class SqlScript(NamedTuple):
+    name: str
+    checksum: str
+    statements: Tuple[Statement, ...]
+    # one query telling whether every object of the script's idempotent DDL exists
+    check_sql: str
+    check_params: dict
+
+    @property
+    def ddl(self) -> Tuple[Statement, ...]:
+        return tuple(statement for statement in self.statements if statement.objects)
+
+
+def resolve(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+def _word_char(char: str) -> bool:
+    return char.isalnum() or char in ("_", "$")
+
+def _quoted_end(sql: str, i: int) -> int:
+    """
+    The position after the string literal or quoted identifier opening at sql[i]: doubled quotes stay inside,
+    and so do backslash-escaped characters of E'...' strings.
+    """
+    quote = sql[i]
+    escapes = quote == "'" and sql[i - 1:i] in ("e", "E") and not _word_char(sql[i - 2:i - 1])
+    i += 1
+    while i < len(sql):
+        if escapes and sql[i] == "\\":
+            i += 2
+        elif sql.startswith(quote * 2, i):
+            i += 2
+        elif sql[i] == quote:
+            return i + 1
+        else:
+            i += 1
+    return len(sql)
+
+def split_statements(sql: str) -> list:
+    """
+    The script's ';'-terminated statements with comments dropped. A semicolon only ends a statement outside
+    string literals, quoted identifiers, comments and dollar-quoted bodies ($$ ... $$, $tag$ ... $tag$).
+    """
+    statements, parts = [], []
+    # sql[start:i] is statement text not copied into parts yet
+    start = i = 0
+    while i < len(sql):
+        if sql.startswith("--", i):
+            parts.append(sql[start:i])
+            end = sql.find("\n", i)
+            i = start = end if end >= 0 else len(sql)
+        elif sql.startswith("/*", i):
+            # block comments nest in PostgreSQL
+            parts.append(sql[start:i] + " ")
+            depth, i = 1, i + 2
+            while i < len(sql) and depth:
+                if sql.startswith("/*", i):
+                    depth, i = depth + 1, i + 2
+                elif sql.startswith("*/", i):
+                    depth, i = depth - 1, i + 2
+                else:
+                    i += 1
+            start = i
+        elif sql[i] in ("'", '"'):
+            i = _quoted_end(sql, i)
+        elif sql[i] == "$" and DOLLAR_TAG.match(sql, i) and not _word_char(sql[i - 1:i]):
+            tag = DOLLAR_TAG.match(sql, i).group()
+            end = sql.find(tag, i + len(tag))
+            i = len(sql) if end < 0 else end + len(tag)
+        elif sql[i] == ";":
+            parts.append(sql[start:i])
+            statements.append("".join(parts))
+            parts, start, i = [], i + 1, i + 1
+        else:
+            i += 1
+    parts.append(sql[start:])
+    statements.append("".join(parts))
+    return [statement.strip() for statement in statements if statement.strip()]
+
+def created_objects(statement: str) -> tuple:
+    """
+    The objects an idempotent DDL statement creates, () when the statement has an effect every time it runs.
+    """
+    flat = " ".join(statement.split())
+    for kind, pattern in IDEMPOTENT_DDL:
+        match = pattern.match(flat)
+        if not match:
+            continue
+        if kind == "index":
+            # indexes live in their table's schema
+            index, table = match.groups()
+            schema = table.rsplit(".", 1)[0] + "." if "." in table else ""
+            return (("relation", f"{schema}{index}".lower()),)
+        return ((kind, match.group(1).lower()),)
+
+    match = ADD_COLUMNS.match(flat)
+    if match:
+        clauses = re.split(r",\s*(?=ADD\b)", match.group(2), flags=re.IGNORECASE)
+        columns = [ADD_COLUMN.match(clause + " ") for clause in clauses]
+        if all(columns):
+            table = match.group(1).lower()
+            return tuple(("column", table, column.group(1).lower()) for column in columns)
+    return ()
+
+def _existence_check(objects: list) -> Tuple[str, dict]:
+    checks, params = [], {}
+    for i, entry in enumerate(objects):
+        params[f"o{i}"] = entry[1]
+        if entry[0] == "schema":
+            checks.append(f"to_regnamespace(:o{i}) IS NOT NULL")
+        elif entry[0] == "relation":
+            checks.append(f"to_regclass(:o{i}) IS NOT NULL")
+        else:
+            params[f"c{i}"] = entry[2]
+            checks.append(f"EXISTS (SELECT 1 FROM pg_attribute WHERE attrelid = to_regclass(:o{i}) "
+                          f"AND attname = :c{i} AND NOT attisdropped)")
+    return f"SELECT {' AND '.join(checks) or 'TRUE'}", params
+
+@lru_cache(maxsize=None)
+def _parse(path: str, modified: int) -> SqlScript:
+    # cached per file version, a script edited while the process runs is read again
+    with open(path, "r") as file:
+        sql = file.read()
+    statements = tuple(
+        Statement(statement, created_objects(statement))
+        for statement in split_statements(sql) if not TRANSACTION_CONTROL.match(statement)
+    )
+    objects = list(dict.fromkeys(entry for statement in statements for entry in statement.objects))
+    check_sql, check_params = _existence_check(objects)
+    return SqlScript(os.path.basename(path), hashlib.sha256(sql.encode()).hexdigest(), statements, check_sql, check_params)
+
+def load_script(path: str) -> SqlScript:
+    """
+    A script from sql/, read, checksummed and split into statements once per process.
+    """
+    path = resolve(path)
+    return _parse(path, os.stat(path).st_mtime_ns)
+
+def sql_statements(path: str) -> list:
+    return [statement.sql for statement in load_script(path).statements]
+
+def explain_enabled() -> bool:
+    return bool(load_config().get("pipeline", {}).get("explain_sql", False))
+
+def statement_timings_enabled() -> bool:
+    return bool(load_config().get("pipeline", {}).get("sql_statement_timings", False))
+
+
+# checksums of the scripts whose DDL is applied, per database, read once per process
+_versions = {}
+_versions_lock = threading.Lock()
+
+def applied_versions(conn) -> dict:
+    database = str(conn.engine.url)
+    with _versions_lock:
+        if database not in _versions:
+            versions = {}
+            if conn.execute(text("SELECT to_regclass('raw.schema_versions')")).scalar() is not None:
+                versions = dict(conn.execute(text("SELECT script, checksum FROM raw.schema_versions")).fetchall())
+            _versions[database] = versions
+        return _versions[database]
+
+def record_version(conn, script: SqlScript):
+    """
+    Records the script's DDL as applied, in the caller's transaction: it counts once the objects are committed.
+    """
+    conn.execute(text(";\n".join(sql_statements(SCHEMA_VERSIONS_SQL))))
+    conn.execute(text("""
+        INSERT INTO raw.schema_versions (script, checksum, ddl_statements, run_id)
+        VALUES (:script, :checksum, :ddl_statements, :run_id)
+        ON CONFLICT (script) DO UPDATE SET
+            checksum = EXCLUDED.checksum, ddl_statements = EXCLUDED.ddl_statements,
+            run_id = EXCLUDED.run_id, applied_at = now()
+    """), {"script": script.name, "checksum": script.checksum, "ddl_statements": len(script.ddl), "run_id": run_id()})
+    with _versions_lock:
+        _versions.setdefault(str(conn.engine.url), {})[script.name] = script.checksum
+
+def ddl_applied(conn, script: SqlScript) -> bool:
+    """
+    Whether the script's idempotent DDL can be skipped: this version of the script was applied
+    and every object it creates still exists (schemas are dropped and swapped, tables replaced by views).
+    """
+    if applied_versions(conn).get(script.name) != script.checksum:
+        return False
+    return bool(conn.execute(text(script.check_sql), script.check_params).scalar())
+
+def _run_timed(conn, statement: str, params: dict, explain: bool) -> dict:
+    entry = {"statement": " ".join(statement.split())[:200]}
+    start = time.perf_counter()
+    if explain and EXPLAINABLE.match(statement):
+        entry["plan"] = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}"), params).scalar()
+    else:
+        rows = conn.execute(text(statement), params).rowcount
+        entry["rows"] = rows if rows >= 0 else None
+    entry["seconds"] = round(time.perf_counter() - start, 4)
+    return entry
+
+def run_sql_script(conn, path: str, params: dict = None, explain: bool = None):
+    """
+    Runs a script from sql/ as one instrumented stage, in the caller's transaction.
+    The script's CREATE ... IF NOT EXISTS DDL is skipped when raw.schema_versions has this version of the
+    script applied and its objects exist; the remaining statements go to the server in one round trip.
+    With pipeline.sql_statement_timings they run one by one, each timed in the stage metrics, and with explain
+    (default: pipeline.explain_sql) every DML statement runs under EXPLAIN (ANALYZE, BUFFERS), its plan recorded.
+    """
+    if explain is None:
+        explain = explain_enabled()
+    params = params or {}
+    script = load_script(path)
+
+    with measure(f"sql.{script.name}") as record:
+        statements, skipped = script.statements, False
+        if script.ddl:
+            skipped = ddl_applied(conn, script)
+            if skipped:
+                statements = tuple(statement for statement in statements if not statement.objects)
+            record.extra["ddl"] = {"checksum": script.checksum[:12], "statements": len(script.ddl), "skipped": skipped}
+
+        if explain or statement_timings_enabled():
+            record.extra["statements"] = [_run_timed(conn, statement.sql, params, explain) for statement in statements]
+        elif statements:
+            conn.execute(text(";\n".join(statement.sql for statement in statements)), params)
+
+        if script.ddl and not skipped:
+            record_version(conn, script)
+            logger.debug(f"Applied the DDL of {script.name} ({script.checksum[:12]})")